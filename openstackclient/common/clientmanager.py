@@ -16,41 +16,79 @@
 """Manage access to the clients, including authenticating when needed."""
 
 import logging
+import sys
+import time
 
-from openstackclient.compute import client as compute_client
-from openstackclient.identity import client as identity_client
-from openstackclient.image import client as image_client
-from openstackclient.object import client as object_client
-from openstackclient.volume import client as volume_client
+from openstackclient.common import tokencache
+from openstackclient.common import utils
 
 
 LOG = logging.getLogger(__name__)
 
 
 class ClientCache(object):
-    """Descriptor class for caching created client handles."""
+    """Descriptor class for caching created client handles.
+
+    Handles are cached per instance so that each ClientManager has its
+    own set of clients.
+
+    factory may be a callable or the dotted path to one.  A path is not
+    imported until the client is first used so each API's client library
+    is only loaded by the commands that need it.
+    """
     def __init__(self, factory):
         self.factory = factory
-        self._handle = None
+
+    def _get_factory(self):
+        if not callable(self.factory):
+            self.factory = utils.import_class(self.factory)
+        return self.factory
+
+    def get_service_type(self):
+        """Return the service type of the client the factory makes
+
+        This is the API_NAME of the factory's module, or the API name
+        from the module path if it has none.
+        """
+        module_name = self._get_factory().__module__
+        api_name = getattr(sys.modules.get(module_name), 'API_NAME', None)
+        if api_name:
+            return api_name
+        module = module_name.split('.')
+        return module[-2] if len(module) > 1 else module[0]
 
     def __get__(self, instance, owner):
-        # Tell the ClientManager to login to keystone
-        if self._handle is None:
-            self._handle = self.factory(instance)
-        return self._handle
+        if instance is None:
+            return self
+        handles = instance.__dict__.setdefault('_client_handles', {})
+        if self not in handles:
+            # Tell the ClientManager to login to keystone
+            if isinstance(instance, ClientManager):
+                # NOTE: this may create the identity client itself
+                instance.authenticate()
+        if self not in handles:
+            handles[self] = self._get_factory()(instance)
+            request_memo = getattr(instance, '_request_memo', None)
+            if request_memo:
+                request_memo.wrap_client(handles[self])
+            timing = getattr(instance, '_timing', None)
+            if timing:
+                timing.wrap_client(handles[self], self.get_service_type())
+        return handles[self]
 
 
 class ClientManager(object):
     """Manages access to API clients, including authentication."""
-    compute = ClientCache(compute_client.make_client)
-    identity = ClientCache(identity_client.make_client)
-    image = ClientCache(image_client.make_client)
-    object = ClientCache(object_client.make_client)
-    volume = ClientCache(volume_client.make_client)
+    compute = ClientCache('openstackclient.compute.client.make_client')
+    identity = ClientCache('openstackclient.identity.client.make_client')
+    image = ClientCache('openstackclient.image.client.make_client')
+    object = ClientCache('openstackclient.object.client.make_client')
+    volume = ClientCache('openstackclient.volume.client.make_client')
 
     def __init__(self, token=None, url=None, auth_url=None, project_name=None,
                  project_id=None, username=None, password=None,
-                 region_name=None, api_version=None):
+                 region_name=None, api_version=None, token_cache=None,
+                 request_memo=None, timing=None):
         self._token = token
         self._url = url
         self._auth_url = auth_url
@@ -61,16 +99,119 @@ class ClientManager(object):
         self._region_name = region_name
         self._api_version = api_version
         self._service_catalog = None
+        self._token_cache = token_cache
+        self._request_memo = request_memo
+        self._timing = timing
+        self._auth_ref = None
+        self._authenticated = False
+
+        # NOTE: Authentication is deferred until a client is first used
+        #       so commands that never talk to an API do not pay for it
+        return
+
+    @property
+    def auth_token(self):
+        """The auth token, authenticating first if necessary"""
+        self.authenticate()
+        return self._token
+
+    def authenticate(self):
+        """Authenticate with Identity if that has not been done yet"""
+        if self._authenticated:
+            return
+        # Set this first, getting self.identity below calls back in here
+        self._authenticated = True
+        if self._url:
+            # Token flow auth, nothing to do
+            return
+
+        try:
+            if self._token_cache:
+                self._auth_ref = self._token_cache.get(self._cache_key())
 
-        if not self._url:
             # Populate other password flow attributes
+            start = time.time()
             self._token = self.identity.auth_token
+            if self._timing and not self._auth_ref:
+                # The identity client authenticates as it is created,
+                # before its requests can be recorded
+                self._timing.add(
+                    'identity',
+                    'AUTH',
+                    self._auth_url,
+                    None,
+                    None,
+                    time.time() - start,
+                )
             self._service_catalog = self.identity.service_catalog
+            self._save_token()
+        except Exception:
+            self._authenticated = False
+            raise
 
-        return
+    def _cache_key(self):
+        return self._token_cache.make_key(
+            self._auth_url,
+            self._username,
+            self._project_id or self._project_name,
+            self._region_name,
+        )
+
+    def _save_token(self):
+        """Store a new token in the token cache"""
+        if not self._token_cache:
+            return
+        auth_ref = self.identity.auth_ref
+        if auth_ref == self._auth_ref:
+            # Still using the cached token
+            return
+        self._token_cache.set(self._cache_key(), auth_ref)
+        self._auth_ref = dict(auth_ref)
+
+    def reauthenticate(self):
+        """Discard the current token and authenticate again
+
+        Used when an API rejects the token with a 401, which happens
+        if a cached token has been revoked before it expired.
+
+        :rtype: the new token
+        """
+        if self._url:
+            # Nothing to do for token flow auth
+            return self._token
+        if not self._authenticated:
+            return self.auth_token
+        LOG.debug('re-authenticating')
+        if self._token_cache:
+            self._token_cache.delete(self._cache_key())
+        self.identity.auth_ref = None
+        self.identity.authenticate()
+        self._token = self.identity.auth_token
+        self._service_catalog = self.identity.service_catalog
+        self._save_token()
+        return self._token
+
+    def will_expire_soon(self, stale_duration=None):
+        """Return True if the token expires within stale_duration seconds
+
+        Only a token this authenticated for can be checked, a token that
+        was given is never expected to expire.
+
+        :param stale_duration: defaults to the time before expiry after
+                               which the token cache no longer uses a token
+        """
+        if self._url or not self._authenticated:
+            return False
+        if stale_duration is None:
+            stale_duration = tokencache.STALE_TOKEN_DURATION
+        auth_ref = getattr(self.identity, 'auth_ref', None)
+        if not hasattr(auth_ref, 'will_expire_soon'):
+            return False
+        return auth_ref.will_expire_soon(stale_duration)
 
     def get_endpoint_for_service_type(self, service_type):
         """Return the endpoint URL for the service type."""
+        self.authenticate()
         # See if we are using password flow auth, i.e. we have a
         # service catalog to select endpoints from
         if self._service_catalog:
@@ -15,27 +15,221 @@
 
 """Modify Cliff's CommandManager"""
 
+import hashlib
+import json
 import logging
-import pkg_resources
+import os
+import sys
 
 import cliff.commandmanager
 
+from openstackclient.common import utils
+
 
 LOG = logging.getLogger(__name__)
 
+# Bump this when the index file format changes
+INDEX_VERSION = 1
+
+
+def get_path_stamp():
+    """Return a signature of the installed distributions
+
+    Installing, upgrading or removing a distribution changes the
+    modification time of the directory it is installed into, so the
+    mtimes of the sys.path entries are a cheap way to notice that the
+    set of entry points may have changed without scanning them.  The
+    entry_points.txt files of the distribution metadata are included
+    too, as they can be edited in place, for example in a develop
+    install or a plugin upgraded into an existing directory.
+    """
+    stamp = [sys.version]
+    for path in sys.path:
+        path = path or os.curdir
+        stamp.append('%s:%s' % (path, _get_mtime(path)))
+        for ep_file in _get_entry_point_files(path):
+            stamp.append('%s:%s' % (ep_file, _get_mtime(ep_file)))
+    return hashlib.sha1('\n'.join(stamp).encode('utf-8')).hexdigest()
+
+
+def _get_mtime(path):
+    try:
+        return os.stat(path).st_mtime
+    except OSError:
+        return None
+
+
+def _get_entry_point_files(path):
+    """Return the entry_points.txt files of the distributions in path"""
+    try:
+        names = sorted(os.listdir(path))
+    except OSError:
+        # Not a directory, such as a zipped egg
+        return []
+    files = []
+    if 'EGG-INFO' in names:
+        # path is an unzipped egg
+        files.append(os.path.join(path, 'EGG-INFO', 'entry_points.txt'))
+    for name in names:
+        if name.endswith(('.egg-info', '.dist-info')):
+            files.append(os.path.join(path, name, 'entry_points.txt'))
+    return files
+
+
+class IndexedEntryPoint(object):
+    """A command entry point loaded from the command index
+
+    Looks enough like a pkg_resources.EntryPoint for cliff.
+    """
+
+    def __init__(self, name, target, manager, group):
+        self.name = name
+        self.target = target
+        self.manager = manager
+        self.group = group
+
+    def load(self):
+        module_name, _sep, attrs = self.target.partition(':')
+        try:
+            __import__(module_name)
+            obj = sys.modules[module_name]
+            for attr in attrs.split('.'):
+                obj = getattr(obj, attr)
+            return obj
+        except (ImportError, AttributeError):
+            # The index is out of date, go and look for real
+            LOG.debug('command index entry %r is stale', self.name)
+            ep = self.manager.rescan_group(self.group, self.name)
+            if ep is None:
+                raise
+            return ep.load()
+
 
 class CommandManager(cliff.commandmanager.CommandManager):
     """Alters Cliff's default CommandManager behaviour to load additiona
        command groups after initialization.
+
+    If index_file is given the command names found in each group are
+    saved there, and later runs load them from the index rather than
+    scanning every installed distribution for entry points.  The index
+    is rebuilt when the installed distributions change.
     """
+
+    def __init__(self, namespace, convert_underscores=True, index_file=None):
+        self.index_file = index_file
+        self._index = None
+        super(CommandManager, self).__init__(
+            namespace,
+            convert_underscores=convert_underscores,
+        )
+
+    def _add_command(self, name, ep):
+        LOG.debug('found command %r' % name)
+        self.commands[name.replace('_', ' ')] = ep
+
     def _load_commands(self, group=None):
         if not group:
             group = self.namespace
+        index = self._load_index()
+        if index is not None and group in index['groups']:
+            for name, target in index['groups'][group].items():
+                self._add_command(
+                    name,
+                    IndexedEntryPoint(name, target, self, group),
+                )
+            return
+        self._scan_group(group)
+        return
+
+    def _scan_group(self, group):
+        # pkg_resources is only needed when the index can not be used
+        import pkg_resources
+
+        entries = {}
         for ep in pkg_resources.iter_entry_points(group):
-            LOG.debug('found command %r' % ep.name)
-            self.commands[ep.name.replace('_', ' ')] = ep
+            self._add_command(ep.name, ep)
+            entries[ep.name] = '%s:%s' % (
+                ep.module_name,
+                '.'.join(ep.attrs),
+            )
+        index = self._load_index()
+        if index is not None:
+            index['groups'][group] = entries
+            self._save_index()
         return
 
+    def find_command(self, argv):
+        try:
+            return super(CommandManager, self).find_command(argv)
+        except ValueError:
+            # The command may have been installed without changing the
+            # path stamp, look for it before giving up
+            groups = set(
+                ep.group for ep in self.commands.values()
+                if isinstance(ep, IndexedEntryPoint)
+            )
+            if not groups:
+                raise
+            LOG.debug('command %r not in the command index', argv)
+            for group in sorted(groups):
+                self._rescan(group)
+            return super(CommandManager, self).find_command(argv)
+
+    def rescan_group(self, group, name):
+        """Reload a group by scanning entry points
+
+        Used when a command in the index can not be loaded.
+
+        :param group: the entry point group to reload
+        :param name: the entry point name that was requested
+        :rtype: the entry point for name, or None if it no longer exists
+        """
+        self._rescan(group)
+        ep = self.commands.get(name.replace('_', ' '))
+        if isinstance(ep, IndexedEntryPoint):
+            return None
+        return ep
+
+    def _rescan(self, group):
+        for cmd_name, ep in list(self.commands.items()):
+            if isinstance(ep, IndexedEntryPoint) and ep.group == group:
+                del self.commands[cmd_name]
+        self._scan_group(group)
+
+    def _load_index(self):
+        """Return the command index, or None if it is not in use"""
+        if not self.index_file:
+            return None
+        if self._index is not None:
+            return self._index
+
+        stamp = get_path_stamp()
+        try:
+            with open(self.index_file, 'r') as f:
+                index = json.load(f)
+            if index.get('version') != INDEX_VERSION or \
+                    index.get('stamp') != stamp:
+                LOG.debug('command index %s is stale', self.index_file)
+                index = None
+        except (IOError, OSError, ValueError):
+            index = None
+
+        if index is None:
+            index = {
+                'version': INDEX_VERSION,
+                'stamp': stamp,
+                'groups': {},
+            }
+        self._index = index
+        return self._index
+
+    def _save_index(self):
+        try:
+            utils.write_json_file(self.index_file, self._index)
+        except (IOError, OSError) as e:
+            LOG.debug('unable to write command index %s: %s',
+                      self.index_file, e)
+
     def add_command_group(self, group=None):
         """Adds another group of command entrypoints"""
         if group:
@@ -20,6 +20,15 @@ class CommandError(Exception):
     pass
 
 
+class WaitTimeout(CommandError):
+    """Resources did not reach a status in time"""
+    def __init__(self, message, results=None, pending=None):
+        super(WaitTimeout, self).__init__(message)
+        # The resources that did finish, and the ids of those that did not
+        self.results = results or {}
+        self.pending = pending or []
+
+
 class AuthorizationFailure(Exception):
     pass
 
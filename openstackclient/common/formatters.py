@@ -0,0 +1,182 @@
+#   Copyright 2013 OpenStack Foundation
+#
+#   Licensed under the Apache License, Version 2.0 (the "License"); you may
+#   not use this file except in compliance with the License. You may obtain
+#   a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#   WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#   License for the specific language governing permissions and limitations
+#   under the License.
+#
+
+"""List formatters that write each row as soon as it is produced
+
+cliff's table formatter needs every row before it can size its columns.
+These formatters hold at most a sample of the rows, so a long listing
+starts printing with its first page and uses the same memory throughout.
+"""
+
+import csv
+import json
+
+import six
+
+from cliff.formatters import base
+
+
+# Rows written between flushes of stdout, after the first row
+FLUSH_ROWS = 100
+
+# Rows the streaming table reads to size its columns
+DEFAULT_SAMPLE_ROWS = 100
+
+
+class _Flusher(object):
+    """Flushes a stream after the first row and every FLUSH_ROWS after"""
+
+    def __init__(self, stream):
+        self.stream = stream
+        self.rows = 0
+
+    def row_written(self):
+        self.rows += 1
+        if self.rows == 1 or self.rows % FLUSH_ROWS == 0:
+            self.flush()
+
+    def flush(self):
+        flush = getattr(self.stream, 'flush', None)
+        if flush:
+            flush()
+
+
+class JSONLinesFormatter(base.ListFormatter):
+    """Writes each row as a JSON object on its own line"""
+
+    def add_argument_group(self, parser):
+        pass
+
+    def emit_list(self, column_names, data, stdout, parsed_args):
+        flusher = _Flusher(stdout)
+        for row in data:
+            stdout.write(json.dumps(
+                dict(zip(column_names, row)),
+                default=six.text_type,
+                sort_keys=True,
+            ))
+            stdout.write('\n')
+            flusher.row_written()
+        flusher.flush()
+
+
+class StreamingCSVFormatter(base.ListFormatter):
+    """Writes rows as CSV, flushing as it goes
+
+    Uses the --quote option of the csv formatter.
+    """
+
+    def add_argument_group(self, parser):
+        pass
+
+    def emit_list(self, column_names, data, stdout, parsed_args):
+        quote_mode = getattr(parsed_args, 'quote_mode', None) or 'nonnumeric'
+        writer = csv.writer(stdout, quoting=getattr(
+            csv,
+            'QUOTE_' + quote_mode.upper(),
+        ))
+        flusher = _Flusher(stdout)
+        writer.writerow(_encode_row(column_names))
+        for row in data:
+            writer.writerow(_encode_row(row))
+            flusher.row_written()
+        flusher.flush()
+
+
+class StreamingTableFormatter(base.ListFormatter):
+    """Writes a table whose column widths come from the first rows
+
+    Values in later rows that are wider than their column are written
+    in full, so only those rows are out of line.
+    """
+
+    def add_argument_group(self, parser):
+        group = parser.add_argument_group('Streaming table formatter')
+        group.add_argument(
+            '--sample-rows',
+            metavar='<rows>',
+            type=int,
+            default=DEFAULT_SAMPLE_ROWS,
+            help='Number of rows used to size the columns of table-stream '
+                 'output, default=' + str(DEFAULT_SAMPLE_ROWS),
+        )
+
+    def emit_list(self, column_names, data, stdout, parsed_args):
+        sample_rows = getattr(
+            parsed_args,
+            'sample_rows',
+            DEFAULT_SAMPLE_ROWS,
+        )
+        data = iter(data)
+        first = None
+        sample = []
+        for row in data:
+            if first is None:
+                first = row
+            sample.append([_text(value) for value in row])
+            if len(sample) >= sample_rows:
+                break
+        if not sample:
+            # Like the table formatter, print nothing for no rows
+            return
+
+        widths = [len(name) for name in column_names]
+        for row in sample:
+            widths = [max(w, len(value)) for w, value in zip(widths, row)]
+        # Numbers are right aligned, as in the table formatter
+        right = [
+            isinstance(value, six.integer_types + (float,))
+            and not isinstance(value, bool)
+            for value in first
+        ]
+        rule = '+' + '+'.join('-' * (w + 2) for w in widths) + '+\n'
+
+        def format_row(row, align=True):
+            cells = []
+            for value, width, is_right in zip(row, widths, right):
+                if align and is_right:
+                    cells.append(value.rjust(width))
+                else:
+                    cells.append(value.ljust(width))
+            return '| ' + ' | '.join(cells) + ' |\n'
+
+        flusher = _Flusher(stdout)
+        stdout.write(rule)
+        stdout.write(format_row(column_names, align=False))
+        stdout.write(rule)
+        for row in sample:
+            stdout.write(format_row(row))
+            flusher.row_written()
+        for row in data:
+            stdout.write(format_row([_text(value) for value in row]))
+            flusher.row_written()
+        stdout.write(rule)
+        flusher.flush()
+
+
+def _text(value):
+    if isinstance(value, six.binary_type):
+        return value.decode('utf-8', 'replace')
+    return six.text_type(value)
+
+
+def _encode_row(row):
+    """Encode text for the Python 2 csv module, which only takes bytes"""
+    if six.PY3:
+        return row
+    return [
+        v.encode('utf-8') if isinstance(v, six.text_type) else v
+        for v in row
+    ]
@@ -0,0 +1,237 @@
+#   Copyright 2013 OpenStack Foundation
+#
+#   Licensed under the Apache License, Version 2.0 (the "License"); you may
+#   not use this file except in compliance with the License. You may obtain
+#   a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#   WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#   License for the specific language governing permissions and limitations
+#   under the License.
+#
+
+"""On-disk cache of GET responses revalidated with conditional requests"""
+
+import hashlib
+import json
+import logging
+import os
+import tempfile
+
+import requests
+import six
+
+try:
+    from urllib.parse import urlsplit
+except ImportError:
+    from urlparse import urlsplit
+
+from openstackclient.common import utils
+
+
+LOG = logging.getLogger(__name__)
+
+# Total size of the cached bodies, in bytes
+DEFAULT_MAX_SIZE = 50 * 1024 * 1024
+
+# The cache is checked against max_size after this many writes, or when
+# the bodies written since the last check add up to a tenth of max_size
+EVICT_INTERVAL = 100
+
+
+def _hash(value):
+    return hashlib.sha1(value.encode('utf-8')).hexdigest()
+
+
+def _validators(entry):
+    headers = {}
+    if entry.get('etag'):
+        headers['If-None-Match'] = entry['etag']
+    if entry.get('last_modified'):
+        headers['If-Modified-Since'] = entry['last_modified']
+    return headers
+
+
+def _path_of(url):
+    """Return a URL without its query and trailing slash"""
+    parts = urlsplit(url)
+    return '%s://%s%s' % (parts.scheme, parts.netloc, parts.path.rstrip('/'))
+
+
+class HTTPCache(object):
+    """Stores GET responses that carry an ETag or Last-Modified header
+
+    Each response is kept as a body file and a JSON file of its headers,
+    both named for hashes of the URL's path and of the full URL.  Keeping
+    the path hash first means every cached query of a resource can be
+    dropped together when the resource is changed.  When the bodies add
+    up to more than max_size the least recently used are removed.
+
+    Both files are replaced by renaming, and the headers hold a digest
+    of the body, so a reader never uses a body with the headers of
+    another response.
+    """
+
+    def __init__(self, cache_dir, max_size=DEFAULT_MAX_SIZE):
+        self.cache_dir = os.path.expanduser(cache_dir)
+        self.max_size = max_size
+        self.hits = 0
+        # Writes since the size was last checked, None if it has not
+        # been checked by this process
+        self._unchecked_writes = None
+        self._unchecked_size = 0
+
+    def _prefix(self, url):
+        return _hash(_path_of(url)) + '-'
+
+    def _path(self, url):
+        return os.path.join(self.cache_dir, self._prefix(url) + _hash(url))
+
+    def get_validators(self, url):
+        """Return the conditional request headers for a cached URL
+
+        :rtype: a dict of headers, empty if url is not cached
+        """
+        try:
+            with open(self._path(url) + '.json', 'r') as f:
+                entry = json.load(f)
+        except (IOError, OSError, ValueError):
+            return {}
+        return _validators(entry)
+
+    def get(self, url, validators=None):
+        """Return the cached response for url, or None
+
+        :param url: the URL of the response
+        :param validators: if given, the response is only returned if
+            it has these validators, see get_validators()
+        """
+        path = self._path(url)
+        try:
+            with open(path + '.json', 'r') as f:
+                entry = json.load(f)
+            with open(path, 'rb') as f:
+                content = f.read()
+        except (IOError, OSError, ValueError):
+            return None
+        if hashlib.sha1(content).hexdigest() != entry.get('digest'):
+            # The body is being replaced
+            return None
+        if validators is not None and validators != _validators(entry):
+            # The entry has been replaced since the request was made
+            return None
+        # The modification time records when an entry was last used
+        try:
+            os.utime(path, None)
+        except OSError:
+            pass
+        self.hits += 1
+
+        response = requests.Response()
+        response.status_code = entry['status_code']
+        response.headers.update(entry['headers'])
+        response.encoding = entry.get('encoding')
+        response.url = url
+        response._content = content
+        response._content_consumed = True
+        return response
+
+    def set(self, url, response):
+        """Store a response if it can be revalidated"""
+        etag = response.headers.get('etag')
+        last_modified = response.headers.get('last-modified')
+        if not (etag or last_modified):
+            return
+        entry = {
+            'url': url,
+            'etag': etag,
+            'last_modified': last_modified,
+            'status_code': response.status_code,
+            'headers': dict(response.headers),
+            'encoding': response.encoding,
+        }
+        path = self._path(url)
+        content = response.content
+        if isinstance(content, six.text_type):
+            content = content.encode('utf-8')
+        entry['digest'] = hashlib.sha1(content).hexdigest()
+        try:
+            if not os.path.isdir(self.cache_dir):
+                os.makedirs(self.cache_dir, 0o700)
+            # Temporary files start with tmp, which _evict() skips
+            fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir)
+            try:
+                with os.fdopen(fd, 'wb') as f:
+                    f.write(content)
+                os.rename(tmp_path, path)
+            except Exception:
+                os.unlink(tmp_path)
+                raise
+            utils.write_json_file(path + '.json', entry)
+        except (IOError, OSError) as e:
+            LOG.debug('unable to write http cache %s: %s', path, e)
+            return
+
+        # The first write of a run always checks the size, so the cache
+        # is kept in bounds by short runs too
+        if self._unchecked_writes is None:
+            self._unchecked_writes = EVICT_INTERVAL
+        self._unchecked_writes += 1
+        self._unchecked_size += len(content)
+        if self._unchecked_writes >= EVICT_INTERVAL or \
+                self._unchecked_size >= self.max_size // 10:
+            self._evict()
+            self._unchecked_writes = 0
+            self._unchecked_size = 0
+
+    def invalidate(self, url):
+        """Drop the cached responses for a resource and its collection
+
+        Called for every request that may change the resource at url.
+        """
+        paths = [_path_of(url)]
+        parent = paths[0].rsplit('/', 1)[0]
+        if '://' in parent and not parent.endswith(':/'):
+            paths.append(parent)
+        prefixes = tuple(_hash(p) + '-' for p in paths)
+        for name in self._list():
+            if name.startswith(prefixes):
+                self._remove(name)
+
+    def _list(self):
+        try:
+            return os.listdir(self.cache_dir)
+        except OSError:
+            return []
+
+    def _remove(self, name):
+        try:
+            os.unlink(os.path.join(self.cache_dir, name))
+        except OSError:
+            pass
+
+    def _evict(self):
+        """Remove the least recently used bodies over max_size"""
+        bodies = []
+        total = 0
+        for name in self._list():
+            if name.endswith('.json') or name.startswith('tmp'):
+                continue
+            try:
+                st = os.stat(os.path.join(self.cache_dir, name))
+            except OSError:
+                continue
+            bodies.append((st.st_mtime, st.st_size, name))
+            total += st.st_size
+        if total <= self.max_size:
+            return
+        for mtime, size, name in sorted(bodies):
+            LOG.debug('evicting %s from http cache', name)
+            self._remove(name + '.json')
+            self._remove(name)
+            total -= size
+            if total <= self.max_size:
+                break
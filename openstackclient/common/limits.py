@@ -64,7 +64,8 @@ class ShowLimits(lister.Lister):
             compute_limits = compute_limits.absolute
             volume_limits = volume_limits.absolute
             columns = ["Name", "Value"]
-            return (columns, (utils.get_item_properties(s, columns)
+            get_row = utils.item_properties_getter(columns)
+            return (columns, (get_row(s)
                     for s in itertools.chain(compute_limits, volume_limits)))
 
         elif parsed_args.is_rate:
@@ -72,7 +73,8 @@ class ShowLimits(lister.Lister):
             volume_limits = volume_limits.rate
             columns = ["Verb", "URI", "Value", "Remain", "Unit",
                        "Next Available"]
-            return (columns, (utils.get_item_properties(s, columns)
+            get_row = utils.item_properties_getter(columns)
+            return (columns, (get_row(s)
                     for s in itertools.chain(compute_limits, volume_limits)))
 
         else:
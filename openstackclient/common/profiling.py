@@ -0,0 +1,197 @@
+#   Copyright 2013 OpenStack Foundation
+#
+#   Licensed under the Apache License, Version 2.0 (the "License"); you may
+#   not use this file except in compliance with the License. You may obtain
+#   a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#   WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#   License for the specific language governing permissions and limitations
+#   under the License.
+#
+
+"""Profile the CPU time and memory used by a command"""
+
+import cProfile
+import gc
+import os
+import pstats
+import time
+
+import six
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+try:
+    import tracemalloc
+except ImportError:
+    tracemalloc = None
+
+
+# Number of functions and allocation sites to list in the report
+DEFAULT_TOP = 25
+
+# Builtins that block waiting on the network
+WAIT_FUNCTIONS = ('_socket.', '_ssl.', 'select', 'poll')
+
+# Code that formats the output of a command
+FORMAT_FILES = (
+    os.path.join('cliff', 'formatters'),
+    os.path.join('cliff', 'display.py'),
+    os.path.join('cliff', 'lister.py'),
+    os.path.join('cliff', 'show.py'),
+    'prettytable',
+)
+FORMAT_FUNCTIONS = (
+    'format_dict',
+    'format_list',
+    'get_dict_properties',
+    'get_formatted_row',
+    'get_item_properties',
+    'get_row',
+    'get_selected_row',
+)
+
+
+def get_category(key):
+    """Return where the time spent in a profiled function belongs
+
+    :param key: a pstats (filename, line, function name) key
+    :rtype: 'api' for network waits, 'format' for output formatting,
+            None for other builtins, whose time belongs to their caller,
+            or 'local' for everything else
+    """
+    filename, line, name = key
+    if filename == '~':
+        if any(f in name for f in WAIT_FUNCTIONS):
+            return 'api'
+        return None
+    if any(f in filename for f in FORMAT_FILES) or \
+            name in FORMAT_FUNCTIONS:
+        return 'format'
+    return 'local'
+
+
+def get_breakdown(stats):
+    """Split the time in a profile between API waits and local work
+
+    Each function's own time is counted once, so a listing that fetches
+    pages while it is being formatted is still split correctly.
+
+    :param stats: a pstats.Stats
+    :rtype: a dict of seconds for 'api', 'format' and 'local'
+    """
+    breakdown = {'api': 0.0, 'format': 0.0, 'local': 0.0}
+    for key, (cc, nc, tt, ct, callers) in stats.stats.items():
+        category = get_category(key)
+        if category:
+            breakdown[category] += tt
+            continue
+        for caller, edge in callers.items():
+            # Each edge is (calls, primitive calls, own time, cumulative)
+            breakdown[get_category(caller) or 'local'] += edge[2]
+    return breakdown
+
+
+class Profiler(object):
+    """Profiles the code run between start() and stop()
+
+    The CPU profile is made with cProfile.  The memory profile uses
+    tracemalloc where it is available, and otherwise counts the objects
+    of each type that were created and are still alive at the end.
+    """
+
+    def __init__(self, cpu=True, memory=False, top=DEFAULT_TOP):
+        self.top = top
+        self.elapsed = 0.0
+        self._cpu = cProfile.Profile() if cpu else None
+        self._memory = memory
+        self._start = None
+        self._objects = None
+        self._snapshot = None
+        self._max_rss = None
+
+    def start(self):
+        if self._memory:
+            if tracemalloc:
+                tracemalloc.start()
+            else:
+                self._objects = _count_objects()
+            self._max_rss = _get_max_rss()
+        self._start = time.time()
+        if self._cpu:
+            self._cpu.enable()
+
+    def stop(self):
+        if self._cpu:
+            self._cpu.disable()
+        self.elapsed = time.time() - self._start
+        if self._memory:
+            if tracemalloc:
+                self._snapshot = tracemalloc.take_snapshot()
+                tracemalloc.stop()
+            else:
+                counts = _count_objects()
+                self._objects = sorted(
+                    ((count - self._objects.get(name, 0), name)
+                     for name, count in counts.items()),
+                    reverse=True,
+                )
+
+    def dump_stats(self, filename):
+        """Write the CPU profile in the format pstats reads"""
+        self._cpu.dump_stats(filename)
+
+    def report(self):
+        """Return the text report of the profile"""
+        out = six.StringIO()
+        out.write('Total: %.3fs\n' % self.elapsed)
+        if self._cpu:
+            stats = pstats.Stats(self._cpu, stream=out)
+            breakdown = get_breakdown(stats)
+            out.write('API wait: %.3fs\n' % breakdown['api'])
+            out.write('Output formatting: %.3fs\n' % breakdown['format'])
+            out.write('Other local work: %.3fs\n\n' % breakdown['local'])
+            stats.sort_stats('cumulative').print_stats(self.top)
+        if self._memory:
+            self._report_memory(out)
+        return out.getvalue()
+
+    def _report_memory(self, out):
+        max_rss = _get_max_rss()
+        if max_rss is not None:
+            out.write('Peak RSS: %d KiB (%+d KiB)\n' % (
+                max_rss,
+                max_rss - self._max_rss,
+            ))
+        if self._snapshot:
+            out.write('Top allocation sites:\n')
+            for stat in self._snapshot.statistics('lineno')[:self.top]:
+                out.write('%s\n' % stat)
+        elif self._objects is not None:
+            out.write('Top new objects by type:\n')
+            for count, name in self._objects[:self.top]:
+                if count <= 0:
+                    break
+                out.write('%10d %s\n' % (count, name))
+
+
+def _count_objects():
+    gc.collect()
+    counts = {}
+    for o in gc.get_objects():
+        name = type(o).__name__
+        counts[name] = counts.get(name, 0) + 1
+    return counts
+
+
+def _get_max_rss():
+    if resource is None:
+        return None
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
@@ -0,0 +1,219 @@
+#   Copyright 2013 OpenStack Foundation
+#
+#   Licensed under the Apache License, Version 2.0 (the "License"); you may
+#   not use this file except in compliance with the License. You may obtain
+#   a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#   WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#   License for the specific language governing permissions and limitations
+#   under the License.
+#
+
+"""Collapse repeated GET requests made while running a command"""
+
+import contextlib
+import copy
+import itertools
+import logging
+import sys
+import threading
+
+import requests
+import six
+
+
+LOG = logging.getLogger(__name__)
+
+_local = threading.local()
+
+_client_ids = itertools.count(1)
+_client_ids_lock = threading.Lock()
+
+
+def client_key(client):
+    """Return a number that identifies client for as long as it exists
+
+    Unlike id(), the number is never given to another object.
+    """
+    key = getattr(client, '_request_memo_key', None)
+    if key is None:
+        with _client_ids_lock:
+            key = getattr(client, '_request_memo_key', None)
+            if key is None:
+                key = next(_client_ids)
+                client._request_memo_key = key
+    return key
+
+
+@contextlib.contextmanager
+def bypass():
+    """Send the GET requests made in this block to the server
+
+    Used by code that polls a resource for changes.  Only affects the
+    current thread.
+    """
+    old = getattr(_local, 'bypass', False)
+    _local.bypass = True
+    try:
+        yield
+    finally:
+        _local.bypass = old
+
+
+def is_bypassed():
+    return getattr(_local, 'bypass', False)
+
+
+class _Call(object):
+    """A request that has been made, or is being made"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.exc_info = None
+
+
+class RequestMemo(object):
+    """Remembers the result of each GET request until clear() is called
+
+    A GET that is the same as one already made returns a copy of the
+    first result, with its own response object and parsed body, and one
+    that is the same as a GET still in progress on another thread waits
+    for it rather than making another request.  Any
+    other request may change what a GET returns so it clears the memo.
+    Failed requests are not remembered.
+    """
+
+    def __init__(self):
+        self.saved = 0
+        self._calls = {}
+        self._lock = threading.Lock()
+
+    def clear(self):
+        """Forget all of the requests made so far"""
+        with self._lock:
+            self._calls = {}
+
+    def call(self, key, func, *args, **kwargs):
+        """Return func(*args, **kwargs), or the result it had for key"""
+        with self._lock:
+            entry = self._calls.get(key)
+            if entry is None:
+                entry = self._calls[key] = _Call()
+                owner = True
+            else:
+                self.saved += 1
+                owner = False
+
+        if owner:
+            try:
+                entry.result = _load(func(*args, **kwargs))
+            except Exception:
+                entry.exc_info = sys.exc_info()
+                with self._lock:
+                    if self._calls.get(key) is entry:
+                        del self._calls[key]
+            finally:
+                entry.done.set()
+        else:
+            LOG.debug('reusing the response to %s', key[1])
+            entry.done.wait()
+
+        if entry.exc_info:
+            six.reraise(*entry.exc_info)
+        return _copy(entry.result)
+
+    def wrap_client(self, client):
+        """Memoize the GET requests an API client library makes
+
+        Understands the HTTP clients of the keystone, nova and cinder
+        libraries, which have get() and post() methods, and of the glance
+        library, which has json_request() and raw_request() methods.
+        Only the JSON GETs of the glance library are memoized.
+        """
+        for http in (client,
+                     getattr(client, 'client', None),
+                     getattr(client, 'http_client', None)):
+            if http is None or getattr(http, '_request_memo', None):
+                continue
+            if hasattr(http, 'get') and hasattr(http, 'post'):
+                self._wrap_get(http)
+            elif hasattr(http, 'json_request'):
+                self._wrap_request(http, 'json_request', True)
+                # raw_request() returns a body that can only be read once
+                self._wrap_request(http, 'raw_request', False)
+            else:
+                continue
+            http._request_memo = self
+
+    def _wrap_get(self, http):
+        get = http.get
+
+        def memo_get(url, **kwargs):
+            if is_bypassed():
+                return get(url, **kwargs)
+            key = (client_key(http), url, repr(sorted(kwargs.items())))
+            return self.call(key, get, url, **kwargs)
+
+        http.get = memo_get
+        for name in ('post', 'put', 'patch', 'delete'):
+            if hasattr(http, name):
+                setattr(http, name, self._clearing(getattr(http, name)))
+
+    def _wrap_request(self, http, name, memoize):
+        request = getattr(http, name)
+
+        def memo_request(method, url, **kwargs):
+            if method.upper() not in ('GET', 'HEAD'):
+                self.clear()
+            if method.upper() != 'GET' or not memoize or is_bypassed():
+                return request(method, url, **kwargs)
+            key = (
+                client_key(http),
+                url,
+                name,
+                repr(sorted(kwargs.items())),
+            )
+            return self.call(key, request, method, url, **kwargs)
+
+        setattr(http, name, memo_request)
+
+    def _clearing(self, func):
+        def clearing(*args, **kwargs):
+            self.clear()
+            return func(*args, **kwargs)
+        return clearing
+
+
+def _load(result):
+    """Read the body of any response in a result so it can be copied"""
+    if isinstance(result, tuple):
+        for r in result:
+            _load(r)
+    elif isinstance(result, requests.Response):
+        result.content
+    return result
+
+
+def _copy(result):
+    """Copy the responses and parsed bodies in a result
+
+    Each caller gets objects it can change or read the body of without
+    affecting the others.
+    """
+    if isinstance(result, tuple):
+        return tuple(_copy(r) for r in result)
+    if isinstance(result, (dict, list)):
+        return copy.deepcopy(result)
+    if isinstance(result, requests.Response):
+        response = copy.copy(result)
+        response.headers = result.headers.copy()
+        # The body has been read and is bytes, which can be shared
+        response._content_consumed = True
+        response.raw = None
+        return response
+    return result
@@ -0,0 +1,162 @@
+#   Copyright 2013 OpenStack Foundation
+#
+#   Licensed under the Apache License, Version 2.0 (the "License"); you may
+#   not use this file except in compliance with the License. You may obtain
+#   a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#   WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#   License for the specific language governing permissions and limitations
+#   under the License.
+#
+
+"""Cache of name to ID lookups made by utils.find_resource()"""
+
+import json
+import logging
+import os
+import six
+import time
+
+from openstackclient.common import utils
+
+
+LOG = logging.getLogger(__name__)
+
+# Seconds a name lookup is remembered between commands
+DEFAULT_TTL = 300
+
+
+def get_resource_type(manager):
+    """Return the name of the resource type a manager handles"""
+    resource_class = manager.resource_class
+    return '%s.%s' % (resource_class.__module__, resource_class.__name__)
+
+
+def get_endpoint(manager):
+    """Return the endpoint URL a manager talks to, or ''"""
+    api = getattr(manager, 'api', None)
+    for obj in (getattr(api, 'client', None), api):
+        for attr in ('management_url', 'endpoint'):
+            url = getattr(obj, attr, None)
+            if isinstance(url, six.string_types):
+                return url
+    return ''
+
+
+class ResourceCache(object):
+    """Remembers which resource a name or ID resolved to
+
+    Resources found in this process are kept and returned as-is, so
+    resolving the same name more than once in a command costs nothing.
+    Lookups by name are also saved to cache_file for ttl seconds; a hit
+    there costs a single get() by ID, which also checks that the
+    resource still exists and still has that name.
+    """
+
+    def __init__(self, cache_file, ttl=DEFAULT_TTL):
+        self.cache_file = os.path.expanduser(cache_file)
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._resources = {}
+        self._ids = None
+        self._dirty = False
+
+    def _key(self, manager, name_or_id):
+        return '%s|%s|%s' % (
+            get_endpoint(manager),
+            get_resource_type(manager),
+            name_or_id,
+        )
+
+    def _load(self):
+        if self._ids is None:
+            try:
+                with open(self.cache_file, 'r') as f:
+                    self._ids = json.load(f)
+            except (IOError, OSError, ValueError):
+                self._ids = {}
+            now = time.time()
+            for key, (res_id, expires) in list(self._ids.items()):
+                if expires < now:
+                    del self._ids[key]
+                    self._dirty = True
+        return self._ids
+
+    def get(self, manager, name_or_id):
+        """Return the cached resource for name_or_id, or None"""
+        key = self._key(manager, name_or_id)
+        if key in self._resources:
+            self.hits += 1
+            return self._resources[key]
+
+        entry = self._load().get(key)
+        if entry:
+            try:
+                resource = manager.get(entry[0])
+            except Exception:
+                resource = None
+            if resource is not None and \
+                    _matches(manager, resource, name_or_id):
+                self.hits += 1
+                self._resources[key] = resource
+                return resource
+            LOG.debug('dropping stale cache entry for %s', name_or_id)
+            del self._ids[key]
+            self._dirty = True
+
+        self.misses += 1
+        return None
+
+    def set(self, manager, name_or_id, resource):
+        """Remember that name_or_id resolved to resource"""
+        key = self._key(manager, name_or_id)
+        self._resources[key] = resource
+        res_id = getattr(resource, 'id', None)
+        if res_id is not None and str(res_id) != str(name_or_id):
+            # Only lookups by name are worth keeping between commands
+            self._load()[key] = (res_id, time.time() + self.ttl)
+            self._dirty = True
+
+    def invalidate(self, manager, resource_id):
+        """Forget every lookup that resolved to resource_id
+
+        Commands that delete or rename a resource call this.
+        """
+        prefix = self._key(manager, '')
+        for key, resource in list(self._resources.items()):
+            if key.startswith(prefix) and \
+                    str(getattr(resource, 'id', None)) == str(resource_id):
+                del self._resources[key]
+        for key, (res_id, expires) in list(self._load().items()):
+            if key.startswith(prefix) and str(res_id) == str(resource_id):
+                del self._ids[key]
+                self._dirty = True
+
+    def save(self):
+        """Write the name lookups to cache_file if they have changed"""
+        if not self._dirty:
+            return
+        try:
+            utils.write_json_file(self.cache_file, self._ids)
+            self._dirty = False
+        except (IOError, OSError) as e:
+            LOG.debug('unable to write resource cache %s: %s',
+                      self.cache_file, e)
+
+
+def _matches(manager, resource, name_or_id):
+    """Check that a resource is still the one name_or_id refers to"""
+    if str(getattr(resource, 'id', None)) == str(name_or_id):
+        return True
+    name_attr = 'name'
+    if 'NAME_ATTR' in manager.resource_class.__dict__:
+        name_attr = manager.resource_class.NAME_ATTR
+    for attr in (name_attr, 'display_name'):
+        if getattr(resource, attr, None) == name_or_id:
+            return True
+    return False
@@ -15,9 +15,19 @@
 
 """REST API bits"""
 
+import email.utils
 import json
 import logging
+import random
 import requests
+import six
+import threading
+import time
+
+from six.moves import queue
+
+from openstackclient.common import requestmemo
+from openstackclient.common import utils
 
 try:
     from urllib.parse import urlencode
@@ -27,6 +37,32 @@ except ImportError:
 
 _logger = logging.getLogger(__name__)
 
+# Number of hosts to keep connection pools for
+DEFAULT_POOL_CONNECTIONS = 10
+# Number of connections to keep open to each host
+DEFAULT_POOL_MAXSIZE = 10
+# Number of bytes of a request or response body to log
+DEFAULT_LOG_BODY_MAX = 4096
+
+# Number of times to retry a failed request
+DEFAULT_RETRIES = 3
+# Seconds to wait before the first retry, doubled for each one after
+DEFAULT_RETRY_BACKOFF = 0.5
+# The longest wait before a retry, in seconds
+DEFAULT_RETRY_MAX_DELAY = 30
+
+# Requests that can be sent again without changing their result
+IDEMPOTENT_METHODS = ('GET', 'HEAD', 'PUT', 'DELETE', 'OPTIONS')
+# Responses that mean the same request may succeed later
+RETRY_STATUS_CODES = (413, 429, 500, 502, 503, 504)
+
+# Headers whose values are not logged
+REDACTED_HEADERS = (
+    'x-auth-token',
+    'x-storage-token',
+    'x-subject-token',
+)
+
 
 class RESTApi(object):
     """A REST api client that handles the interface from us to the server
@@ -53,19 +89,80 @@ class RESTApi(object):
         os_auth=None,
         user_agent=USER_AGENT,
         debug=None,
+        pool_connections=DEFAULT_POOL_CONNECTIONS,
+        pool_maxsize=DEFAULT_POOL_MAXSIZE,
+        pool_block=False,
+        keep_alive=True,
+        timeout=None,
+        log_body_max=DEFAULT_LOG_BODY_MAX,
+        retries=DEFAULT_RETRIES,
+        retry_backoff=DEFAULT_RETRY_BACKOFF,
+        retry_max_delay=DEFAULT_RETRY_MAX_DELAY,
+        http_cache=None,
+        request_memo=None,
+        timing=None,
         **kwargs
     ):
+        """
+        :param pool_connections: number of hosts to keep connections to
+        :param pool_maxsize: number of connections to keep to each host
+        :param pool_block: if True, wait for a free connection rather than
+                           opening more than pool_maxsize to a host
+        :param keep_alive: if False, close connections after each request
+        :param timeout: socket timeout in seconds for each request
+        :param log_body_max: number of bytes of each body to debug log
+        :param retries: number of times to retry an idempotent request that
+                        failed to connect or got a 413, 429 or 5xx response
+        :param retry_backoff: seconds to wait before the first retry, the
+                              wait is doubled for each retry after that
+        :param retry_max_delay: the longest wait before a retry
+        :param http_cache: an HTTPCache to revalidate GET responses with
+        :param request_memo: a RequestMemo to collapse repeated GETs with
+        :param timing: a Timing to record each request sent in
+        """
         self.set_auth(os_auth)
+        self.auth_source = None
         self.debug = debug
+        self.timeout = timeout
+        self.pool_maxsize = pool_maxsize
+        self.log_body_max = log_body_max
+        self.retries = retries
+        self.retry_backoff = retry_backoff
+        self.retry_max_delay = retry_max_delay
+        self.retry_count = 0
+        self.retry_time = 0.0
+        self.http_cache = http_cache
+        self.request_memo = request_memo
+        self.timing = timing
         self.session = requests.Session(**kwargs)
+        for scheme in ('http://', 'https://'):
+            self.session.mount(scheme, requests.adapters.HTTPAdapter(
+                pool_connections=pool_connections,
+                pool_maxsize=pool_maxsize,
+                pool_block=pool_block,
+            ))
 
         self.set_header('User-Agent', user_agent)
         self.set_header('Content-Type', 'application/json')
+        if not keep_alive:
+            self.set_header('Connection', 'close')
 
     def set_auth(self, os_auth):
         """Sets the current auth blob"""
         self.os_auth = os_auth
 
+    def set_auth_source(self, auth_source):
+        """Sets an object that supplies auth tokens on demand
+
+        auth_source must have an auth_token attribute and a
+        reauthenticate() method, such as a ClientManager.  If no token
+        has been set the token is fetched on the first request, so
+        nothing is authenticated until the API is actually used.
+        reauthenticate() is called once when a request is rejected
+        with a 401 and the request is retried with the new token.
+        """
+        self.auth_source = auth_source
+
     def set_header(self, header, content):
         """Sets passed in headers into the session headers
 
@@ -77,15 +174,233 @@ class RESTApi(object):
             self.session.headers[header] = content
 
     def request(self, method, url, **kwargs):
+        if self.request_memo:
+            if method.upper() not in ('GET', 'HEAD', 'OPTIONS'):
+                self.request_memo.clear()
+            elif method.upper() == 'GET' and not kwargs.get('stream') and \
+                    not requestmemo.is_bypassed():
+                key = (
+                    requestmemo.client_key(self),
+                    url,
+                    repr(sorted(kwargs.items())),
+                )
+                return self.request_memo.call(
+                    key,
+                    self._request,
+                    method,
+                    url,
+                    **kwargs
+                )
+        return self._request(method, url, **kwargs)
+
+    def _request(self, method, url, **kwargs):
+        if self.os_auth is None and self.auth_source:
+            self.set_auth(self.auth_source.auth_token)
         if self.os_auth:
             self.session.headers.setdefault('X-Auth-Token', self.os_auth)
+        if self.timeout:
+            kwargs.setdefault('timeout', self.timeout)
         if 'data' in kwargs and isinstance(kwargs['data'], type({})):
             kwargs['data'] = json.dumps(kwargs['data'])
-        log_request(method, url, headers=self.session.headers, **kwargs)
-        response = self.session.request(method, url, **kwargs)
-        log_response(response)
+
+        cache_url = None
+        plain_kwargs = kwargs
+        if self.http_cache:
+            if method.upper() == 'GET' and not kwargs.get('stream'):
+                cache_url = url
+                if kwargs.get('params'):
+                    cache_url += '?' + urlencode(sorted(
+                        kwargs['params'].items()
+                    ))
+                validators = self.http_cache.get_validators(cache_url)
+                if validators:
+                    headers = dict(kwargs.get('headers') or {})
+                    headers.update(validators)
+                    kwargs = dict(kwargs, headers=headers)
+            elif method.upper() not in ('HEAD', 'OPTIONS'):
+                self.http_cache.invalidate(url)
+
+        # Check the level here so nothing is formatted unless it is logged
+        debug = _logger.isEnabledFor(logging.DEBUG)
+        if debug:
+            log_kwargs = dict(kwargs)
+            headers = dict(self.session.headers)
+            headers.update(log_kwargs.pop('headers', None) or {})
+            log_request(
+                method,
+                url,
+                headers=headers,
+                max_body=self.log_body_max,
+                **log_kwargs
+            )
+
+        attempt = 0
+        while True:
+            try:
+                response = self._send(method, url, debug, **kwargs)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                if not self._can_retry(method, attempt, kwargs):
+                    raise
+                reason = str(e)
+                delay = self._get_backoff(attempt)
+            else:
+                if response.status_code not in RETRY_STATUS_CODES or \
+                        not self._can_retry(method, attempt, kwargs):
+                    break
+                reason = 'HTTP %d' % response.status_code
+                delay = self._get_retry_after(response)
+                if delay is None:
+                    delay = self._get_backoff(attempt)
+                elif delay > self.retry_max_delay:
+                    _logger.debug(
+                        'not retrying, Retry-After of %ds is too long',
+                        delay,
+                    )
+                    break
+            attempt += 1
+            self.retry_count += 1
+            self.retry_time += delay
+            _logger.debug(
+                'retry %d of %d for %s %s in %.2fs after %s',
+                attempt,
+                self.retries,
+                method,
+                url,
+                delay,
+                reason,
+            )
+            time.sleep(delay)
+
+        if cache_url:
+            if response.status_code == 304:
+                cached = self.http_cache.get(cache_url, validators)
+                if cached is not None:
+                    _logger.debug('not modified, using cached %s', cache_url)
+                    return cached
+                # The entry has gone since the request was made
+                response = self._send(method, url, debug, **plain_kwargs)
+            elif response.status_code == 200:
+                self.http_cache.set(cache_url, response)
         return self._error_handler(response)
 
+    def _send(self, method, url, debug, **kwargs):
+        response = self._timed_request(method, url, **kwargs)
+        if debug:
+            log_response(response, max_body=self.log_body_max)
+        if response.status_code == 401 and self.auth_source:
+            _logger.debug('token rejected, re-authenticating')
+            self.set_auth(self.auth_source.reauthenticate())
+            self.session.headers['X-Auth-Token'] = self.os_auth
+            response = self._timed_request(method, url, **kwargs)
+            if debug:
+                log_response(response, max_body=self.log_body_max)
+        return response
+
+    def _timed_request(self, method, url, **kwargs):
+        if not self.timing:
+            return self.session.request(method, url, **kwargs)
+        start = time.time()
+        status = size = None
+        try:
+            response = self.session.request(method, url, **kwargs)
+            status = response.status_code
+            size = response.headers.get('content-length')
+            if size is None and not kwargs.get('stream'):
+                size = len(response.content or '')
+            return response
+        finally:
+            self.timing.add(
+                self.timing.get_service(url),
+                method,
+                url,
+                status,
+                None if size is None else int(size),
+                time.time() - start,
+            )
+
+    def _can_retry(self, method, attempt, kwargs):
+        if attempt >= self.retries:
+            return False
+        if method.upper() not in IDEMPOTENT_METHODS:
+            return False
+        # A file being uploaded can not be read a second time
+        return not hasattr(kwargs.get('data'), 'read')
+
+    def _get_backoff(self, attempt):
+        """Return a jittered exponential backoff delay"""
+        delay = min(self.retry_backoff * 2 ** attempt, self.retry_max_delay)
+        return random.uniform(delay / 2.0, delay)
+
+    def _get_retry_after(self, response):
+        """Return the delay asked for by a Retry-After header, or None"""
+        retry_after = response.headers.get('retry-after')
+        if not retry_after:
+            return None
+        try:
+            return max(float(retry_after), 0)
+        except ValueError:
+            pass
+        date = email.utils.parsedate_tz(retry_after)
+        if date is None:
+            return None
+        return max(email.utils.mktime_tz(date) - time.time(), 0)
+
+    def batch(self, specs, concurrency=None, ordered=True):
+        """Make many requests at the same time
+
+        The requests share the session, and so its connection pool.
+        concurrency defaults to the pool size so that no request has to
+        open a connection the pool will not keep.
+
+        :param specs: an iterable of (method, url) or
+                      (method, url, kwargs) tuples for request()
+        :param concurrency: the most requests to have in progress at once
+        :param ordered: if True results are returned in the order of
+                        specs, otherwise as they complete
+        :rtype: a generator of utils.BatchResult, each with the spec as
+                its item and the response as its result, or the
+                exception raised for the request as its error
+        """
+        if not concurrency:
+            concurrency = self.pool_maxsize
+        elif concurrency > self.pool_maxsize:
+            _logger.debug(
+                'batch of %d concurrent requests will use more '
+                'connections than the pool keeps (%d)',
+                concurrency,
+                self.pool_maxsize,
+            )
+
+        def send(spec):
+            kwargs = spec[2] if len(spec) > 2 else {}
+            return self.request(spec[0], spec[1], **kwargs)
+
+        return utils.run_batch(send, specs, concurrency, ordered)
+
+    def get_pool_stats(self):
+        """Return connection pool statistics
+
+        :rtype: a dict of the number of 'pools', the number of
+                'connections' opened, the number of 'requests' made and
+                the number of requests that 'reused' an open connection
+        """
+        stats = {
+            'pools': 0,
+            'connections': 0,
+            'requests': 0,
+        }
+        for adapter in self.session.adapters.values():
+            pools = adapter.poolmanager.pools
+            for key in pools.keys():
+                pool = pools.get(key)
+                if pool is None:
+                    continue
+                stats['pools'] += 1
+                stats['connections'] += pool.num_connections
+                stats['requests'] += pool.num_requests
+        stats['reused'] = max(stats['requests'] - stats['connections'], 0)
+        return stats
+
     def create(self, url, data=None, response_key=None, **kwargs):
         response = self.request('POST', url, data=data, **kwargs)
         if response_key:
@@ -143,16 +458,126 @@ class RESTApi(object):
 
     def _error_handler(self, response):
         if response.status_code < 200 or response.status_code >= 300:
-            _logger.debug(
-                "ERROR: %s",
-                response.text,
-            )
+            if _logger.isEnabledFor(logging.DEBUG):
+                _logger.debug(
+                    "ERROR: %s",
+                    _truncate(response.content, self.log_body_max),
+                )
             response.raise_for_status()
         return response
 
 
-def log_request(method, url, **kwargs):
-    # put in an early exit if debugging is not enabled?
+class AsyncRESTApi(RESTApi):
+    """A RESTApi whose verbs return a utils.Future instead of waiting
+
+    Calls are queued for a fixed pool of worker threads that is started
+    on first use and shares the session's connection pool, so thousands
+    of requests can be outstanding without a thread for each.  request()
+    itself still waits, so existing library functions such as
+    lib.object.list_objects() can be run with submit().
+
+    A call run by a worker should not wait for another future from the
+    same AsyncRESTApi, as every worker may be busy doing the same.
+    """
+
+    def __init__(self, workers=None, **kwargs):
+        """
+        :param workers: number of worker threads, defaults to the
+                        connection pool size
+        """
+        super(AsyncRESTApi, self).__init__(**kwargs)
+        self.workers = workers or self.pool_maxsize
+        self._calls = queue.Queue()
+        self._threads = []
+        self._lock = threading.Lock()
+
+    def _start(self):
+        with self._lock:
+            while len(self._threads) < self.workers:
+                thread = threading.Thread(target=self._worker)
+                thread.daemon = True
+                thread.start()
+                self._threads.append(thread)
+
+    def _worker(self):
+        while True:
+            call = self._calls.get()
+            if call is None:
+                return
+            future, func, args, kwargs = call
+            future.run(func, *args, **kwargs)
+
+    def submit(self, func, *args, **kwargs):
+        """Call func(*args, **kwargs) on a worker thread
+
+        :rtype: a utils.Future of the result
+        """
+        if not self._threads:
+            self._start()
+        future = utils.Future()
+        self._calls.put((future, func, args, kwargs))
+        return future
+
+    def close(self):
+        """Stop the workers once the calls already submitted are done"""
+        with self._lock:
+            for thread in self._threads:
+                self._calls.put(None)
+            for thread in self._threads:
+                thread.join()
+            self._threads = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def request_async(self, method, url, **kwargs):
+        return self.submit(self.request, method, url, **kwargs)
+
+    def create(self, url, data=None, response_key=None, **kwargs):
+        return self.submit(
+            super(AsyncRESTApi, self).create,
+            url,
+            data=data,
+            response_key=response_key,
+            **kwargs
+        )
+
+    def delete(self, url):
+        return self.submit(super(AsyncRESTApi, self).delete, url)
+
+    def list(self, url, data=None, response_key=None, **kwargs):
+        return self.submit(
+            super(AsyncRESTApi, self).list,
+            url,
+            data=data,
+            response_key=response_key,
+            **kwargs
+        )
+
+    def set(self, url, data=None, response_key=None, **kwargs):
+        return self.submit(
+            super(AsyncRESTApi, self).set,
+            url,
+            data=data,
+            response_key=response_key,
+            **kwargs
+        )
+
+    def show(self, url, response_key=None, **kwargs):
+        return self.submit(
+            super(AsyncRESTApi, self).show,
+            url,
+            response_key=response_key,
+            **kwargs
+        )
+
+
+def log_request(method, url, max_body=DEFAULT_LOG_BODY_MAX, **kwargs):
+    if not _logger.isEnabledFor(logging.DEBUG):
+        return
     if 'params' in kwargs and kwargs['params'] != {}:
         url += '?' + urlencode(kwargs['params'])
 
@@ -163,26 +588,57 @@ def log_request(method, url, **kwargs):
     ]
 
     for element in kwargs['headers']:
-        header = " -H '%s: %s'" % (element, kwargs['headers'][element])
+        header = " -H '%s: %s'" % (
+            element,
+            _redact(element, kwargs['headers'][element]),
+        )
         string_parts.append(header)
 
     _logger.debug("REQ: %s" % " ".join(string_parts))
     if 'data' in kwargs:
-        _logger.debug("REQ BODY: %s\n" % (kwargs['data']))
+        _logger.debug("REQ BODY: %s\n" % _truncate(kwargs['data'], max_body))
 
 
-def log_response(response):
+def log_response(response, max_body=DEFAULT_LOG_BODY_MAX):
+    if not _logger.isEnabledFor(logging.DEBUG):
+        return
     _logger.debug(
         "RESP: [%s] %s\n",
         response.status_code,
-        response.headers,
+        dict((k, _redact(k, v)) for k, v in response.headers.items()),
     )
     if response._content_consumed:
         _logger.debug(
             "RESP BODY: %s\n",
-            response.text,
+            _truncate(response.content, max_body),
         )
     _logger.debug(
         "encoding: %s",
         response.encoding,
     )
+
+
+def _redact(header, value):
+    """Hide the value of headers that carry credentials"""
+    if header.lower() in REDACTED_HEADERS:
+        return '<redacted>'
+    return value
+
+
+def _truncate(body, max_body):
+    """Return at most max_body bytes of a body for logging
+
+    Only the part that is logged is decoded.
+    """
+    if not isinstance(body, (six.binary_type, six.text_type)):
+        return body
+    if max_body is not None and len(body) > max_body:
+        more = len(body) - max_body
+        body = body[:max_body]
+    else:
+        more = 0
+    if isinstance(body, six.binary_type):
+        body = body.decode('utf-8', 'replace')
+    if more:
+        body = '%s... (%d more bytes)' % (body, more)
+    return body
@@ -0,0 +1,219 @@
+#   Copyright 2013 OpenStack Foundation
+#
+#   Licensed under the Apache License, Version 2.0 (the "License"); you may
+#   not use this file except in compliance with the License. You may obtain
+#   a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#   WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#   License for the specific language governing permissions and limitations
+#   under the License.
+#
+
+"""Record how long each HTTP request made by a command takes"""
+
+import threading
+import time
+
+import prettytable
+import six
+
+try:
+    from urllib.parse import urlsplit
+except ImportError:
+    from urlparse import urlsplit
+
+
+class Request(object):
+    """One HTTP request and how long it took"""
+
+    def __init__(self, service, method, url, status, size, elapsed):
+        self.service = service
+        self.method = method
+        self.url = url
+        self.status = status
+        self.size = size
+        self.elapsed = elapsed
+
+
+class Timing(object):
+    """Records the HTTP requests made while running a command
+
+    Requests are grouped by service type.  Requests made by the API
+    client libraries are recorded by wrap_client(), which also notes
+    the endpoint of each client.  Requests made through RESTApi are
+    recorded by the RESTApi itself and get the service type of the
+    endpoint they were sent to, or the host if that is not known.
+    """
+
+    def __init__(self):
+        self.requests = []
+        # endpoint URL -> service type
+        self.endpoints = {}
+        self._lock = threading.Lock()
+
+    def add(self, service, method, url, status, size, elapsed):
+        """Record a request
+
+        :param status: the response status code, or None
+        :param size: the length of the response body, or None
+        :param elapsed: the seconds the request took
+        """
+        with self._lock:
+            self.requests.append(
+                Request(service, method, url, status, size, elapsed)
+            )
+
+    def clear(self):
+        with self._lock:
+            self.requests = []
+
+    def add_endpoint(self, url, service_type):
+        """Group the requests sent under url with service_type"""
+        with self._lock:
+            self.endpoints[url.rstrip('/')] = service_type
+
+    def get_service(self, url):
+        """Return the service type requests to url are grouped under
+
+        This is the service type of the longest endpoint url starts
+        with, or the host of url if it is under no known endpoint.
+        """
+        best = ''
+        for endpoint in list(self.endpoints):
+            if len(endpoint) > len(best) and \
+                    (url == endpoint or url.startswith(endpoint + '/')):
+                best = endpoint
+        if best:
+            return self.endpoints[best]
+        return get_service(url)
+
+    def wrap_client(self, client, service_type):
+        """Record the requests an API client library makes
+
+        Understands the HTTP clients of the keystone, nova and cinder
+        libraries, which send requests with request(url, method), and of
+        the glance library, which uses _http_request(url, method).
+        Requests sent through RESTApi to the endpoint of client are
+        grouped with it as well.
+
+        :param client: a client made by an API client library
+        :param service_type: the service type of the client
+        """
+        for http in (client,
+                     getattr(client, 'client', None),
+                     getattr(client, 'http_client', None)):
+            if http is None:
+                continue
+            for name in ('endpoint', 'management_url'):
+                url = getattr(http, name, None)
+                if isinstance(url, six.string_types) and '://' in url:
+                    self.add_endpoint(url, service_type)
+            if getattr(http, '_timing', None):
+                continue
+            if hasattr(http, '_http_request'):
+                self._wrap(
+                    service_type, http, '_http_request', _httplib_result,
+                )
+            elif hasattr(http, 'request') and hasattr(http, 'get'):
+                self._wrap(service_type, http, 'request', _requests_result)
+            else:
+                continue
+            http._timing = self
+
+    def _wrap(self, service, http, name, get_result):
+        request = getattr(http, name)
+        endpoint = getattr(http, 'endpoint', None) or ''
+
+        def timed_request(url, method, **kwargs):
+            start = time.time()
+            status = size = None
+            try:
+                resp, body = request(url, method, **kwargs)
+                status, size = get_result(resp)
+                return resp, body
+            except Exception as e:
+                status = getattr(e, 'code', None)
+                raise
+            finally:
+                if '://' not in url:
+                    url = endpoint + url
+                self.add(
+                    service,
+                    method,
+                    url,
+                    status,
+                    size,
+                    time.time() - start,
+                )
+
+        setattr(http, name, timed_request)
+
+    def get_totals(self):
+        """Return the number of requests, bytes and seconds per service
+
+        :rtype: a list of (service, requests, bytes, seconds) tuples
+                with the slowest service first
+        """
+        totals = {}
+        for request in self.requests:
+            total = totals.setdefault(request.service, [0, 0, 0.0])
+            total[0] += 1
+            total[1] += request.size or 0
+            total[2] += request.elapsed
+        return sorted(
+            ((service,) + tuple(total) for service, total in totals.items()),
+            key=lambda t: t[3],
+            reverse=True,
+        )
+
+    def report(self):
+        """Return tables of the requests and the totals per service"""
+        requests = prettytable.PrettyTable(
+            ['Service', 'Method', 'URL', 'Status', 'Bytes', 'Seconds'],
+        )
+        requests.align = 'l'
+        for r in self.requests:
+            requests.add_row([
+                r.service,
+                r.method,
+                r.url,
+                '' if r.status is None else r.status,
+                '' if r.size is None else r.size,
+                '%.3f' % r.elapsed,
+            ])
+        totals = prettytable.PrettyTable(
+            ['Service', 'Requests', 'Bytes', 'Seconds'],
+        )
+        totals.align = 'l'
+        for service, count, size, elapsed in self.get_totals():
+            totals.add_row([service, count, size, '%.3f' % elapsed])
+        totals.add_row([
+            'Total',
+            len(self.requests),
+            sum(r.size or 0 for r in self.requests),
+            '%.3f' % sum(r.elapsed for r in self.requests),
+        ])
+        return '%s\n%s\n' % (requests.get_string(), totals.get_string())
+
+
+def get_service(url):
+    """Return the name requests to url are grouped under when its
+    service type is not known
+    """
+    return urlsplit(url).netloc or url
+
+
+def _requests_result(resp):
+    size = resp.headers.get('content-length')
+    if size is None:
+        size = len(resp.content or '')
+    return resp.status_code, int(size)
+
+
+def _httplib_result(resp):
+    size = resp.getheader('content-length')
+    return resp.status, None if size is None else int(size)
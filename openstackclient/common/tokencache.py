@@ -0,0 +1,111 @@
+#   Copyright 2013 OpenStack Foundation
+#
+#   Licensed under the Apache License, Version 2.0 (the "License"); you may
+#   not use this file except in compliance with the License. You may obtain
+#   a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#   WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#   License for the specific language governing permissions and limitations
+#   under the License.
+#
+
+"""On-disk cache of authentication tokens and service catalogs"""
+
+import calendar
+import hashlib
+import json
+import logging
+import os
+import time
+
+from openstackclient.common import utils
+
+
+LOG = logging.getLogger(__name__)
+
+# Treat tokens this close to expiry as already expired, in seconds
+STALE_TOKEN_DURATION = 30
+
+
+class TokenCache(object):
+    """Stores auth_ref blobs from the Identity client on disk
+
+    Each entry is kept in its own file named for a hash of the
+    auth URL, username, project and region so that different credential
+    sets never share a token.  The cache directory is created mode 0700
+    and the entry files mode 0600.
+    """
+
+    def __init__(self, cache_dir, stale_duration=STALE_TOKEN_DURATION):
+        self.cache_dir = os.path.expanduser(cache_dir)
+        self.stale_duration = stale_duration
+
+    @staticmethod
+    def make_key(auth_url, username, project, region_name):
+        """Return the cache key for a set of credentials"""
+        key = '|'.join([str(auth_url or ''), str(username or ''),
+                        str(project or ''), str(region_name or '')])
+        return hashlib.sha1(key.encode('utf-8')).hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, key)
+
+    def get(self, key):
+        """Return the cached auth_ref dict for key
+
+        Returns None if there is no entry, the entry can not be read or
+        the token is expired or about to expire.
+        """
+        path = self._path(key)
+        try:
+            with open(path, 'r') as f:
+                entry = json.load(f)
+        except (IOError, OSError, ValueError):
+            return None
+
+        if entry.get('expires', 0) < time.time() + self.stale_duration:
+            LOG.debug('cached token %s has expired', key)
+            self.delete(key)
+            return None
+
+        LOG.debug('using cached token %s', key)
+        return entry.get('auth_ref')
+
+    def set(self, key, auth_ref):
+        """Store an auth_ref in the cache
+
+        :param key: cache key from make_key()
+        :param auth_ref: a keystoneclient AccessInfo object
+        """
+        if not auth_ref:
+            return
+        entry = {
+            'expires': _to_timestamp(auth_ref.expires),
+            'auth_ref': dict(auth_ref),
+        }
+        try:
+            utils.write_json_file(self._path(key), entry)
+        except (IOError, OSError) as e:
+            LOG.warning('Unable to write token cache %s: %s',
+                        self.cache_dir, e)
+            return
+        LOG.debug('cached token %s', key)
+
+    def delete(self, key):
+        """Remove an entry from the cache"""
+        try:
+            os.unlink(self._path(key))
+        except OSError:
+            pass
+
+
+def _to_timestamp(dt):
+    """Convert a (possibly tz-aware) datetime into a UTC epoch timestamp"""
+    offset = dt.utcoffset()
+    if offset is not None:
+        dt = dt.replace(tzinfo=None) - offset
+    return calendar.timegm(dt.timetuple())
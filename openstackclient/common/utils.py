@@ -15,19 +15,60 @@
 
 """Common client utilities"""
 
+import json
+import operator
 import os
 import six
 import sys
-import time
+import tempfile
+import threading
 import uuid
 
+from six.moves import queue
+
 from openstackclient.common import exceptions
+from openstackclient.common import waiter
 from openstackclient.openstack.common import strutils
 
 
+# The ResourceCache used by find_resource(), if any
+_resource_cache = None
+
+
+def get_resource_cache():
+    """Return the ResourceCache used by find_resource(), or None"""
+    return _resource_cache
+
+
+def set_resource_cache(cache):
+    """Set the ResourceCache used by find_resource(), None disables it"""
+    global _resource_cache
+    _resource_cache = cache
+
+
+def invalidate_resource(manager, resource_id):
+    """Drop cached find_resource() lookups of a deleted or renamed resource
+
+    :param manager: the manager the resource was found with
+    :param resource_id: the ID of the resource
+    """
+    if _resource_cache is not None:
+        _resource_cache.invalidate(manager, resource_id)
+
+
 def find_resource(manager, name_or_id):
     """Helper for the _find_* methods."""
 
+    if _resource_cache is not None:
+        resource = _resource_cache.get(manager, name_or_id)
+        if resource is None:
+            resource = _find_resource(manager, name_or_id)
+            _resource_cache.set(manager, name_or_id, resource)
+        return resource
+    return _find_resource(manager, name_or_id)
+
+
+def _find_resource(manager, name_or_id):
     # Try to get entity as integer id
     try:
         if isinstance(name_or_id, int) or name_or_id.isdigit():
@@ -76,6 +117,20 @@ def find_resource(manager, name_or_id):
             raise
 
 
+def get_resource_map(manager, key='id'):
+    """Return every resource a manager lists in a dict keyed by key
+
+    Listers that show a related resource's name on each row should
+    fetch the related resources once with this and join locally
+    rather than calling find_resource() for each row.
+
+    :param manager: the manager to list resources from
+    :param key: the resource attribute to index by
+    :rtype: a dict of resources
+    """
+    return dict((getattr(r, key), r) for r in manager.list())
+
+
 def format_dict(data):
     """Return a formatted string of key value pairs
 
@@ -139,6 +194,418 @@ def get_dict_properties(item, fields, mixed_case_fields=[], formatters={}):
     return tuple(row)
 
 
+def get_selected_columns(parsed_args, columns, column_headers=None):
+    """Return the columns of a listing that were asked for with -c
+
+    Listers use this to skip formatting, and any lookups made only for
+    formatting, for columns that are not displayed.  When no column was
+    asked for, or none that the listing has, all columns are returned
+    and cliff reports the bad names.
+
+    :param parsed_args: the parsed arguments of a Lister
+    :param columns: tuple of field names used to build the rows
+    :param column_headers: tuple of the displayed column names, if they
+       differ from columns
+    :rtype: a tuple of field names from columns
+    """
+    wanted = getattr(parsed_args, 'columns', None)
+    if not wanted:
+        return tuple(columns)
+    if column_headers is None:
+        column_headers = columns
+    selected = tuple(
+        field
+        for field, header in zip(columns, column_headers)
+        if header in wanted
+    )
+    return selected or tuple(columns)
+
+
+def item_properties_getter(fields, mixed_case_fields=[], formatters={},
+                           selected=None):
+    """Return a function that does get_item_properties() for fields
+
+    The attribute names and formatters are worked out once, so a Lister
+    can make one getter and call it for every row.
+
+    :param fields: tuple of strings with the desired field names
+    :param mixed_case_fields: tuple of field names to preserve case
+    :param formatters: dictionary mapping field names to callables
+       to format the values
+    :param selected: the fields that will be displayed, see
+       get_selected_columns(); the others are '' and not formatted
+    :rtype: a function that takes an item and returns a tuple
+    """
+    indexes, kept = _select_fields(fields, selected)
+    names = _get_field_names(kept, mixed_case_fields)
+    get_all = _multi_getter(operator.attrgetter, names)
+
+    def get_row(item):
+        try:
+            return get_all(item)
+        except AttributeError:
+            # Missing attributes are '', as in get_item_properties()
+            return tuple(getattr(item, name, '') for name in names)
+
+    get_row = _add_formatters(get_row, kept, formatters)
+    return _pad_row(get_row, len(fields), indexes)
+
+
+def dict_properties_getter(fields, mixed_case_fields=[], formatters={},
+                           selected=None):
+    """Return a function that does get_dict_properties() for fields
+
+    :param fields: tuple of strings with the desired field names
+    :param mixed_case_fields: tuple of field names to preserve case
+    :param formatters: dictionary mapping field names to callables
+       to format the values
+    :param selected: the fields that will be displayed, see
+       get_selected_columns(); the others are '' and not formatted
+    :rtype: a function that takes a dict and returns a tuple
+    """
+    indexes, kept = _select_fields(fields, selected)
+    names = _get_field_names(kept, mixed_case_fields)
+    get_all = _multi_getter(operator.itemgetter, names)
+
+    def get_row(item):
+        try:
+            return get_all(item)
+        except KeyError:
+            return tuple(
+                item[name] if name in item else '' for name in names
+            )
+
+    get_row = _add_formatters(get_row, kept, formatters)
+    return _pad_row(get_row, len(fields), indexes)
+
+
+def _select_fields(fields, selected):
+    """Return the indexes and names of the selected fields"""
+    indexes = [
+        i for i, field in enumerate(fields)
+        if selected is None or field in selected
+    ]
+    return indexes, [fields[i] for i in indexes]
+
+
+def _pad_row(get_row, width, indexes):
+    """Return a getter that puts '' in the columns not in indexes"""
+    if len(indexes) == width:
+        return get_row
+
+    def get_selected_row(item):
+        row = [''] * width
+        for i, value in zip(indexes, get_row(item)):
+            row[i] = value
+        return tuple(row)
+
+    return get_selected_row
+
+
+def _get_field_names(fields, mixed_case_fields):
+    names = []
+    for field in fields:
+        if field in mixed_case_fields:
+            names.append(field.replace(' ', '_'))
+        else:
+            names.append(field.lower().replace(' ', '_'))
+    return names
+
+
+def _multi_getter(getter, names):
+    """Return a getter for names that always returns a tuple"""
+    if not names:
+        return lambda item: ()
+    if len(names) == 1:
+        get_one = getter(names[0])
+        return lambda item: (get_one(item),)
+    return getter(*names)
+
+
+def _add_formatters(get_row, fields, formatters):
+    formats = [
+        (i, formatters[field])
+        for i, field in enumerate(fields)
+        if field in formatters
+    ]
+    if not formats:
+        return get_row
+
+    def get_formatted_row(item):
+        row = list(get_row(item))
+        for i, formatter in formats:
+            row[i] = formatter(row[i])
+        return tuple(row)
+
+    return get_formatted_row
+
+
+def write_json_file(path, data, mode=0o600):
+    """Atomically replace a file with data serialized as JSON
+
+    The data is written to a temporary file that is renamed into place
+    so a concurrent reader never sees a partial file.  Missing parent
+    directories are created mode 0700.
+
+    :param path: the file to write
+    :param data: a JSON-serializable object
+    :param mode: permission bits for the file
+    """
+    path_dir = os.path.dirname(path) or os.curdir
+    if not os.path.isdir(path_dir):
+        os.makedirs(path_dir, 0o700)
+    fd, tmp_path = tempfile.mkstemp(dir=path_dir)
+    try:
+        os.chmod(tmp_path, mode)
+        with os.fdopen(fd, 'w') as f:
+            json.dump(data, f)
+        os.rename(tmp_path, path)
+    except Exception:
+        os.unlink(tmp_path)
+        raise
+
+
+def prefetch(iterable, depth=1):
+    """Iterate over iterable in a background thread
+
+    Up to depth items are fetched ahead of the caller, so work done on
+    one item overlaps with the wait for the next.  A depth of 0 fetches
+    without limit.  The background thread starts straight away.
+
+    :param iterable: the items to iterate over
+    :param depth: the maximum number of items to fetch ahead
+    :rtype: a Prefetcher
+    """
+    return Prefetcher(iterable, depth)
+
+
+class Prefetcher(object):
+    """Iterator over items fetched by a background thread
+
+    Exceptions raised by the wrapped iterable are re-raised by next().
+    close() stops the background thread once it has finished fetching
+    its current item; it is called when the last item has been read.
+    """
+
+    _end = object()
+
+    def __init__(self, iterable, depth=1):
+        self._items = queue.Queue(maxsize=depth)
+        self._stop = threading.Event()
+        self._done = False
+        thread = threading.Thread(target=self._worker, args=(iterable,))
+        thread.daemon = True
+        thread.start()
+
+    def _put(self, item):
+        while not self._stop.is_set():
+            try:
+                self._items.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def _worker(self, iterable):
+        try:
+            for item in iterable:
+                if not self._put((item, None)):
+                    return
+        except Exception:
+            self._put((self._end, sys.exc_info()))
+        else:
+            self._put((self._end, None))
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        if self._done:
+            raise StopIteration
+        item, exc_info = self._items.get()
+        if item is self._end:
+            self.close()
+            if exc_info:
+                six.reraise(*exc_info)
+            raise StopIteration
+        return item
+
+    next = __next__
+
+    def close(self):
+        """Stop fetching items"""
+        self._done = True
+        self._stop.set()
+
+
+# Number of threads run_batch() uses by default
+DEFAULT_BATCH_CONCURRENCY = 10
+
+
+class BatchResult(object):
+    """The outcome of one item given to run_batch()"""
+
+    def __init__(self, index, item, result=None, error=None):
+        self.index = index
+        self.item = item
+        self.result = result
+        self.error = error
+
+    @property
+    def ok(self):
+        return self.error is None
+
+    def __repr__(self):
+        return '<BatchResult %d %s>' % (
+            self.index,
+            'ok' if self.ok else 'error=%r' % self.error,
+        )
+
+
+class Future(object):
+    """The result of a call being made on another thread"""
+
+    def __init__(self):
+        self._done = threading.Event()
+        self._result = None
+        self._exc_info = None
+
+    def done(self):
+        return self._done.is_set()
+
+    def wait(self, timeout=None):
+        """Wait for the call to finish
+
+        :rtype: True if the call has finished
+        """
+        self._done.wait(timeout)
+        return self._done.is_set()
+
+    def result(self):
+        """Return the call's result, or raise its exception"""
+        self._done.wait()
+        if self._exc_info:
+            six.reraise(*self._exc_info)
+        return self._result
+
+    def exception(self):
+        """Return the exception the call raised, or None"""
+        self._done.wait()
+        return self._exc_info[1] if self._exc_info else None
+
+    def run(self, func, *args, **kwargs):
+        """Make the call and record its outcome"""
+        try:
+            self._result = func(*args, **kwargs)
+        except Exception:
+            self._exc_info = sys.exc_info()
+        finally:
+            self._done.set()
+
+
+def run_batch(func, items, concurrency=DEFAULT_BATCH_CONCURRENCY,
+              ordered=True):
+    """Call func(item) for each item using a pool of threads
+
+    At most concurrency calls run at once and only a few items are taken
+    from items ahead of the calls, so items may be a long generator.  An
+    exception raised by func is returned in that item's BatchResult and
+    does not stop the others.  If the caller stops early the remaining
+    items are not started and the threads exit once their calls return.
+    Anything else func raises, such as SystemExit, is raised again by
+    the generator.
+
+    :param func: the function to call with each item
+    :param items: an iterable of items
+    :param concurrency: the number of threads to use
+    :param ordered: if True results are returned in the order of items,
+                    otherwise as they complete
+    :rtype: a generator of BatchResult
+    """
+
+    concurrency = max(int(concurrency), 1)
+    work = queue.Queue(maxsize=concurrency * 2)
+    results = queue.Queue()
+    stop = threading.Event()
+
+    def put(item):
+        while not stop.is_set():
+            try:
+                work.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def feeder():
+        count = 0
+        exc_info = None
+        try:
+            for index, item in enumerate(items):
+                if not put((index, item)):
+                    break
+                count += 1
+        except BaseException:
+            exc_info = sys.exc_info()
+        finally:
+            # After a stop these are not queued, the workers see the
+            # stop instead
+            for i in range(concurrency):
+                put(None)
+            results.put((count, exc_info))
+
+    def worker():
+        while not stop.is_set():
+            try:
+                job = work.get(timeout=0.1)
+            except queue.Empty:
+                continue
+            if job is None:
+                return
+            index, item = job
+            # Every job posts a result, or the caller would wait for it
+            # forever
+            try:
+                result = BatchResult(index, item, result=func(item))
+            except BaseException as e:
+                result = BatchResult(index, item, error=e)
+            results.put(result)
+
+    threads = [threading.Thread(target=feeder, name='run_batch-feeder')]
+    threads.extend(
+        threading.Thread(target=worker, name='run_batch-worker')
+        for i in range(concurrency)
+    )
+    for thread in threads:
+        thread.daemon = True
+        thread.start()
+
+    total = None
+    received = 0
+    pending = {}
+    next_index = 0
+    try:
+        while total is None or received < total:
+            result = results.get()
+            if not isinstance(result, BatchResult):
+                total, exc_info = result
+                if exc_info:
+                    six.reraise(*exc_info)
+                continue
+            received += 1
+            if not isinstance(result.error, (type(None), Exception)):
+                raise result.error
+            if not ordered:
+                yield result
+                continue
+            pending[result.index] = result
+            while next_index in pending:
+                yield pending.pop(next_index)
+                next_index += 1
+    finally:
+        stop.set()
+
+
 def string_to_bool(arg):
     return arg.strip().lower() in ('t', 'true', 'yes', '1')
 
@@ -189,29 +656,27 @@ def wait_for_status(status_f,
                     res_id,
                     status_field='status',
                     success_status=['active'],
-                    sleep_time=5,
-                    callback=None):
+                    sleep_time=waiter.DEFAULT_MAX_INTERVAL,
+                    callback=None,
+                    timeout=None):
     """Wait for status change on a resource during a long-running operation
 
+    Polls soon after the operation starts and backs off to sleep_time,
+    see waiter.Waiter.
+
     :param status_f: a status function that takes a single id argument
     :param res_id: the resource id to watch
     :param success_status: a list of status strings for successful completion
     :param status_field: the status attribute in the returned resource object
-    :param sleep_time: wait this long (seconds)
+    :param sleep_time: the longest time to wait between polls (seconds)
     :param callback: called per sleep cycle, useful to display progress
+    :param timeout: raise CommandError after this many seconds
     :rtype: True on success
     """
-    while True:
-        res = status_f(res_id)
-        status = getattr(res, status_field, '').lower()
-        if status in success_status:
-            retval = True
-            break
-        elif status == 'error':
-            retval = False
-            break
-        if callback:
-            progress = getattr(res, 'progress', None) or 0
-            callback(progress)
-        time.sleep(sleep_time)
-    return retval
+    return waiter.Waiter(
+        status_f,
+        status_field=status_field,
+        success_status=success_status,
+        timeout=timeout,
+        backoff=waiter.Backoff(maximum=sleep_time),
+    ).wait([res_id], callback=callback)[res_id]
@@ -0,0 +1,225 @@
+#   Copyright 2013 OpenStack Foundation
+#
+#   Licensed under the Apache License, Version 2.0 (the "License"); you may
+#   not use this file except in compliance with the License. You may obtain
+#   a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#   WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#   License for the specific language governing permissions and limitations
+#   under the License.
+#
+
+"""Wait for resources to reach a status
+
+The time between polls starts short and backs off while nothing
+changes, with some jitter so that many clients do not poll in step.
+When a list function is given, all of the resources still being waited
+for are polled with one list request for the resources updated since
+the oldest of them last changed, instead of one GET each.
+"""
+
+import random
+import time
+
+from openstackclient.common import exceptions
+from openstackclient.common import requestmemo
+
+# Seconds between the first polls
+DEFAULT_INITIAL_INTERVAL = 1
+
+# The longest time between polls
+DEFAULT_MAX_INTERVAL = 5
+
+# How much the interval grows after each poll that saw no change
+DEFAULT_BACKOFF = 1.5
+
+# Each interval is changed by up to this fraction of itself
+DEFAULT_JITTER = 0.2
+
+# Seconds the shell waits for --wait to complete, 0 waits forever
+DEFAULT_WAIT_TIMEOUT = 3600
+
+
+class Backoff(object):
+    """Intervals that grow from initial to maximum, with jitter"""
+
+    def __init__(self,
+                 initial=DEFAULT_INITIAL_INTERVAL,
+                 maximum=DEFAULT_MAX_INTERVAL,
+                 factor=DEFAULT_BACKOFF,
+                 jitter=DEFAULT_JITTER):
+        self.initial = min(initial, maximum)
+        self.maximum = maximum
+        self.factor = factor
+        self.jitter = jitter
+        self.interval = self.initial
+
+    def reset(self):
+        """Go back to the initial interval, things are changing"""
+        self.interval = self.initial
+
+    def next(self):
+        """Return the time to sleep before the next poll"""
+        interval = self.interval
+        self.interval = min(self.interval * self.factor, self.maximum)
+        return interval * (1 + self.jitter * random.uniform(-1, 1))
+
+
+class Waiter(object):
+    """Polls resources until each one succeeds or fails
+
+    :param get_f: a function that takes an id and returns the resource
+    :param list_f: a function that takes a timestamp and returns the
+        resources updated since then; the timestamps come from the
+        updated attribute of the resources
+    :param status_field: the status attribute of the resources
+    :param success_status: the lower case statuses that mean success
+    :param error_status: the lower case statuses that mean failure
+    :param timeout: raise WaitTimeout after this many seconds, None or 0
+        waits forever
+    :param backoff: a Backoff for the time between polls
+    """
+
+    def __init__(self,
+                 get_f,
+                 list_f=None,
+                 status_field='status',
+                 success_status=['active'],
+                 error_status=['error'],
+                 timeout=None,
+                 backoff=None):
+        self.get_f = get_f
+        self.list_f = list_f
+        self.status_field = status_field
+        self.success_status = success_status
+        self.error_status = error_status
+        self.timeout = timeout
+        self.backoff = backoff or Backoff()
+
+    def wait(self, res_ids, callback=None):
+        """Wait for resources to reach a success or error status
+
+        :param res_ids: the ids of the resources to watch
+        :param callback: called with the lowest progress of the pending
+            resources after each poll
+        :rtype: a dict mapping each id to True on success, False on error
+        """
+        deadline = None
+        if self.timeout:
+            deadline = time.time() + self.timeout
+        results = {}
+        # The last status, progress and update time of each pending id
+        seen = dict((res_id, None) for res_id in res_ids)
+        while True:
+            changed = False
+            for res_id, res in self._poll(seen):
+                state = (
+                    self._status(res),
+                    getattr(res, 'progress', None),
+                    getattr(res, 'updated', None),
+                )
+                if state[0] in self.success_status:
+                    results[res_id] = True
+                elif state[0] in self.error_status:
+                    results[res_id] = False
+                if res_id in results:
+                    del seen[res_id]
+                    changed = True
+                    continue
+                if seen[res_id] is not None and \
+                        seen[res_id][:2] != state[:2]:
+                    changed = True
+                seen[res_id] = state
+            if not seen:
+                return results
+
+            if callback:
+                callback(min(state[1] or 0 for state in seen.values()))
+            if changed:
+                self.backoff.reset()
+            sleep_time = self.backoff.next()
+            if deadline is not None:
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    pending = sorted(seen)
+                    raise exceptions.WaitTimeout(
+                        'Timed out after %s seconds, %d of %d still '
+                        'pending: %s' % (
+                            self.timeout,
+                            len(pending),
+                            len(pending) + len(results),
+                            ', '.join(pending),
+                        ),
+                        results=results,
+                        pending=pending,
+                    )
+                sleep_time = min(sleep_time, remaining)
+            time.sleep(sleep_time)
+
+    def _status(self, res):
+        return (getattr(res, self.status_field, '') or '').lower()
+
+    def _poll(self, seen):
+        """Return a list of (id, resource) for the pending resources"""
+        polled = []
+        pending = set(seen)
+        since = self._since(seen)
+        # Each poll has to see the current status
+        with requestmemo.bypass():
+            if since is not None:
+                for res in self.list_f(since):
+                    if res.id in pending:
+                        pending.discard(res.id)
+                        polled.append((res.id, res))
+            # Resources missing from the list, if one was made, are
+            # fetched one by one
+            for res_id in sorted(pending):
+                polled.append((res_id, self.get_f(res_id)))
+        return polled
+
+    def _since(self, seen):
+        """Return the time to list changes since, or None to not list"""
+        if self.list_f is None or len(seen) < 2:
+            return None
+        updated = [state and state[2] for state in seen.values()]
+        if not all(updated):
+            # The first poll, or resources that do not say when they
+            # were updated
+            return None
+        # A resource that has not changed still has updated >= since
+        # so is listed as well
+        return min(updated)
+
+
+def wait_for_servers(compute_client, server_ids, callback=None, get_f=None,
+                     **kwargs):
+    """Wait for servers to reach a status
+
+    The servers are polled with one servers.list() call using the
+    changes-since filter.
+
+    :param compute_client: a compute client
+    :param server_ids: the ids of the servers to watch
+    :param callback: called with the lowest progress after each poll
+    :param get_f: used instead of servers.get() to fetch one server
+    :param kwargs: passed on to Waiter
+    :rtype: a dict mapping each id to True on success, False on error
+    """
+
+    # Deleted servers are listed as changed
+    kwargs.setdefault('error_status', ['error', 'deleted'])
+
+    def list_changed(since):
+        return compute_client.servers.list(
+            search_opts={'changes-since': since},
+        )
+
+    return Waiter(
+        get_f or compute_client.servers.get,
+        list_changed,
+        **kwargs
+    ).wait(server_ids, callback=callback)
@@ -120,10 +120,10 @@ class ListAgent(lister.Lister):
             "URL"
         )
         data = compute_client.agents.list(parsed_args.hypervisor)
-        return (columns,
-                (utils.get_item_properties(
-                    s, columns,
-                ) for s in data))
+        get_row = utils.item_properties_getter(
+            columns,
+        )
+        return (columns, (get_row(s) for s in data))
 
 
 class SetAgent(show.ShowOne):
@@ -132,6 +132,7 @@ class DeleteAggregate(command.Command):
             parsed_args.aggregate,
         )
         compute_client.aggregates.delete(data.id)
+        utils.invalidate_resource(compute_client.aggregates, data.id)
         return
 
 
@@ -181,10 +182,10 @@ class ListAggregate(lister.Lister):
                 "Availability Zone",
             )
 
-        return (column_headers,
-                (utils.get_item_properties(
-                    s, columns,
-                ) for s in data))
+        get_row = utils.item_properties_getter(
+            columns,
+        )
+        return (column_headers, (get_row(s) for s in data))
 
 
 class RemoveAggregateHost(show.ShowOne):
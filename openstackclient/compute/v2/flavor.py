@@ -133,6 +133,7 @@ class DeleteFlavor(command.Command):
         flavor = utils.find_resource(compute_client.flavors,
                                      parsed_args.flavor)
         compute_client.flavors.delete(flavor.id)
+        utils.invalidate_resource(compute_client.flavors, flavor.id)
         return
 
 
@@ -157,10 +158,10 @@ class ListFlavor(lister.Lister):
             "Extra Specs"
         )
         data = compute_client.flavors.list()
-        return (columns,
-                (utils.get_item_properties(
-                    s, columns,
-                ) for s in data))
+        get_row = utils.item_properties_getter(
+            columns,
+        )
+        return (columns, (get_row(s) for s in data))
 
 
 class ShowFlavor(show.ShowOne):
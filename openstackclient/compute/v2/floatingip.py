@@ -119,11 +119,11 @@ class ListFloatingIP(lister.Lister):
 
         data = compute_client.floating_ips.list()
 
-        return (columns,
-                (utils.get_item_properties(
-                    s, columns,
-                    formatters={},
-                ) for s in data))
+        get_row = utils.item_properties_getter(
+            columns,
+            formatters={},
+        )
+        return (columns, (get_row(s) for s in data))
 
 
 class RemoveFloatingIP(command.Command):
@@ -35,8 +35,8 @@ class ListFloatingIPPool(lister.Lister):
 
         data = compute_client.floating_ip_pools.list()
 
-        return (columns,
-                (utils.get_item_properties(
-                    s, columns,
-                    formatters={},
-                ) for s in data))
+        get_row = utils.item_properties_getter(
+            columns,
+            formatters={},
+        )
+        return (columns, (get_row(s) for s in data))
@@ -44,10 +44,10 @@ class ListHost(lister.Lister):
             "Zone"
         )
         data = compute_client.hosts.list_all(parsed_args.zone)
-        return (columns,
-                (utils.get_item_properties(
-                    s, columns,
-                ) for s in data))
+        get_row = utils.item_properties_getter(
+            columns,
+        )
+        return (columns, (get_row(s) for s in data))
 
 
 class ShowHost(lister.Lister):
@@ -74,7 +74,7 @@ class ShowHost(lister.Lister):
             "Disk GB"
         )
         data = compute_client.hosts.get(parsed_args.host)
-        return (columns,
-                (utils.get_item_properties(
-                    s, columns,
-                ) for s in data))
+        get_row = utils.item_properties_getter(
+            columns,
+        )
+        return (columns, (get_row(s) for s in data))
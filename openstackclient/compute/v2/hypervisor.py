@@ -51,10 +51,10 @@ class ListHypervisor(lister.Lister):
         else:
             data = compute_client.hypervisors.list()
 
-        return (columns,
-                (utils.get_item_properties(
-                    s, columns,
-                ) for s in data))
+        get_row = utils.item_properties_getter(
+            columns,
+        )
+        return (columns, (get_row(s) for s in data))
 
 
 class ShowHypervisor(show.ShowOne):
@@ -113,10 +113,10 @@ class ListKeypair(lister.Lister):
         )
         data = compute_client.keypairs.list()
 
-        return (columns,
-                (utils.get_item_properties(
-                    s, columns,
-                ) for s in data))
+        get_row = utils.item_properties_getter(
+            columns,
+        )
+        return (columns, (get_row(s) for s in data))
 
 
 class ShowKeypair(show.ShowOne):
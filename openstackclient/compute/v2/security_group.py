@@ -100,6 +100,7 @@ class DeleteSecurityGroup(command.Command):
             parsed_args.group,
         )
         compute_client.security_groups.delete(data.id)
+        utils.invalidate_resource(compute_client.security_groups, data.id)
         return
 
 
@@ -142,16 +143,23 @@ class ListSecurityGroup(lister.Lister):
         search = {'all_tenants': parsed_args.all_projects}
         data = compute_client.security_groups.list(search_opts=search)
 
-        projects = self.app.client_manager.identity.projects.list()
+        selected = utils.get_selected_columns(
+            parsed_args,
+            columns,
+            column_headers,
+        )
         project_hash = {}
-        for project in projects:
-            project_hash[project.id] = project
-
-        return (column_headers,
-                (utils.get_item_properties(
-                    s, columns,
-                    formatters={'Tenant ID': _get_project},
-                ) for s in data))
+        if 'Tenant ID' in selected:
+            projects = self.app.client_manager.identity.projects.list()
+            for project in projects:
+                project_hash[project.id] = project
+
+        get_row = utils.item_properties_getter(
+            columns,
+            formatters={'Tenant ID': _get_project},
+            selected=selected,
+        )
+        return (column_headers, (get_row(s) for s in data))
 
 
 class SetSecurityGroup(show.ShowOne):
@@ -388,7 +396,7 @@ class ListSecurityGroupRule(lister.Lister):
             "IP Range",
             "Port Range",
         )
-        return (column_headers,
-                (utils.get_item_properties(
-                    s, columns,
-                ) for s in rules))
+        get_row = utils.item_properties_getter(
+            columns,
+        )
+        return (column_headers, (get_row(s) for s in rules))
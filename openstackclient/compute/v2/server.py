@@ -26,10 +26,12 @@ from cliff import command
 from cliff import lister
 from cliff import show
 
+from novaclient import exceptions as nova_exceptions
 from novaclient.v1_1 import servers
 from openstackclient.common import exceptions
 from openstackclient.common import parseractions
 from openstackclient.common import utils
+from openstackclient.common import waiter
 
 
 def _format_servers_list_networks(networks):
@@ -96,6 +98,111 @@ def _show_progress(progress):
         sys.stdout.flush()
 
 
+class _ServerAction(lister.Lister):
+    """Base class for commands that act on one or more servers
+
+    The servers are looked up and acted on concurrently, up to
+    --parallel at a time, and the outcome for each one is listed.
+    Subclasses set action, the Server method to call or a verb for the
+    help, and wait_status, the statuses that --wait waits for or None
+    for no --wait option.
+    """
+
+    action = None
+    wait_status = None
+
+    def get_parser(self, prog_name):
+        parser = super(_ServerAction, self).get_parser(prog_name)
+        parser.add_argument(
+            'server',
+            metavar='<server>',
+            nargs='+',
+            help='Server(s) to %s (name or ID)' % self.action,
+        )
+        parser.add_argument(
+            '--parallel',
+            metavar='<count>',
+            type=int,
+            default=utils.DEFAULT_BATCH_CONCURRENCY,
+            help='Act on up to <count> servers at a time, default=' +
+                 str(utils.DEFAULT_BATCH_CONCURRENCY),
+        )
+        if self.wait_status:
+            parser.add_argument(
+                '--wait',
+                action='store_true',
+                help='Wait for the %s to complete' % self.action,
+            )
+        return parser
+
+    def act(self, compute_client, server, parsed_args):
+        getattr(server, self.action)()
+
+    def get_waited(self, compute_client):
+        """Return the function used to fetch a server while waiting"""
+        return compute_client.servers.get
+
+    def run(self, parsed_args):
+        super(_ServerAction, self).run(parsed_args)
+        return 1 if self.failed else 0
+
+    def take_action(self, parsed_args):
+        self.log.debug('take_action(%s)' % parsed_args)
+        compute_client = self.app.client_manager.compute
+
+        def act(name):
+            server = utils.find_resource(compute_client.servers, name)
+            self.act(compute_client, server, parsed_args)
+            return server.id
+
+        rows = []
+        for res in utils.run_batch(
+            act,
+            parsed_args.server,
+            concurrency=parsed_args.parallel,
+        ):
+            if res.ok:
+                rows.append([res.item, res.result, 'OK'])
+            else:
+                self.log.debug('%s failed', res.item, exc_info=res.error)
+                rows.append([res.item, '', six.text_type(res.error)])
+
+        if getattr(parsed_args, 'wait', False):
+            self.wait(compute_client, rows)
+
+        self.failed = any(row[2] != 'OK' for row in rows)
+        return (('Server', 'ID', 'Result'), rows)
+
+    def wait(self, compute_client, rows):
+        """Wait for the servers that were acted on, updating their rows"""
+        server_ids = [row[1] for row in rows if row[2] == 'OK']
+        if not server_ids:
+            return
+        callback = None
+        if len(rows) == 1:
+            callback = _show_progress
+        try:
+            results = waiter.wait_for_servers(
+                compute_client,
+                server_ids,
+                callback=callback,
+                get_f=self.get_waited(compute_client),
+                success_status=self.wait_status,
+                timeout=self.app.options.os_wait_timeout,
+            )
+        except exceptions.WaitTimeout as e:
+            results = e.results
+        if callback:
+            sys.stdout.write('\n')
+        for row in rows:
+            if row[2] != 'OK':
+                continue
+            if row[1] not in results:
+                row[2] = 'Timed out waiting for the %s' % self.action
+            elif not results[row[1]]:
+                row[2] = 'Error waiting for the %s' % self.action
+
+
 class AddServerVolume(command.Command):
     """Add volume to server"""
 
@@ -372,6 +479,7 @@ class CreateServer(show.ShowOne):
                 compute_client.servers.get,
                 server.id,
                 callback=_show_progress,
+                timeout=self.app.options.os_wait_timeout,
             ):
                 sys.stdout.write('\n')
             else:
@@ -384,26 +492,31 @@ class CreateServer(show.ShowOne):
         return zip(*sorted(six.iteritems(details)))
 
 
-class DeleteServer(command.Command):
-    """Delete server command"""
+class DeleteServer(_ServerAction):
+    """Delete server(s)"""
 
     log = logging.getLogger(__name__ + '.DeleteServer')
 
-    def get_parser(self, prog_name):
-        parser = super(DeleteServer, self).get_parser(prog_name)
-        parser.add_argument(
-            'server',
-            metavar='<server>',
-            help='Name or ID of server to delete')
-        return parser
+    action = 'delete'
+    wait_status = ['deleted']
 
-    def take_action(self, parsed_args):
-        self.log.debug('take_action(%s)' % parsed_args)
-        compute_client = self.app.client_manager.compute
-        server = utils.find_resource(
-            compute_client.servers, parsed_args.server)
+    def act(self, compute_client, server, parsed_args):
         compute_client.servers.delete(server.id)
-        return
+        utils.invalidate_resource(compute_client.servers, server.id)
+
+    def get_waited(self, compute_client):
+
+        def get_server(server_id):
+            try:
+                return compute_client.servers.get(server_id)
+            except nova_exceptions.NotFound:
+                return servers.Server(
+                    compute_client.servers,
+                    {'id': server_id, 'status': 'DELETED'},
+                    loaded=True,
+                )
+
+        return get_server
 
 
 class ListServer(lister.Lister):
@@ -507,39 +620,28 @@ class ListServer(lister.Lister):
             column_headers = columns
             mixed_case_fields = []
         data = compute_client.servers.list(search_opts=search_opts)
-        return (column_headers,
-                (utils.get_item_properties(
-                    s, columns,
-                    mixed_case_fields=mixed_case_fields,
-                    formatters={
-                        'Networks': _format_servers_list_networks,
-                        'Metadata': utils.format_dict,
-                    },
-                ) for s in data))
+        get_row = utils.item_properties_getter(
+            columns,
+            mixed_case_fields=mixed_case_fields,
+            formatters={
+                'Networks': _format_servers_list_networks,
+                'Metadata': utils.format_dict,
+            },
+            selected=utils.get_selected_columns(
+                parsed_args,
+                columns,
+                column_headers,
+            ),
+        )
+        return (column_headers, (get_row(s) for s in data))
 
 
-class LockServer(command.Command):
-    """Lock server"""
+class LockServer(_ServerAction):
+    """Lock server(s)"""
 
     log = logging.getLogger(__name__ + '.LockServer')
 
-    def get_parser(self, prog_name):
-        parser = super(LockServer, self).get_parser(prog_name)
-        parser.add_argument(
-            'server',
-            metavar='<server>',
-            help='Server (name or ID)',
-        )
-        return parser
-
-    def take_action(self, parsed_args):
-        self.log.debug('take_action(%s)' % parsed_args)
-
-        compute_client = self.app.client_manager.compute
-        utils.find_resource(
-            compute_client.servers,
-            parsed_args.server,
-        ).lock()
+    action = 'lock'
 
 
 # FIXME(dtroyer): Here is what I want, how with argparse/cliff?
@@ -627,6 +729,7 @@ class MigrateServer(command.Command):
                 compute_client.servers.get,
                 server.id,
                 #callback=_show_progress,
+                timeout=self.app.options.os_wait_timeout,
             ):
                 sys.stdout.write('Complete\n')
             else:
@@ -634,42 +737,25 @@ class MigrateServer(command.Command):
                 raise SystemExit
 
 
-class PauseServer(command.Command):
-    """Pause server"""
+class PauseServer(_ServerAction):
+    """Pause server(s)"""
 
     log = logging.getLogger(__name__ + '.PauseServer')
 
-    def get_parser(self, prog_name):
-        parser = super(PauseServer, self).get_parser(prog_name)
-        parser.add_argument(
-            'server',
-            metavar='<server>',
-            help='Server (name or ID)',
-        )
-        return parser
-
-    def take_action(self, parsed_args):
-        self.log.debug('take_action(%s)' % parsed_args)
+    action = 'pause'
+    wait_status = ['paused']
 
-        compute_client = self.app.client_manager.compute
-        utils.find_resource(
-            compute_client.servers,
-            parsed_args.server,
-        ).pause()
 
-
-class RebootServer(command.Command):
+class RebootServer(_ServerAction):
     """Perform a hard or soft server reboot"""
 
     log = logging.getLogger(__name__ + '.RebootServer')
 
+    action = 'reboot'
+    wait_status = ['active']
+
     def get_parser(self, prog_name):
         parser = super(RebootServer, self).get_parser(prog_name)
-        parser.add_argument(
-            'server',
-            metavar='<server>',
-            help='Server (name or ID)',
-        )
         group = parser.add_mutually_exclusive_group()
         group.add_argument(
             '--hard',
@@ -687,31 +773,11 @@ class RebootServer(command.Command):
             default=servers.REBOOT_SOFT,
             help='Perform a soft reboot',
         )
-        parser.add_argument(
-            '--wait',
-            action='store_true',
-            help='Wait for reboot to complete',
-        )
         return parser
 
-    def take_action(self, parsed_args):
-        self.log.debug('take_action(%s)' % parsed_args)
-        compute_client = self.app.client_manager.compute
-        server = utils.find_resource(
-            compute_client.servers, parsed_args.server)
+    def act(self, compute_client, server, parsed_args):
         server.reboot(parsed_args.reboot_type)
 
-        if parsed_args.wait:
-            if utils.wait_for_status(
-                compute_client.servers.get,
-                server.id,
-                callback=_show_progress,
-            ):
-                sys.stdout.write('\nReboot complete\n')
-            else:
-                sys.stdout.write('\nError rebooting server\n')
-                raise SystemExit
-
 
 class RebuildServer(show.ShowOne):
     """Rebuild server"""
@@ -759,6 +825,7 @@ class RebuildServer(show.ShowOne):
                 compute_client.servers.get,
                 server.id,
                 callback=_show_progress,
+                timeout=self.app.options.os_wait_timeout,
             ):
                 sys.stdout.write('\nComplete\n')
             else:
@@ -920,6 +987,7 @@ class ResizeServer(command.Command):
                     server.id,
                     success_status=['active', 'verify_resize'],
                     callback=_show_progress,
+                    timeout=self.app.options.os_wait_timeout,
                 ):
                     sys.stdout.write('Complete\n')
                 else:
@@ -931,28 +999,13 @@ class ResizeServer(command.Command):
             server.revert_resize()
 
 
-class ResumeServer(command.Command):
-    """Resume server"""
+class ResumeServer(_ServerAction):
+    """Resume server(s)"""
 
     log = logging.getLogger(__name__ + '.ResumeServer')
 
-    def get_parser(self, prog_name):
-        parser = super(ResumeServer, self).get_parser(prog_name)
-        parser.add_argument(
-            'server',
-            metavar='<server>',
-            help='Server (name or ID)',
-        )
-        return parser
-
-    def take_action(self, parsed_args):
-        self.log.debug('take_action(%s)' % parsed_args)
-
-        compute_client = self.app.client_manager.compute
-        utils.find_resource(
-            compute_client.servers,
-            parsed_args.server,
-        ) .resume()
+    action = 'resume'
+    wait_status = ['active']
 
 
 class SetServer(command.Command):
@@ -997,6 +1050,7 @@ class SetServer(command.Command):
 
         if parsed_args.name:
             server.update(name=parsed_args.name)
+            utils.invalidate_resource(compute_client.servers, server.id)
 
         if parsed_args.property:
             compute_client.servers.set_meta(
@@ -1209,100 +1263,39 @@ class SshServer(command.Command):
         os.system(cmd % (login, ip_address))
 
 
-class SuspendServer(command.Command):
-    """Suspend server"""
+class SuspendServer(_ServerAction):
+    """Suspend server(s)"""
 
     log = logging.getLogger(__name__ + '.SuspendServer')
 
-    def get_parser(self, prog_name):
-        parser = super(SuspendServer, self).get_parser(prog_name)
-        parser.add_argument(
-            'server',
-            metavar='<server>',
-            help='Server (name or ID)',
-        )
-        return parser
-
-    def take_action(self, parsed_args):
-        self.log.debug('take_action(%s)' % parsed_args)
+    action = 'suspend'
+    wait_status = ['suspended']
 
-        compute_client = self.app.client_manager.compute
-        utils.find_resource(
-            compute_client.servers,
-            parsed_args.server,
-        ).suspend()
 
-
-class UnlockServer(command.Command):
-    """Unlock server"""
+class UnlockServer(_ServerAction):
+    """Unlock server(s)"""
 
     log = logging.getLogger(__name__ + '.UnlockServer')
 
-    def get_parser(self, prog_name):
-        parser = super(UnlockServer, self).get_parser(prog_name)
-        parser.add_argument(
-            'server',
-            metavar='<server>',
-            help='Server (name or ID)',
-        )
-        return parser
+    action = 'unlock'
 
-    def take_action(self, parsed_args):
-        self.log.debug('take_action(%s)' % parsed_args)
 
-        compute_client = self.app.client_manager.compute
-        utils.find_resource(
-            compute_client.servers,
-            parsed_args.server,
-        ).unlock()
-
-
-class UnpauseServer(command.Command):
-    """Unpause server"""
+class UnpauseServer(_ServerAction):
+    """Unpause server(s)"""
 
     log = logging.getLogger(__name__ + '.UnpauseServer')
 
-    def get_parser(self, prog_name):
-        parser = super(UnpauseServer, self).get_parser(prog_name)
-        parser.add_argument(
-            'server',
-            metavar='<server>',
-            help='Server (name or ID)',
-        )
-        return parser
+    action = 'unpause'
+    wait_status = ['active']
 
-    def take_action(self, parsed_args):
-        self.log.debug('take_action(%s)' % parsed_args)
-
-        compute_client = self.app.client_manager.compute
-        utils.find_resource(
-            compute_client.servers,
-            parsed_args.server,
-        ).unpause()
 
-
-class UnrescueServer(command.Command):
-    """Restore server from rescue mode"""
+class UnrescueServer(_ServerAction):
+    """Restore server(s) from rescue mode"""
 
     log = logging.getLogger(__name__ + '.UnrescueServer')
 
-    def get_parser(self, prog_name):
-        parser = super(UnrescueServer, self).get_parser(prog_name)
-        parser.add_argument(
-            'server',
-            metavar='<server>',
-            help='Server (name or ID)',
-        )
-        return parser
-
-    def take_action(self, parsed_args):
-        self.log.debug('take_action(%s)' % parsed_args)
-
-        compute_client = self.app.client_manager.compute
-        utils.find_resource(
-            compute_client.servers,
-            parsed_args.server,
-        ).unrescue()
+    action = 'unrescue'
+    wait_status = ['active']
 
 
 class UnsetServer(command.Command):
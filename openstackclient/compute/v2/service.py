@@ -52,10 +52,10 @@ class ListService(lister.Lister):
         )
         data = compute_client.services.list(parsed_args.host,
                                             parsed_args.service)
-        return (columns,
-                (utils.get_item_properties(
-                    s, columns,
-                ) for s in data))
+        get_row = utils.item_properties_getter(
+            columns,
+        )
+        return (columns, (get_row(s) for s in data))
 
 
 class SetService(lister.Lister):
@@ -102,7 +102,7 @@ class SetService(lister.Lister):
             action = compute_client.services.disable
 
         data = action(parsed_args.host, parsed_args.service)
-        return (columns,
-                (utils.get_item_properties(
-                    s, columns,
-                ) for s in data))
+        get_row = utils.item_properties_getter(
+            columns,
+        )
+        return (columns, (get_row(s) for s in data))
@@ -85,26 +85,34 @@ class ListUsage(lister.Lister):
 
         usage_list = compute_client.usage.list(start, end)
 
+        selected = utils.get_selected_columns(
+            parsed_args,
+            columns,
+            column_headers,
+        )
+
         # Cache the project list
         project_cache = {}
-        try:
-            for p in self.app.client_manager.identity.tenants.list():
-                project_cache[p.id] = p
-        except Exception:
-            # Just forget it if there's any trouble
-            pass
+        if 'tenant_id' in selected:
+            try:
+                for p in self.app.client_manager.identity.tenants.list():
+                    project_cache[p.id] = p
+            except Exception:
+                # Just forget it if there's any trouble
+                pass
 
         if len(usage_list) > 0:
             print("Usage from %s to %s:" % (start.strftime(dateformat),
                                             end.strftime(dateformat)))
 
-        return (column_headers,
-                (utils.get_item_properties(
-                    s, columns,
-                    formatters={
-                        'tenant_id': _format_project,
-                        'total_memory_mb_usage': lambda x: float("%.2f" % x),
-                        'total_vcpus_usage': lambda x: float("%.2f" % x),
-                        'total_local_gb_usage': lambda x: float("%.2f" % x),
-                    },
-                ) for s in usage_list))
+        get_row = utils.item_properties_getter(
+            columns,
+            formatters={
+                'tenant_id': _format_project,
+                'total_memory_mb_usage': lambda x: float("%.2f" % x),
+                'total_vcpus_usage': lambda x: float("%.2f" % x),
+                'total_local_gb_usage': lambda x: float("%.2f" % x),
+            },
+            selected=selected,
+        )
+        return (column_headers, (get_row(s) for s in usage_list))
@@ -0,0 +1,622 @@
+#   Copyright 2013 OpenStack Foundation
+#
+#   Licensed under the Apache License, Version 2.0 (the "License"); you may
+#   not use this file except in compliance with the License. You may obtain
+#   a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#   WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#   License for the specific language governing permissions and limitations
+#   under the License.
+#
+
+"""Run commands in a warm shell kept by a per-user daemon
+
+Setting OS_DAEMON=1 makes the openstack command a thin client that
+sends its arguments and environment to a daemon listening on a Unix
+socket in the cache directory, starting the daemon if it is not
+running.  Stdin is only read, and sent a line at a time, when the
+command reads it.  The daemon keeps an initialized OpenStackShell, and so its
+authenticated ClientManager and open connections, for each set of
+credentials and global options it is given.  It exits after
+OS_DAEMON_IDLE_TIMEOUT seconds without a command.
+
+Each command changes the daemon's environment, working directory and
+sys.std* while it runs, so the daemon runs one command at a time.  A
+command sent while another is running is refused and the client runs
+it in its own process instead.
+
+This module is imported before every command, so it only uses the
+standard library until it has to run the shell itself.
+"""
+
+import contextlib
+import errno
+import json
+import logging
+import os
+import socket
+import struct
+import subprocess
+import sys
+import threading
+import time
+import traceback
+
+
+DEFAULT_CACHE_DIR = '~/.openstack/cache'
+
+# Seconds the daemon waits for a command before exiting
+DEFAULT_IDLE_TIMEOUT = 900
+
+# Number of warm shells the daemon keeps
+MAX_SHELLS = 8
+
+# Bytes of output collected before it is sent to the client
+OUTPUT_BUFFER_SIZE = 65536
+
+# Seconds the client waits for a daemon it started to listen
+START_TIMEOUT = 10
+
+# Seconds the daemon waits for a client to send its command
+REQUEST_TIMEOUT = 10
+
+LOG = logging.getLogger(__name__)
+
+
+class AlreadyRunning(Exception):
+    """Another daemon holds the lock of the socket"""
+
+
+class Busy(Exception):
+    """The daemon is running another command"""
+
+
+def get_socket_path(environ=None):
+    """Return the path of the daemon socket for the current user"""
+    environ = os.environ if environ is None else environ
+    cache_dir = environ.get('OS_CACHE_DIR') or DEFAULT_CACHE_DIR
+    return os.path.join(os.path.expanduser(cache_dir), 'daemon.sock')
+
+
+def send_message(sock, message):
+    """Send a length-prefixed JSON message"""
+    data = json.dumps(message).encode('utf-8')
+    sock.sendall(struct.pack('!I', len(data)) + data)
+
+
+def recv_message(sock):
+    """Return the next message from sock, or None at the end"""
+    header = _recv_exactly(sock, 4)
+    if not header:
+        return None
+    (length,) = struct.unpack('!I', header)
+    return json.loads(_recv_exactly(sock, length).decode('utf-8'))
+
+
+def _recv_exactly(sock, length):
+    data = b''
+    while len(data) < length:
+        chunk = sock.recv(length - len(data))
+        if not chunk:
+            if data:
+                raise EOFError('connection closed in a message')
+            return None
+        data += chunk
+    return data
+
+
+def _write(stream, text):
+    data = text.encode('utf-8')
+    getattr(stream, 'buffer', stream).write(data)
+    stream.flush()
+
+
+def _read(stream, size):
+    """Return a line of stream, or all of the rest if size is 'all'"""
+    data = stream.read() if size == 'all' else stream.readline()
+    if isinstance(data, bytes):
+        data = data.decode('utf-8')
+    return data
+
+
+def forward(path, argv, environ, cwd, stdin, stdout, stderr):
+    """Run a command in the daemon listening on path
+
+    stdin is only read when the command reads its stdin.
+
+    :raises socket.error: if no daemon is listening
+    :raises Busy: if the daemon is running another command
+    :rtype: the exit status of the command
+    """
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.connect(path)
+        send_message(sock, {
+            'argv': argv,
+            'env': environ,
+            'cwd': cwd,
+        })
+        while True:
+            message = recv_message(sock)
+            if message is None:
+                # The daemon died while running the command
+                return 1
+            if 'stdout' in message:
+                _write(stdout, message['stdout'])
+            elif 'stderr' in message:
+                _write(stderr, message['stderr'])
+            elif 'read' in message:
+                send_message(sock, {'stdin': _read(stdin, message['read'])})
+            elif 'exit' in message:
+                return message['exit']
+            elif 'busy' in message:
+                raise Busy()
+    finally:
+        sock.close()
+
+
+def start_daemon(path):
+    """Start a daemon in the background and wait for it to listen
+
+    :rtype: True if the daemon is listening
+    """
+    with open(os.devnull, 'r+') as devnull:
+        subprocess.Popen(
+            [sys.executable, '-c',
+             'import openstackclient.daemon as d; d.serve()'],
+            stdin=devnull,
+            stdout=devnull,
+            stderr=devnull,
+            close_fds=True,
+            preexec_fn=os.setsid,
+        )
+    deadline = time.time() + START_TIMEOUT
+    while time.time() < deadline:
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            sock.connect(path)
+            return True
+        except socket.error:
+            time.sleep(0.05)
+        finally:
+            sock.close()
+    return False
+
+
+def main(argv=sys.argv[1:]):
+    """The openstack command
+
+    Runs the command in the daemon if OS_DAEMON is set, otherwise, or if
+    the daemon can not be used or is busy, runs it in this process.
+    Interactive mode always runs in this process, as does everything
+    where there are no Unix sockets.
+    """
+    if argv and os.environ.get('OS_DAEMON', '').lower() in ('true', '1') \
+            and hasattr(socket, 'AF_UNIX'):
+        path = get_socket_path()
+        args = (
+            path,
+            list(argv),
+            dict(os.environ),
+            os.getcwd(),
+            sys.stdin,
+            sys.stdout,
+            sys.stderr,
+        )
+        try:
+            try:
+                return forward(*args)
+            except socket.error as e:
+                if e.args[0] not in (errno.ENOENT, errno.ECONNREFUSED):
+                    raise
+            if start_daemon(path):
+                return forward(*args)
+            sys.stderr.write('unable to start the openstack daemon\n')
+        except Busy:
+            pass
+
+    from openstackclient import shell
+    return shell.main(argv)
+
+
+class OutputStream(object):
+    """A file-like object that sends what is written to the client"""
+
+    def __init__(self, name):
+        self.name = name
+        self.conn = None
+        self._buffer = []
+        self._size = 0
+
+    def write(self, text):
+        if isinstance(text, bytes):
+            text = text.decode('utf-8', 'replace')
+        self._buffer.append(text)
+        self._size += len(text)
+        if self._size >= OUTPUT_BUFFER_SIZE:
+            self.flush()
+
+    def writelines(self, lines):
+        for line in lines:
+            self.write(line)
+
+    def flush(self):
+        if self._buffer and self.conn is not None:
+            send_message(self.conn, {self.name: ''.join(self._buffer)})
+        self._buffer = []
+        self._size = 0
+
+    def isatty(self):
+        return False
+
+
+class InputStream(object):
+    """A file-like object that reads the stdin of the client
+
+    Nothing is asked of the client until the command reads, so a
+    command that does not read never waits for a stdin that is not
+    closed.  The output streams are flushed first so that prompts are
+    seen.  Shells keep the stdin they were created with, so the same
+    object is given the connection for each command.
+    """
+
+    def __init__(self, outputs=()):
+        self.outputs = outputs
+        self.set_conn(None)
+
+    def set_conn(self, conn):
+        """Read from the client on conn, or nothing if it is None"""
+        self.conn = conn
+        self._buffer = u''
+        self._eof = conn is None
+
+    def _fetch(self, size):
+        """Return a line, or all of the rest if size is 'all'"""
+        if self._eof:
+            return u''
+        for stream in self.outputs:
+            stream.flush()
+        send_message(self.conn, {'read': size})
+        reply = recv_message(self.conn)
+        data = reply.get('stdin') if reply else None
+        if not data or size == 'all':
+            self._eof = True
+        return data or u''
+
+    def read(self, size=-1):
+        if size is None or size < 0:
+            data = self._buffer + self._fetch('all')
+            self._buffer = u''
+            return data
+        while len(self._buffer) < size and not self._eof:
+            self._buffer += self._fetch('line')
+        data, self._buffer = self._buffer[:size], self._buffer[size:]
+        return data
+
+    def readline(self, size=-1):
+        if u'\n' not in self._buffer:
+            self._buffer += self._fetch('line')
+        end = self._buffer.find(u'\n') + 1 or len(self._buffer)
+        if size is not None and size >= 0:
+            end = min(end, size)
+        data, self._buffer = self._buffer[:end], self._buffer[end:]
+        return data
+
+    def readlines(self, hint=-1):
+        return list(self)
+
+    def __iter__(self):
+        return iter(self.readline, u'')
+
+    def isatty(self):
+        return False
+
+    def close(self):
+        pass
+
+
+def get_settings(environ):
+    """Return the environment variables that can change a shell"""
+    return dict((k, v) for k, v in environ.items() if k.startswith('OS_'))
+
+
+class WarmShell(object):
+    """An initialized shell and the settings it was initialized with"""
+
+    def __init__(self, shell, settings, stdin, stdout, stderr):
+        self.shell = shell
+        self.settings = settings
+        self.options = None
+        self.stdin = stdin
+        self.stdout = stdout
+        self.stderr = stderr
+        self.handlers = []
+        self.level = logging.WARNING
+        # find_resource() uses a module global, which is set to this
+        # while the shell runs a command
+        self.resource_cache = None
+
+    def will_expire_soon(self):
+        """Return True if the shell's token is about to expire"""
+        client_manager = getattr(self.shell, 'client_manager', None)
+        if client_manager is None or \
+                not hasattr(client_manager, 'will_expire_soon'):
+            return False
+        try:
+            return client_manager.will_expire_soon()
+        except Exception:
+            LOG.exception('unable to check the token of a shell')
+            return True
+
+
+class Daemon(object):
+    """Runs the commands sent to a Unix socket in warm shells
+
+    A shell is reused for a command whose OS_ environment variables and
+    global options are the same as those it was initialized with, so
+    only the command itself is run.  A shell whose token is about to
+    expire is replaced by a new one, which authenticates again.
+
+    Commands are run one at a time on a worker thread while the main
+    thread accepts connections, refusing those that arrive while a
+    command is running.  A lock on <path>.lock is held while the daemon
+    listens, so a second daemon started for the same socket exits
+    instead of replacing the first one's socket.
+    """
+
+    def __init__(self, path, idle_timeout=DEFAULT_IDLE_TIMEOUT,
+                 shell_factory=None):
+        """
+        :param path: the path of the socket to listen on
+        :param idle_timeout: seconds to wait for a command before exiting
+        :param shell_factory: a callable that returns a new shell,
+                              defaults to OpenStackShell
+        """
+        self.path = path
+        self.idle_timeout = idle_timeout
+        self.shell_factory = shell_factory
+        self.shells = []
+        self.sock = None
+        self.lock = None
+        self.running = threading.Event()
+        self.last_active = time.time()
+
+    def listen(self):
+        """Lock the socket path and listen on it
+
+        :raises AlreadyRunning: if another daemon has the lock
+        """
+        # Only on POSIX, so not imported by every command
+        import fcntl
+
+        directory = os.path.dirname(self.path)
+        if not os.path.isdir(directory):
+            os.makedirs(directory, 0o700)
+        old_umask = os.umask(0o077)
+        try:
+            self.lock = open(self.path + '.lock', 'a')
+            try:
+                fcntl.flock(self.lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except IOError as e:
+                self.lock.close()
+                self.lock = None
+                if e.errno not in (errno.EAGAIN, errno.EACCES):
+                    raise
+                raise AlreadyRunning(self.path)
+            # Left behind by a daemon that did not exit cleanly
+            if os.path.exists(self.path):
+                os.unlink(self.path)
+            self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            self.sock.bind(self.path)
+        finally:
+            os.umask(old_umask)
+        self.sock.listen(5)
+
+    def serve(self):
+        """Handle connections until none arrive for idle_timeout"""
+        if self.sock is None:
+            self.listen()
+        self.last_active = time.time()
+        try:
+            while True:
+                timeout = self.idle_timeout
+                if not self.running.is_set():
+                    timeout -= time.time() - self.last_active
+                    if timeout <= 0:
+                        return
+                self.sock.settimeout(timeout)
+                try:
+                    conn, address = self.sock.accept()
+                except socket.timeout:
+                    continue
+                try:
+                    conn.settimeout(REQUEST_TIMEOUT)
+                    request = recv_message(conn)
+                    if request is not None and self.running.is_set():
+                        send_message(conn, {'busy': True})
+                        request = None
+                except (socket.error, ValueError, EOFError):
+                    LOG.exception('unable to read a command')
+                    request = None
+                if request is None:
+                    conn.close()
+                    continue
+                conn.settimeout(None)
+                self.running.set()
+                worker = threading.Thread(
+                    target=self._handle,
+                    args=(conn, request),
+                )
+                worker.daemon = True
+                worker.start()
+        finally:
+            self.sock.close()
+            try:
+                os.unlink(self.path)
+            except OSError:
+                pass
+            # Released after the socket is gone so that the next daemon
+            # does not remove a live socket
+            if self.lock is not None:
+                self.lock.close()
+                self.lock = None
+
+    def _handle(self, conn, request):
+        status = 1
+        try:
+            status = self.handle(conn, request)
+        except Exception:
+            LOG.exception('unable to handle a command')
+        finally:
+            # The next command may start as soon as the client has the
+            # exit status
+            self.last_active = time.time()
+            self.running.clear()
+        try:
+            send_message(conn, {'exit': status})
+        except socket.error:
+            pass
+        finally:
+            conn.close()
+
+    def handle(self, conn, request):
+        """Run the command sent on a connection
+
+        :rtype: the exit status of the command
+        """
+        argv = request['argv']
+        environ = request['env']
+        warm, remainder = self.find_shell(argv, environ)
+        for stream in (warm.stdout, warm.stderr):
+            stream.conn = conn
+        warm.stdin.set_conn(conn)
+        try:
+            status = self.run(
+                warm,
+                argv,
+                remainder,
+                environ,
+                request.get('cwd'),
+            )
+        finally:
+            warm.stdout.flush()
+            warm.stderr.flush()
+            warm.stdout.conn = warm.stderr.conn = None
+            warm.stdin.set_conn(None)
+        return status
+
+    def find_shell(self, argv, environ):
+        """Return a WarmShell for a command and the command's arguments
+
+        The arguments are None for a new shell, which has to be run with
+        the global options as well.
+        """
+        settings = get_settings(environ)
+        for warm in self.shells:
+            if warm.settings != settings:
+                continue
+            try:
+                options, remainder = warm.shell.parser.parse_known_args(argv)
+            except SystemExit:
+                continue
+            if vars(options) == warm.options:
+                self.shells.remove(warm)
+                if warm.will_expire_soon():
+                    LOG.debug('the token of a shell is expiring')
+                    break
+                self.shells.insert(0, warm)
+                return warm, remainder
+
+        stdout = OutputStream('stdout')
+        stderr = OutputStream('stderr')
+        stdin = InputStream((stdout, stderr))
+        with _environment(environ, None, stdin, stdout, stderr, None):
+            shell = self._new_shell()
+        return WarmShell(shell, settings, stdin, stdout, stderr), None
+
+    def _new_shell(self):
+        if self.shell_factory is None:
+            from openstackclient import shell
+            self.shell_factory = shell.OpenStackShell
+        return self.shell_factory()
+
+    def run(self, warm, argv, remainder, environ, cwd):
+        """Run a command in a shell, returning its exit status"""
+        root = logging.getLogger('')
+        with _environment(environ, cwd, warm.stdin, warm.stdout,
+                          warm.stderr, warm.resource_cache):
+            try:
+                if remainder is None:
+                    root.handlers = []
+                    status = warm.shell.run(argv)
+                    self._keep(warm, root)
+                else:
+                    root.handlers = warm.handlers
+                    root.setLevel(warm.level)
+                    if remainder:
+                        status = warm.shell.run_subcommand(remainder)
+                    else:
+                        # --batch, which is run as the interactive mode
+                        status = warm.shell.interact()
+            except SystemExit as e:
+                status = e.code
+            except Exception:
+                warm.stderr.write(traceback.format_exc())
+                status = 1
+        if status is None:
+            return 0
+        if not isinstance(status, int):
+            return 1
+        return status
+
+    def _keep(self, warm, root):
+        """Keep a new shell if it initialized the API clients"""
+        if getattr(warm.shell, 'client_manager', None) is None:
+            return
+        warm.options = vars(warm.shell.options)
+        warm.resource_cache = getattr(warm.shell, 'resource_cache', None)
+        warm.handlers = list(root.handlers)
+        warm.level = root.level
+        self.shells.insert(0, warm)
+        del self.shells[MAX_SHELLS:]
+
+
+@contextlib.contextmanager
+def _environment(environ, cwd, stdin, stdout, stderr, resource_cache):
+    """Run a block with the environment, stdio and caches of a command"""
+    from openstackclient.common import utils
+
+    saved_environ = dict(os.environ)
+    saved_cwd = os.getcwd()
+    saved_streams = (sys.stdin, sys.stdout, sys.stderr)
+    saved_resource_cache = utils.get_resource_cache()
+    os.environ.clear()
+    os.environ.update(environ)
+    try:
+        if cwd:
+            os.chdir(cwd)
+        sys.stdin, sys.stdout, sys.stderr = stdin, stdout, stderr
+        utils.set_resource_cache(resource_cache)
+        yield
+    finally:
+        utils.set_resource_cache(saved_resource_cache)
+        sys.stdin, sys.stdout, sys.stderr = saved_streams
+        os.chdir(saved_cwd)
+        os.environ.clear()
+        os.environ.update(saved_environ)
+
+
+def serve(path=None, idle_timeout=None):
+    """Run a daemon until it has been idle for idle_timeout seconds"""
+    if idle_timeout is None:
+        idle_timeout = float(
+            os.environ.get('OS_DAEMON_IDLE_TIMEOUT') or DEFAULT_IDLE_TIMEOUT
+        )
+    try:
+        Daemon(path or get_socket_path(), idle_timeout).serve()
+    except AlreadyRunning:
+        LOG.debug('a daemon is already running')
@@ -47,7 +47,8 @@ def make_client(instance):
             tenant_name=instance._project_name,
             tenant_id=instance._project_id,
             auth_url=instance._auth_url,
-            region_name=instance._region_name)
+            region_name=instance._region_name,
+            auth_ref=instance._auth_ref)
     return client
 
 
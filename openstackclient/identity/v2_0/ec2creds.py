@@ -137,11 +137,11 @@ class ListEC2Creds(lister.Lister):
 
         columns = ('Access', 'Secret', 'Project ID', 'User ID')
         data = identity_client.ec2.list(user)
-        return (columns,
-                (utils.get_item_properties(
-                    s, columns,
-                    formatters={},
-                ) for s in data))
+        get_row = utils.item_properties_getter(
+            columns,
+            formatters={},
+        )
+        return (columns, (get_row(s) for s in data))
 
 
 class ShowEC2Creds(show.ShowOne):
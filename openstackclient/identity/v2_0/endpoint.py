@@ -119,16 +119,19 @@ class ListEndpoint(lister.Lister):
             columns = ('ID', 'Region', 'Service Name', 'Service Type')
         data = identity_client.endpoints.list()
 
+        services = utils.get_resource_map(identity_client.services)
         for ep in data:
-            service = utils.find_resource(
-                identity_client.services, ep.service_id)
+            service = services.get(ep.service_id)
+            if service is None:
+                service = utils.find_resource(
+                    identity_client.services, ep.service_id)
             ep.service_name = service.name
             ep.service_type = service.type
-        return (columns,
-                (utils.get_item_properties(
-                    s, columns,
-                    formatters={},
-                ) for s in data))
+        get_row = utils.item_properties_getter(
+            columns,
+            formatters={},
+        )
+        return (columns, (get_row(s) for s in data))
 
 
 class ShowEndpoint(show.ShowOne):
@@ -208,8 +211,6 @@ class ShowEndpoint(show.ShowOne):
                 if ep.service_id == service.id:
                     info = {}
                     info.update(ep._info)
-                    service = utils.find_resource(identity_client.services,
-                                                  ep.service_id)
                     info['service_name'] = service.name
                     info['service_type'] = service.type
                     return zip(*sorted(six.iteritems(info)))
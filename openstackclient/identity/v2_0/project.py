@@ -95,6 +95,7 @@ class DeleteProject(command.Command):
             parsed_args.project,
         )
         identity_client.tenants.delete(project.id)
+        utils.invalidate_resource(identity_client.tenants, project.id)
         return
 
 
@@ -120,11 +121,11 @@ class ListProject(lister.Lister):
         else:
             columns = ('ID', 'Name')
         data = self.app.client_manager.identity.tenants.list()
-        return (columns,
-                (utils.get_item_properties(
-                    s, columns,
-                    formatters={},
-                ) for s in data))
+        get_row = utils.item_properties_getter(
+            columns,
+            formatters={},
+        )
+        return (columns, (get_row(s) for s in data))
 
 
 class SetProject(command.Command):
@@ -190,6 +191,7 @@ class SetProject(command.Command):
 
         if len(kwargs):
             identity_client.tenants.update(project.id, **kwargs)
+            utils.invalidate_resource(identity_client.tenants, project.id)
 
 
 class ShowProject(show.ShowOne):
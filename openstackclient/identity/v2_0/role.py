@@ -109,6 +109,7 @@ class DeleteRole(command.Command):
         identity_client = self.app.client_manager.identity
         role = utils.find_resource(identity_client.roles, parsed_args.role)
         identity_client.roles.delete(role.id)
+        utils.invalidate_resource(identity_client.roles, role.id)
         return
 
 
@@ -121,11 +122,11 @@ class ListRole(lister.Lister):
         self.log.debug('take_action(%s)' % parsed_args)
         columns = ('ID', 'Name')
         data = self.app.client_manager.identity.roles.list()
-        return (columns,
-                (utils.get_item_properties(
-                    s, columns,
-                    formatters={},
-                ) for s in data))
+        get_row = utils.item_properties_getter(
+            columns,
+            formatters={},
+        )
+        return (columns, (get_row(s) for s in data))
 
 
 class ListUserRole(lister.Lister):
@@ -179,11 +180,11 @@ class ListUserRole(lister.Lister):
             role.user = user.name
             role.project = project.name
 
-        return (columns,
-                (utils.get_item_properties(
-                    s, columns,
-                    formatters={},
-                ) for s in data))
+        get_row = utils.item_properties_getter(
+            columns,
+            formatters={},
+        )
+        return (columns, (get_row(s) for s in data))
 
 
 class RemoveRole(command.Command):
@@ -103,11 +103,11 @@ class ListService(lister.Lister):
         else:
             columns = ('ID', 'Name')
         data = self.app.client_manager.identity.services.list()
-        return (columns,
-                (utils.get_item_properties(
-                    s, columns,
-                    formatters={},
-                ) for s in data))
+        get_row = utils.item_properties_getter(
+            columns,
+            formatters={},
+        )
+        return (columns, (get_row(s) for s in data))
 
 
 class ShowService(show.ShowOne):
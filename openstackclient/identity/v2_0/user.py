@@ -112,6 +112,7 @@ class DeleteUser(command.Command):
         identity_client = self.app.client_manager.identity
         user = utils.find_resource(identity_client.users, parsed_args.user)
         identity_client.users.delete(user.id)
+        utils.invalidate_resource(identity_client.users, user.id)
         return
 
 
@@ -160,16 +161,23 @@ class ListUser(lister.Lister):
                 'Email',
                 'Enabled',
             )
-            # Cache the project list
-            project_cache = {}
+        else:
+            columns = column_headers = ('ID', 'Name')
+        selected = utils.get_selected_columns(
+            parsed_args,
+            columns,
+            column_headers,
+        )
+
+        # Cache the project list
+        project_cache = {}
+        if 'tenantId' in selected:
             try:
                 for p in self.app.client_manager.identity.tenants.list():
                     project_cache[p.id] = p
             except Exception:
                 # Just forget it if there's any trouble
                 pass
-        else:
-            columns = column_headers = ('ID', 'Name')
         data = self.app.client_manager.identity.users.list()
 
         if parsed_args.long:
@@ -182,12 +190,13 @@ class ListUser(lister.Lister):
                     d._info['tenantId'] = d._info.pop('tenant_id')
                     d._add_details(d._info)
 
-        return (column_headers,
-                (utils.get_item_properties(
-                    s, columns,
-                    mixed_case_fields=('tenantId',),
-                    formatters={'tenantId': _format_project},
-                ) for s in data))
+        get_row = utils.item_properties_getter(
+            columns,
+            mixed_case_fields=('tenantId',),
+            formatters={'tenantId': _format_project},
+            selected=selected,
+        )
+        return (column_headers, (get_row(s) for s in data))
 
 
 class SetUser(command.Command):
@@ -265,6 +274,7 @@ class SetUser(command.Command):
 
         if len(kwargs):
             identity_client.users.update(user.id, **kwargs)
+            utils.invalidate_resource(identity_client.users, user.id)
 
 
 class ShowUser(show.ShowOne):
@@ -83,11 +83,11 @@ class ListConsumer(lister.Lister):
         self.log.debug('take_action(%s)' % parsed_args)
         columns = ('ID', 'Description')
         data = self.app.client_manager.identity.consumers.list_consumers()
-        return (columns,
-                (utils.get_item_properties(
-                    s, columns,
-                    formatters={},
-                ) for s in data))
+        get_row = utils.item_properties_getter(
+            columns,
+            formatters={},
+        )
+        return (columns, (get_row(s) for s in data))
 
 
 class SetConsumer(command.Command):
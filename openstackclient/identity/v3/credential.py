@@ -106,11 +106,11 @@ class ListCredential(lister.Lister):
         self.log.debug('take_action(%s)' % parsed_args)
         columns = ('ID', 'Type', 'User ID', 'Data', 'Project ID')
         data = self.app.client_manager.identity.credentials.list()
-        return (columns,
-                (utils.get_item_properties(
-                    s, columns,
-                    formatters={},
-                ) for s in data))
+        get_row = utils.item_properties_getter(
+            columns,
+            formatters={},
+        )
+        return (columns, (get_row(s) for s in data))
 
 
 class SetCredential(command.Command):
@@ -89,6 +89,7 @@ class DeleteDomain(command.Command):
         domain = utils.find_resource(identity_client.domains,
                                      parsed_args.domain)
         identity_client.domains.delete(domain.id)
+        utils.invalidate_resource(identity_client.domains, domain.id)
         return
 
 
@@ -101,11 +102,11 @@ class ListDomain(lister.Lister):
         self.log.debug('take_action(%s)' % parsed_args)
         columns = ('ID', 'Name', 'Enabled', 'Description')
         data = self.app.client_manager.identity.domains.list()
-        return (columns,
-                (utils.get_item_properties(
-                    s, columns,
-                    formatters={},
-                ) for s in data))
+        get_row = utils.item_properties_getter(
+            columns,
+            formatters={},
+        )
+        return (columns, (get_row(s) for s in data))
 
 
 class SetDomain(command.Command):
@@ -163,6 +164,7 @@ class SetDomain(command.Command):
             sys.stdout.write("Domain not updated, no arguments present")
             return
         identity_client.domains.update(domain.id, **kwargs)
+        utils.invalidate_resource(identity_client.domains, domain.id)
         return
 
 
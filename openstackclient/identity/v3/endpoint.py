@@ -133,16 +133,19 @@ class ListEndpoint(lister.Lister):
             columns = ('ID', 'Region', 'Service Name', 'Enabled')
         data = identity_client.endpoints.list()
 
+        services = utils.get_resource_map(identity_client.services)
         for ep in data:
-            service = utils.find_resource(
-                identity_client.services, ep.service_id)
+            service = services.get(ep.service_id)
+            if service is None:
+                service = utils.find_resource(
+                    identity_client.services, ep.service_id)
             ep.service_name = service.name
             ep.service_type = service.type
-        return (columns,
-                (utils.get_item_properties(
-                    s, columns,
-                    formatters={},
-                ) for s in data))
+        get_row = utils.item_properties_getter(
+            columns,
+            formatters={},
+        )
+        return (columns, (get_row(s) for s in data))
 
 
 class SetEndpoint(command.Command):
@@ -160,6 +160,7 @@ class DeleteGroup(command.Command):
         identity_client = self.app.client_manager.identity
         group = utils.find_resource(identity_client.groups, parsed_args.group)
         identity_client.groups.delete(group.id)
+        utils.invalidate_resource(identity_client.groups, group.id)
         return
 
 
@@ -265,11 +266,11 @@ class ListGroup(lister.Lister):
                 columns = ('ID', 'Name')
             data = identity_client.groups.list()
 
-        return (columns,
-                (utils.get_item_properties(
-                    s, columns,
-                    formatters={},
-                ) for s in data))
+        get_row = utils.item_properties_getter(
+            columns,
+            formatters={},
+        )
+        return (columns, (get_row(s) for s in data))
 
 
 class RemoveUserFromGroup(command.Command):
@@ -353,6 +354,7 @@ class SetGroup(command.Command):
             sys.stderr.write("Group not updated, no arguments present")
             return
         identity_client.groups.update(group.id, **kwargs)
+        utils.invalidate_resource(identity_client.groups, group.id)
         return
 
 
@@ -101,11 +101,11 @@ class ListPolicy(lister.Lister):
         else:
             columns = ('ID', 'Type')
         data = self.app.client_manager.identity.policies.list()
-        return (columns,
-                (utils.get_item_properties(
-                    s, columns,
-                    formatters={},
-                ) for s in data))
+        get_row = utils.item_properties_getter(
+            columns,
+            formatters={},
+        )
+        return (columns, (get_row(s) for s in data))
 
 
 class SetPolicy(command.Command):
@@ -101,6 +101,7 @@ class DeleteProject(command.Command):
         project = utils.find_resource(identity_client.projects,
                                       parsed_args.project)
         identity_client.projects.delete(project.id)
+        utils.invalidate_resource(identity_client.projects, project.id)
         return
 
 
@@ -125,11 +126,11 @@ class ListProject(lister.Lister):
         else:
             columns = ('ID', 'Name')
         data = self.app.client_manager.identity.projects.list()
-        return (columns,
-                (utils.get_item_properties(
-                    s, columns,
-                    formatters={},
-                ) for s in data))
+        get_row = utils.item_properties_getter(
+            columns,
+            formatters={},
+        )
+        return (columns, (get_row(s) for s in data))
 
 
 class SetProject(command.Command):
@@ -190,6 +191,7 @@ class SetProject(command.Command):
             sys.stdout.write("Project not updated, no arguments present")
             return
         project.update(**kwargs)
+        utils.invalidate_resource(identity_client.projects, project.id)
         return
 
 
@@ -147,6 +147,7 @@ class DeleteRole(command.Command):
         role_id = utils.find_resource(identity_client.roles,
                                       parsed_args.role)
         identity_client.roles.delete(role_id)
+        utils.invalidate_resource(identity_client.roles, role_id.id)
         return
 
 
@@ -159,11 +160,11 @@ class ListRole(lister.Lister):
         self.log.debug('take_action(%s)' % parsed_args)
         columns = ('ID', 'Name')
         data = self.app.client_manager.identity.roles.list()
-        return (columns,
-                (utils.get_item_properties(
-                    s, columns,
-                    formatters={},
-                ) for s in data))
+        get_row = utils.item_properties_getter(
+            columns,
+            formatters={},
+        )
+        return (columns, (get_row(s) for s in data))
 
 
 class RemoveRole(command.Command):
@@ -274,6 +275,7 @@ class SetRole(command.Command):
             return
 
         identity_client.roles.update(role_id, parsed_args.name)
+        utils.invalidate_resource(identity_client.roles, role_id.id)
         return
 
 
@@ -87,6 +87,7 @@ class DeleteService(command.Command):
             identity_client.services, parsed_args.service).id
 
         identity_client.services.delete(service_id)
+        utils.invalidate_resource(identity_client.services, service_id)
         return
 
 
@@ -99,11 +100,11 @@ class ListService(lister.Lister):
         self.log.debug('take_action(%s)' % parsed_args)
         columns = ('ID', 'Name', 'Type', 'Enabled')
         data = self.app.client_manager.identity.services.list()
-        return (columns,
-                (utils.get_item_properties(
-                    s, columns,
-                    formatters={},
-                ) for s in data))
+        get_row = utils.item_properties_getter(
+            columns,
+            formatters={},
+        )
+        return (columns, (get_row(s) for s in data))
 
 
 class SetService(show.ShowOne):
@@ -155,6 +156,7 @@ class SetService(show.ShowOne):
             parsed_args.name,
             parsed_args.type,
             parsed_args.enabled)
+        utils.invalidate_resource(identity_client.services, service.id)
 
         return
 
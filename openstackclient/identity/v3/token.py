@@ -239,8 +239,8 @@ class ListAccessToken(lister.Lister):
         columns = ('ID', 'Consumer ID', 'Expires At',
                    'Project Id', 'Authorizing User Id')
         data = identity_client.tokens.list_access_tokens(user)
-        return (columns,
-                (utils.get_item_properties(
-                    s, columns,
-                    formatters={},
-                ) for s in data))
+        get_row = utils.item_properties_getter(
+            columns,
+            formatters={},
+        )
+        return (columns, (get_row(s) for s in data))
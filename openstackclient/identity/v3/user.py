@@ -130,6 +130,7 @@ class DeleteUser(command.Command):
         user = utils.find_resource(
             identity_client.users, parsed_args.user)
         identity_client.users.delete(user.id)
+        utils.invalidate_resource(identity_client.users, user.id)
         return
 
 
@@ -237,11 +238,11 @@ class ListUser(lister.Lister):
                 columns = ('ID', 'Name')
             data = self.app.client_manager.identity.users.list()
 
-        return (columns,
-                (utils.get_item_properties(
-                    s, columns,
-                    formatters={},
-                ) for s in data))
+        get_row = utils.item_properties_getter(
+            columns,
+            formatters={},
+        )
+        return (columns, (get_row(s) for s in data))
 
 
 class SetUser(command.Command):
@@ -331,6 +332,7 @@ class SetUser(command.Command):
             sys.stderr.write("User not updated, no arguments present")
             return
         identity_client.users.update(user.id, **kwargs)
+        utils.invalidate_resource(identity_client.users, user.id)
         return
 
 
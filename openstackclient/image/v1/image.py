@@ -185,6 +185,7 @@ class CreateImage(show.ShowOne):
             # If an image is specified via --file, --location or --copy-from
             # let the API handle it
             image = image_client.images.update(image, **args)
+            utils.invalidate_resource(image_client.images, image.id)
 
         info = {}
         info.update(image._info)
@@ -214,6 +215,7 @@ class DeleteImage(command.Command):
             parsed_args.image,
         )
         image_client.images.delete(image)
+        utils.invalidate_resource(image_client.images, image.id)
 
 
 class ListImage(lister.Lister):
@@ -242,7 +244,8 @@ class ListImage(lister.Lister):
         data = image_client.images.list(**kwargs)
         columns = ["ID", "Name"]
 
-        return (columns, (utils.get_item_properties(s, columns) for s in data))
+        get_row = utils.item_properties_getter(columns)
+        return (columns, (get_row(s) for s in data))
 
 
 class SaveImage(command.Command):
@@ -368,6 +371,7 @@ class SetImage(show.ShowOne):
         # Merge properties
         args["properties"].update(image.properties)
         image = image_client.images.update(image, **args)
+        utils.invalidate_resource(image_client.images, image.id)
 
         info = {}
         info.update(image._info)
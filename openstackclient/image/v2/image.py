@@ -49,6 +49,7 @@ class DeleteImage(command.Command):
             parsed_args.image,
         )
         image_client.images.delete(image)
+        utils.invalidate_resource(image_client.images, image.id)
 
 
 class ListImage(lister.Lister):
@@ -77,7 +78,8 @@ class ListImage(lister.Lister):
         data = image_client.images.list(**kwargs)
         columns = ["ID", "Name"]
 
-        return (columns, (utils.get_item_properties(s, columns) for s in data))
+        get_row = utils.item_properties_getter(columns)
+        return (columns, (get_row(s) for s in data))
 
 
 class SaveImage(command.Command):
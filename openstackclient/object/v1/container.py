@@ -64,6 +64,14 @@ class ListContainer(lister.Lister):
             default=False,
             help='List all containers (default is 10000)',
         )
+        parser.add_argument(
+            '--prefetch',
+            metavar='<pages>',
+            type=int,
+            default=0,
+            help='With --all, request up to <pages> pages ahead while '
+                 'the current page is output',
+        )
         return parser
 
     def take_action(self, parsed_args):
@@ -83,18 +91,23 @@ class ListContainer(lister.Lister):
             kwargs['end_marker'] = parsed_args.end_marker
         if parsed_args.limit:
             kwargs['limit'] = parsed_args.limit
-        if parsed_args.all:
-            kwargs['full_listing'] = True
 
-        data = lib_container.list_containers(
+        if parsed_args.all:
+            if parsed_args.prefetch:
+                kwargs['prefetch'] = parsed_args.prefetch
+            # Stream the rows as the pages arrive
+            list_func = lib_container.iter_containers
+        else:
+            list_func = lib_container.list_containers
+        data = list_func(
             self.app.restapi,
             self.app.client_manager.object.endpoint,
             **kwargs
         )
         #print "data: %s" % data
 
-        return (columns,
-                (utils.get_dict_properties(
-                    s, columns,
-                    formatters={},
-                ) for s in data))
+        get_row = utils.dict_properties_getter(
+            columns,
+            formatters={},
+        )
+        return (columns, (get_row(s) for s in data))
@@ -16,6 +16,9 @@
 
 """Object v1 API library"""
 
+from openstackclient.common import requestmemo
+from openstackclient.common import utils
+
 
 def list_containers(
     api,
@@ -40,27 +43,14 @@ def list_containers(
     """
 
     if full_listing:
-        data = listing = list_containers(
+        return list(iter_containers(
             api,
             url,
             marker,
             limit,
             end_marker,
             prefix,
-        )
-        while listing:
-            marker = listing[-1]['name']
-            listing = list_containers(
-                api,
-                url,
-                marker,
-                limit,
-                end_marker,
-                prefix,
-            )
-            if listing:
-                data.extend(listing)
-        return data
+        ))
 
     object_url = url
     query = "format=json"
@@ -75,3 +65,81 @@ def list_containers(
     url = "%s?%s" % (object_url, query)
     response = api.request('GET', url)
     return response.json()
+
+
+def list_containers_async(api, url, **kwargs):
+    """Get containers in an account without waiting
+
+    Takes the same arguments as list_containers().
+
+    :param api: an AsyncRESTApi object
+    :returns: a utils.Future of the list_containers() result
+    """
+
+    return api.submit(list_containers, api, url, **kwargs)
+
+
+def iter_containers(
+    api,
+    url,
+    marker=None,
+    limit=None,
+    end_marker=None,
+    prefix=None,
+    prefetch=0,
+):
+    """Get all containers in an account, a page at a time
+
+    Takes the same arguments as list_containers().  Each page is
+    requested only when the containers in the previous one have been
+    consumed so the whole listing is never held in memory.
+
+    :param prefetch: if set, request up to this many pages ahead in a
+                     background thread while the current page is used
+    :returns: a generator of containers
+    """
+
+    pages = _iter_container_pages(
+        api,
+        url,
+        marker,
+        limit,
+        end_marker,
+        prefix,
+    )
+    if prefetch:
+        pages = utils.prefetch(pages, prefetch)
+    try:
+        for listing in pages:
+            for container in listing:
+                yield container
+    finally:
+        pages.close()
+
+
+def _iter_container_pages(
+    api,
+    url,
+    marker,
+    limit,
+    end_marker,
+    prefix,
+):
+    """Get the pages of a full listing, following the marker"""
+
+    while True:
+        # Each page has its own marker so is never asked for again, and
+        # remembering them would hold the whole listing in memory
+        with requestmemo.bypass():
+            listing = list_containers(
+                api,
+                url,
+                marker,
+                limit,
+                end_marker,
+                prefix,
+            )
+        if not listing:
+            return
+        yield listing
+        marker = listing[-1]['name']
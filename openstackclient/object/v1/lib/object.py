@@ -16,6 +16,20 @@
 
 """Object v1 API library"""
 
+import six
+from six.moves.urllib import parse
+
+from openstackclient.common import requestmemo
+from openstackclient.common import utils
+
+
+# Names are sampled and searched a character at a time using the code
+# points up to here
+_MAX_CHAR = 0xffff
+
+# The names read to find the characters used in a large listing
+SAMPLE_SIZE = 100
+
 
 def list_objects(
     api,
@@ -28,6 +42,7 @@ def list_objects(
     prefix=None,
     path=None,
     full_listing=False,
+    parallel=0,
 ):
     """Get objects in a container
 
@@ -42,12 +57,14 @@ def list_objects(
     :param path: path query (equivalent: "delimiter=/" and "prefix=path/")
     :param full_listing: if True, return a full listing, else returns a max
                          of 10000 listings
+    :param parallel: with full_listing, the number of ranges of the
+                     listing to get at the same time
     :returns: a tuple of (response headers, a list of objects) The response
               headers will be a dict and all header names will be lowercase.
     """
 
     if full_listing:
-        data = listing = list_objects(
+        return list(iter_objects(
             api,
             url,
             container,
@@ -57,41 +74,487 @@ def list_objects(
             delimiter,
             prefix,
             path,
-        )
-        while listing:
-            if delimiter:
-                marker = listing[-1].get('name', listing[-1].get('subdir'))
-            else:
-                marker = listing[-1]['name']
-            listing = list_objects(
-                api,
-                url,
-                container,
-                marker,
-                limit,
-                end_marker,
-                delimiter,
-                prefix,
-                path,
-            )
-            if listing:
-                data.extend(listing)
-        return data
+            parallel=parallel,
+        ))
 
     object_url = url
     query = "format=json"
     if marker:
-        query += '&marker=%s' % marker
+        query += '&marker=%s' % _quote(marker)
     if limit:
         query += '&limit=%d' % limit
     if end_marker:
-        query += '&end_marker=%s' % end_marker
+        query += '&end_marker=%s' % _quote(end_marker)
     if delimiter:
-        query += '&delimiter=%s' % delimiter
+        query += '&delimiter=%s' % _quote(delimiter)
     if prefix:
-        query += '&prefix=%s' % prefix
+        query += '&prefix=%s' % _quote(prefix)
     if path:
-        query += '&path=%s' % path
+        query += '&path=%s' % _quote(path)
     url = "%s/%s?%s" % (object_url, container, query)
     response = api.request('GET', url)
     return response.json()
+
+
+def _quote(value):
+    if isinstance(value, six.text_type):
+        value = value.encode('utf-8')
+    return parse.quote(value)
+
+
+def list_objects_async(api, url, container, **kwargs):
+    """Get objects in a container without waiting
+
+    Takes the same arguments as list_objects().
+
+    :param api: an AsyncRESTApi object
+    :returns: a utils.Future of the list_objects() result
+    """
+
+    return api.submit(list_objects, api, url, container, **kwargs)
+
+
+def iter_objects(
+    api,
+    url,
+    container,
+    marker=None,
+    limit=None,
+    end_marker=None,
+    delimiter=None,
+    prefix=None,
+    path=None,
+    prefetch=0,
+    parallel=0,
+    boundaries=None,
+):
+    """Get all objects in a container, a page at a time
+
+    Takes the same arguments as list_objects().  Each page is requested
+    only when the objects in the previous one have been consumed so the
+    whole listing is never held in memory.
+
+    With parallel the names are split into up to that many ranges which
+    are listed at the same time, see _iter_sharded_pages().  This is
+    not done for listings using delimiter or path.
+
+    :param prefetch: if set, request up to this many pages ahead in a
+                     background thread while the current page is used;
+                     with parallel, the pages each range may buffer
+                     (default: 1)
+    :param parallel: the number of ranges to list at the same time
+    :param boundaries: names to split the ranges at, by default they are
+                       picked by sampling the container
+    :returns: a generator of objects
+    """
+
+    if parallel and parallel > 1 and not (delimiter or path):
+        pages = _iter_sharded_pages(
+            api,
+            url,
+            container,
+            marker,
+            limit,
+            end_marker,
+            prefix,
+            parallel,
+            boundaries,
+            prefetch,
+        )
+    else:
+        pages = _iter_object_pages(
+            api,
+            url,
+            container,
+            marker,
+            limit,
+            end_marker,
+            delimiter,
+            prefix,
+            path,
+        )
+        if prefetch:
+            pages = utils.prefetch(pages, prefetch)
+    try:
+        for listing in pages:
+            for obj in listing:
+                yield obj
+    finally:
+        pages.close()
+
+
+def _iter_object_pages(
+    api,
+    url,
+    container,
+    marker,
+    limit,
+    end_marker,
+    delimiter,
+    prefix,
+    path,
+):
+    """Get the pages of a full listing, following the marker"""
+
+    while True:
+        # Each page has its own marker so is never asked for again, and
+        # remembering them would hold the whole listing in memory
+        with requestmemo.bypass():
+            listing = list_objects(
+                api,
+                url,
+                container,
+                marker,
+                limit,
+                end_marker,
+                delimiter,
+                prefix,
+                path,
+            )
+        if not listing:
+            return
+        yield listing
+        if delimiter:
+            marker = listing[-1].get('name', listing[-1].get('subdir'))
+        else:
+            marker = listing[-1]['name']
+
+
+def _iter_sharded_pages(
+    api,
+    url,
+    container,
+    marker,
+    limit,
+    end_marker,
+    prefix,
+    parallel,
+    boundaries,
+    prefetch,
+):
+    """Get the pages of a full listing, listing ranges concurrently
+
+    The names between marker and end_marker are split at boundaries into
+    ranges that are each listed by their own thread.  The pages are
+    returned in order, ranges after the current one are buffered.
+    """
+
+    if boundaries is None:
+        boundaries = _sample_boundaries(
+            api,
+            url,
+            container,
+            marker,
+            end_marker,
+            prefix,
+            parallel,
+        )
+    boundaries = sorted(set(
+        b for b in boundaries
+        if (not marker or b > marker) and (not end_marker or b < end_marker)
+    ))
+
+    starts = [marker] + boundaries
+    stops = boundaries + [end_marker]
+    shards = []
+    try:
+        for start, stop in zip(starts, stops):
+            shards.append(utils.prefetch(
+                _iter_shard_pages(
+                    api,
+                    url,
+                    container,
+                    start,
+                    limit,
+                    stop,
+                    prefix,
+                    include_start=start is not marker,
+                ),
+                # Ranges waiting their turn hold only a few pages
+                max(prefetch, 1),
+            ))
+        for shard in shards:
+            for listing in shard:
+                yield listing
+    finally:
+        for shard in shards:
+            shard.close()
+
+
+def _iter_shard_pages(
+    api,
+    url,
+    container,
+    start,
+    limit,
+    stop,
+    prefix,
+    include_start,
+):
+    """Get the pages of the names from start up to but not including stop
+
+    marker excludes the name it is given, so the object named start, if
+    there is one, is looked up on its own when include_start is set.
+    """
+
+    if include_start and start.startswith(prefix or ''):
+        listing = list_objects(api, url, container, limit=1, prefix=start)
+        if listing and listing[0]['name'] == start:
+            yield listing
+    for listing in _iter_object_pages(
+        api,
+        url,
+        container,
+        start,
+        limit,
+        stop,
+        None,
+        prefix,
+        None,
+    ):
+        yield listing
+
+
+def _sample_boundaries(
+    api,
+    url,
+    container,
+    marker,
+    end_marker,
+    prefix,
+    count,
+    delimiter='/',
+):
+    """Pick names that split a listing into count ranges
+
+    When one page of the listing rolled up on delimiter holds all of
+    it, and has enough entries, the ranges fall between
+    pseudo-directories.  Other listings are sampled across all of
+    their names, see _probe_boundaries().
+    """
+
+    listing = list_objects(
+        api,
+        url,
+        container,
+        marker,
+        None,
+        end_marker,
+        delimiter,
+        prefix,
+    )
+    names = []
+    for entry in listing:
+        if 'subdir' in entry:
+            names.append(entry['subdir'][:-len(delimiter)])
+        else:
+            names.append(entry['name'])
+    if not names:
+        return []
+
+    if 'subdir' in listing[-1]:
+        # Skip over the names in the last pseudo-directory
+        subdir = listing[-1]['subdir']
+        after = subdir[:-1] + six.unichr(ord(subdir[-1]) + 1)
+    else:
+        after = listing[-1]['name']
+    if len(names) >= count and \
+            _next_name(api, url, container, after, end_marker, prefix) is None:
+        step = float(len(names)) / count
+        return [names[int(step * i)] for i in range(1, count)]
+
+    sample = [o['name'] for o in list_objects(
+        api,
+        url,
+        container,
+        marker,
+        SAMPLE_SIZE,
+        end_marker,
+        None,
+        prefix,
+    )]
+    if not sample:
+        return []
+    if _next_name(api, url, container, sample[-1], end_marker, prefix) \
+            is None:
+        # The sample is the whole listing
+        step = float(len(sample)) / count
+        return [sample[int(step * i)] for i in range(1, count)]
+    return _probe_boundaries(
+        api,
+        url,
+        container,
+        sample,
+        end_marker,
+        prefix,
+        count,
+    )
+
+
+def _probe_boundaries(
+    api,
+    url,
+    container,
+    sample,
+    end_marker,
+    prefix,
+    count,
+):
+    """Pick names spread evenly between the first and last names
+
+    Points are interpolated between the first and last names as if the
+    names were numbers, see _interpolate(), and the name after each
+    point is looked up with a one-name listing.  This assumes the names
+    are spread evenly between the two, and takes one request per
+    boundary plus about ten for each character needed to find the last
+    name.
+
+    :param sample: the first names in the listing
+    """
+
+    first = sample[0]
+
+    last = end_marker or _find_last_name(
+        api,
+        url,
+        container,
+        first,
+        end_marker,
+        prefix,
+    )
+    boundaries = []
+    for point in _interpolate(first, last, count, sample):
+        name = _next_name(api, url, container, point, end_marker, prefix)
+        if name is not None:
+            boundaries.append(name)
+    return boundaries
+
+
+def _find_last_name(
+    api,
+    url,
+    container,
+    first,
+    end_marker,
+    prefix,
+    extra_chars=3,
+):
+    """Return the start of the last name in a listing
+
+    The last name is found a character at a time, bisecting on whether
+    any name follows a marker, up to extra_chars characters past where
+    it differs from first.
+    """
+
+    def exists_after(marker):
+        return _next_name(
+            api,
+            url,
+            container,
+            marker,
+            end_marker,
+            prefix,
+        ) is not None
+
+    last = prefix or ''
+    extra = 0
+    while extra < extra_chars:
+        if first.startswith(last) and len(first) > len(last):
+            char = first[len(last)]
+            if not exists_after(last + char + six.unichr(_MAX_CHAR)):
+                # The last name starts the same way as first
+                last += char
+                continue
+            low = _char_index(char)
+        else:
+            low = _char_index(' ')
+            extra += 1
+        if not exists_after(last + _index_char(low)):
+            break
+        high = _char_index(six.unichr(0x7f))
+        if low >= high or exists_after(last + _index_char(high)):
+            high = _char_index(six.unichr(_MAX_CHAR)) + 1
+        # low has names after it, high does not
+        while high - low > 1:
+            middle = (low + high) // 2
+            if exists_after(last + _index_char(middle)):
+                low = middle
+            else:
+                high = middle
+        last += _index_char(low)
+    return last
+
+
+def _interpolate(first, last, count, sample=()):
+    """Return count - 1 strings spread evenly between first and last
+
+    The strings are treated as numbers after their common start, with
+    a digit for each character seen there in first, last and the
+    sample names, so names made of a few characters, like hex digits,
+    are split evenly.  last is padded with the highest digit as it may
+    be only the start of the last name.
+    """
+    common = 0
+    while common < min(len(first), len(last)) and \
+            first[common] == last[common]:
+        common += 1
+    head = first[:common]
+    chars = set(first[common:] + last[common:])
+    for name in sample:
+        chars.update(name[common:])
+    digits = sorted(chars)
+    if len(digits) < 2:
+        return []
+    base = len(digits)
+    rank = dict((char, i) for i, char in enumerate(digits))
+    width = max(len(first), len(last)) + 1 - common
+
+    def to_number(name, pad):
+        number = 0
+        for i in range(width):
+            digit = rank[name[i]] if i < len(name) else pad
+            number = number * base + digit
+        return number
+
+    low = to_number(first[common:], 0)
+    high = to_number(last[common:], base - 1)
+    points = []
+    for i in range(1, count):
+        number = low + (high - low) * i // count
+        point = []
+        for _i in range(width):
+            number, digit = divmod(number, base)
+            point.append(digits[digit])
+        points.append(head + ''.join(reversed(point)))
+    return points
+
+
+def _char_index(char):
+    """Number the code points up to _MAX_CHAR, leaving out surrogates"""
+    index = ord(char)
+    if index >= 0xe000:
+        index -= 0x800
+    return index
+
+
+def _index_char(index):
+    if index >= 0xd800:
+        index += 0x800
+    return six.unichr(index)
+
+
+def _next_name(api, url, container, marker, end_marker, prefix):
+    """Return the first name after marker, or None"""
+    listing = list_objects(
+        api,
+        url,
+        container,
+        marker,
+        1,
+        end_marker,
+        None,
+        prefix,
+    )
+    if listing:
+        return listing[0]['name']
+    return None
@@ -74,6 +74,29 @@ class ListObject(lister.Lister):
             default=False,
             help='List all objects in container (default is 10000)',
         )
+        parser.add_argument(
+            '--prefetch',
+            metavar='<pages>',
+            type=int,
+            default=0,
+            help='With --all, request up to <pages> pages ahead while '
+                 'the current page is output',
+        )
+        parser.add_argument(
+            '--parallel',
+            metavar='<n>',
+            type=int,
+            default=0,
+            help='With --all, split the listing into <n> ranges that are '
+                 'listed at the same time',
+        )
+        parser.add_argument(
+            '--boundary',
+            metavar='<name>',
+            action='append',
+            help='With --parallel, start a range at <name> instead of '
+                 'sampling the container (repeat for multiple ranges)',
+        )
         return parser
 
     def take_action(self, parsed_args):
@@ -101,18 +124,27 @@ class ListObject(lister.Lister):
             kwargs['end_marker'] = parsed_args.end_marker
         if parsed_args.limit:
             kwargs['limit'] = parsed_args.limit
-        if parsed_args.all:
-            kwargs['full_listing'] = True
 
-        data = lib_object.list_objects(
+        if parsed_args.all:
+            if parsed_args.prefetch:
+                kwargs['prefetch'] = parsed_args.prefetch
+            if parsed_args.parallel:
+                kwargs['parallel'] = parsed_args.parallel
+            if parsed_args.boundary:
+                kwargs['boundaries'] = parsed_args.boundary
+            # Stream the rows as the pages arrive
+            list_func = lib_object.iter_objects
+        else:
+            list_func = lib_object.list_objects
+        data = list_func(
             self.app.restapi,
             self.app.client_manager.object.endpoint,
             parsed_args.container,
             **kwargs
         )
 
-        return (columns,
-                (utils.get_dict_properties(
-                    s, columns,
-                    formatters={},
-                ) for s in data))
+        get_row = utils.dict_properties_getter(
+            columns,
+            formatters={},
+        )
+        return (columns, (get_row(s) for s in data))
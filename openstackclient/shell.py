@@ -19,6 +19,7 @@ import argparse
 import getpass
 import logging
 import os
+import shlex
 import sys
 
 from cliff import app
@@ -28,9 +29,15 @@ import openstackclient
 from openstackclient.common import clientmanager
 from openstackclient.common import commandmanager
 from openstackclient.common import exceptions as exc
-from openstackclient.common import openstackkeyring
+from openstackclient.common import httpcache
+from openstackclient.common import profiling
+from openstackclient.common import requestmemo
+from openstackclient.common import resourcecache
 from openstackclient.common import restapi
+from openstackclient.common import timing
+from openstackclient.common import tokencache
 from openstackclient.common import utils
+from openstackclient.common import waiter
 
 
 KEYRING_SERVICE = 'openstack'
@@ -41,6 +48,7 @@ DEFAULT_IMAGE_API_VERSION = '1'
 DEFAULT_OBJECT_API_VERSION = '1'
 DEFAULT_VOLUME_API_VERSION = '1'
 DEFAULT_DOMAIN = 'default'
+DEFAULT_CACHE_DIR = '~/.openstack/cache'
 
 
 def env(*vars, **kwargs):
@@ -67,12 +75,33 @@ class OpenStackShell(app.App):
         super(OpenStackShell, self).__init__(
             description=__doc__.strip(),
             version=openstackclient.__version__,
-            command_manager=commandmanager.CommandManager('openstack.cli'))
+            command_manager=commandmanager.CommandManager(
+                'openstack.cli',
+                index_file=os.path.join(
+                    os.path.expanduser(
+                        env('OS_CACHE_DIR', default=DEFAULT_CACHE_DIR)),
+                    'commands.json',
+                ),
+            ))
 
         # This is instantiated in initialize_app() only when using
         # password flow auth
         self.auth_client = None
 
+        # This is instantiated in initialize_app()
+        self.restapi = None
+
+        # Repeated GET requests made by a command are only sent once
+        self.request_memo = requestmemo.RequestMemo()
+
+        # This is instantiated in initialize_app() only when
+        # --os-resource-cache is given
+        self.resource_cache = None
+
+        # This is instantiated in initialize_app() only when --timing
+        # is given
+        self.timing = None
+
         # NOTE(dtroyer): This hack changes the help action that Cliff
         #                automatically adds to the parser so we can defer
         #                its execution until after the api-versioned commands
@@ -229,6 +258,153 @@ class OpenStackShell(app.App):
                             help='Use keyring to store password, '
                                  'default=False (Env: OS_USE_KEYRING)')
 
+        env_os_token_cache = env('OS_TOKEN_CACHE', default=False)
+        if type(env_os_token_cache) == str:
+            if env_os_token_cache.lower() in ['true', '1']:
+                env_os_token_cache = True
+            else:
+                env_os_token_cache = False
+        parser.add_argument('--os-token-cache',
+                            default=env_os_token_cache,
+                            action='store_true',
+                            help='Cache authentication tokens between '
+                                 'commands, default=False '
+                                 '(Env: OS_TOKEN_CACHE)')
+        parser.add_argument(
+            '--os-cache-dir',
+            metavar='<cache-dir>',
+            default=env('OS_CACHE_DIR', default=DEFAULT_CACHE_DIR),
+            help='Directory for cached data, default=' +
+                 DEFAULT_CACHE_DIR +
+                 ' (Env: OS_CACHE_DIR).  The command index is read '
+                 'before the options, so it only follows OS_CACHE_DIR')
+
+        env_os_resource_cache = env('OS_RESOURCE_CACHE', default=False)
+        if type(env_os_resource_cache) == str:
+            if env_os_resource_cache.lower() in ['true', '1']:
+                env_os_resource_cache = True
+            else:
+                env_os_resource_cache = False
+        parser.add_argument('--os-resource-cache',
+                            default=env_os_resource_cache,
+                            action='store_true',
+                            help='Cache resource name to ID lookups, '
+                                 'default=False (Env: OS_RESOURCE_CACHE)')
+        parser.add_argument(
+            '--os-resource-cache-ttl',
+            metavar='<seconds>',
+            type=int,
+            default=env(
+                'OS_RESOURCE_CACHE_TTL',
+                default=resourcecache.DEFAULT_TTL),
+            help='Seconds to keep resource name lookups, default=' +
+                 str(resourcecache.DEFAULT_TTL) +
+                 ' (Env: OS_RESOURCE_CACHE_TTL)')
+        env_os_http_cache = env('OS_HTTP_CACHE', default=False)
+        if type(env_os_http_cache) == str:
+            if env_os_http_cache.lower() in ['true', '1']:
+                env_os_http_cache = True
+            else:
+                env_os_http_cache = False
+        parser.add_argument('--os-http-cache',
+                            default=env_os_http_cache,
+                            action='store_true',
+                            help='Cache API responses and revalidate them '
+                                 'with conditional requests, default=False '
+                                 '(Env: OS_HTTP_CACHE)')
+        parser.add_argument(
+            '--os-http-cache-size',
+            metavar='<megabytes>',
+            type=int,
+            default=env(
+                'OS_HTTP_CACHE_SIZE',
+                default=httpcache.DEFAULT_MAX_SIZE // (1024 * 1024)),
+            help='Size of the API response cache, default=' +
+                 str(httpcache.DEFAULT_MAX_SIZE // (1024 * 1024)) +
+                 ' (Env: OS_HTTP_CACHE_SIZE)')
+        parser.add_argument(
+            '--os-pool-connections',
+            metavar='<hosts>',
+            type=int,
+            default=env(
+                'OS_POOL_CONNECTIONS',
+                default=restapi.DEFAULT_POOL_CONNECTIONS),
+            help='Number of hosts to keep connections open to, default=' +
+                 str(restapi.DEFAULT_POOL_CONNECTIONS) +
+                 ' (Env: OS_POOL_CONNECTIONS)')
+        parser.add_argument(
+            '--os-pool-maxsize',
+            metavar='<connections>',
+            type=int,
+            default=env(
+                'OS_POOL_MAXSIZE',
+                default=restapi.DEFAULT_POOL_MAXSIZE),
+            help='Number of connections to keep open to each host, '
+                 'default=' + str(restapi.DEFAULT_POOL_MAXSIZE) +
+                 ' (Env: OS_POOL_MAXSIZE)')
+        parser.add_argument(
+            '--os-pool-block',
+            default=False,
+            action='store_true',
+            help='Wait for a free connection rather than opening more '
+                 'than --os-pool-maxsize to a host')
+        parser.add_argument(
+            '--os-no-keep-alive',
+            dest='os_keep_alive',
+            default=True,
+            action='store_false',
+            help='Close connections after each request')
+        parser.add_argument(
+            '--os-retries',
+            metavar='<count>',
+            type=int,
+            default=env('OS_RETRIES', default=restapi.DEFAULT_RETRIES),
+            help='Number of times to retry a failed request, default=' +
+                 str(restapi.DEFAULT_RETRIES) + ' (Env: OS_RETRIES)')
+        parser.add_argument(
+            '--os-timeout',
+            metavar='<seconds>',
+            type=float,
+            default=env('OS_TIMEOUT', default=None),
+            help='Socket timeout for API requests (Env: OS_TIMEOUT)')
+        parser.add_argument(
+            '--os-wait-timeout',
+            metavar='<seconds>',
+            type=float,
+            default=env('OS_WAIT_TIMEOUT',
+                        default=waiter.DEFAULT_WAIT_TIMEOUT),
+            help='Give up waiting for --wait to complete after <seconds>, '
+                 '0 waits forever, default=' +
+                 str(waiter.DEFAULT_WAIT_TIMEOUT) +
+                 ' (Env: OS_WAIT_TIMEOUT)')
+        parser.add_argument(
+            '--timing',
+            default=False,
+            action='store_true',
+            help='Print the time taken by each API request')
+        parser.add_argument(
+            '--profile',
+            metavar='<file>',
+            help='Profile the command, writing the profile to <file> '
+                 'and a report to <file>.txt')
+        parser.add_argument(
+            '--profile-memory',
+            default=False,
+            action='store_true',
+            help='Profile the memory used by the command, the report is '
+                 'written to the --profile report or to stderr')
+        parser.add_argument(
+            '--batch',
+            metavar='<file>',
+            help='Run the commands in <file>, one per line, or from '
+                 'stdin if <file> is -')
+        parser.add_argument(
+            '--stop-on-error',
+            default=False,
+            action='store_true',
+            help='Stop running --batch commands after the first one that '
+                 'fails')
+
         return parser
 
     def authenticate_user(self):
@@ -284,6 +460,11 @@ class OpenStackShell(app.App):
                     "You must provide an auth url via"
                     " either --os-auth-url or via env[OS_AUTH_URL]")
 
+        token_cache = None
+        if self.options.os_token_cache:
+            token_cache = tokencache.TokenCache(
+                os.path.join(self.options.os_cache_dir, 'tokens'))
+
         self.client_manager = clientmanager.ClientManager(
             token=self.options.os_token,
             url=self.options.os_url,
@@ -293,11 +474,16 @@ class OpenStackShell(app.App):
             username=self.options.os_username,
             password=self.options.os_password,
             region_name=self.options.os_region_name,
-            api_version=self.api_version)
+            api_version=self.api_version,
+            token_cache=token_cache,
+            request_memo=self.request_memo,
+            timing=self.timing)
         return
 
     def init_keyring_backend(self):
         """Initialize openstack backend to use for keyring"""
+        # Only load keyring and its crypto dependencies when asked for
+        from openstackclient.common import openstackkeyring
         return openstackkeyring.os_keyring()
 
     def get_password_from_keyring(self):
@@ -380,8 +566,38 @@ class OpenStackShell(app.App):
         if self.options.deferred_help:
             self.DeferredHelpAction(self.parser, self.parser, None, None)
 
+        if self.options.batch and argv:
+            raise exc.CommandError("--batch can not be given a command")
+
+        if self.options.timing:
+            self.timing = timing.Timing()
+
         # Set up common client session
-        self.restapi = restapi.RESTApi()
+        http_cache = None
+        if self.options.os_http_cache:
+            http_cache = httpcache.HTTPCache(
+                os.path.join(self.options.os_cache_dir, 'http'),
+                max_size=self.options.os_http_cache_size * 1024 * 1024,
+            )
+        self.restapi = restapi.RESTApi(
+            pool_connections=self.options.os_pool_connections,
+            pool_maxsize=self.options.os_pool_maxsize,
+            pool_block=self.options.os_pool_block,
+            keep_alive=self.options.os_keep_alive,
+            timeout=self.options.os_timeout,
+            retries=self.options.os_retries,
+            http_cache=http_cache,
+            request_memo=self.request_memo,
+            timing=self.timing,
+        )
+
+        # Set up the name lookup cache for utils.find_resource()
+        if self.options.os_resource_cache:
+            self.resource_cache = resourcecache.ResourceCache(
+                os.path.join(self.options.os_cache_dir, 'resources.json'),
+                ttl=self.options.os_resource_cache_ttl,
+            )
+            utils.set_resource_cache(self.resource_cache)
 
         # If the user is not asking for help, make sure they
         # have given us auth.
@@ -391,16 +607,153 @@ class OpenStackShell(app.App):
             cmd_factory, cmd_name, sub_argv = cmd_info
         if self.interactive_mode or cmd_name != 'help':
             self.authenticate_user()
-            self.restapi.set_auth(self.client_manager.identity.auth_token)
+            # The token is not needed until the first API request
+            self.restapi.set_auth_source(self.client_manager)
 
     def prepare_to_run_command(self, cmd):
         """Set up auth and API versions"""
         self.log.debug('prepare_to_run_command %s', cmd.__class__.__name__)
         self.log.debug("api: %s" % cmd.api if hasattr(cmd, 'api') else None)
+        self.request_memo.clear()
+        self.request_memo.saved = 0
+        if self.timing:
+            self.timing.clear()
         return
 
+    def interact(self):
+        if self.options.batch:
+            return self.run_batch(self.options.batch)
+        return super(OpenStackShell, self).interact()
+
+    def run_batch(self, filename):
+        """Run the commands in a file, one per line
+
+        All of the commands share the authentication and connections made
+        by the first.  Blank lines and lines starting with # are skipped.
+        The line number and exit status of each command are written to
+        stderr as it finishes, followed by a count of the commands that
+        ran and failed.
+
+        :param filename: the file to read, or - for stdin
+        :rtype: 0 if every command succeeded, otherwise the exit status of
+                the last one that failed
+        """
+        try:
+            if filename == '-':
+                lines = self.stdin.readlines()
+            else:
+                with open(filename, 'r') as f:
+                    lines = f.readlines()
+        except (IOError, OSError) as e:
+            self.log.error('unable to read batch file: %s', e)
+            return 1
+
+        result = 0
+        ran = failed = 0
+        stopped = None
+        for lineno, line in enumerate(lines, 1):
+            line = line.strip()
+            if not line or line.startswith('#'):
+                continue
+            try:
+                status = self.run_subcommand(shlex.split(line))
+            except SystemExit as e:
+                # argparse exits on bad arguments, which only ends this
+                # command
+                status = e.code
+                if status is None:
+                    status = 0
+                elif not isinstance(status, int):
+                    self.log.error('%s', status)
+                    status = 1
+            except Exception as e:
+                # run_subcommand() re-raises errors with --debug
+                self.log.error('%s', e)
+                status = 1
+            ran += 1
+            self.stderr.write(
+                'line %d: exit status %d: %s\n' % (lineno, status, line)
+            )
+            if status:
+                result = status
+                failed += 1
+                if self.options.stop_on_error:
+                    stopped = lineno
+                    break
+        summary = '%d commands run, %d failed' % (ran, failed)
+        if stopped:
+            summary += ', stopped at line %d' % stopped
+        self.stderr.write(summary + '\n')
+        return result
+
+    def run_subcommand(self, argv):
+        # Remembered requests are only reused within one command
+        self.request_memo.clear()
+        try:
+            return self._run_subcommand(argv)
+        finally:
+            self.request_memo.clear()
+
+    def _run_subcommand(self, argv):
+        if not (self.options.profile or self.options.profile_memory):
+            return super(OpenStackShell, self).run_subcommand(argv)
+        profiler = profiling.Profiler(
+            cpu=bool(self.options.profile),
+            memory=self.options.profile_memory,
+        )
+        profiler.start()
+        try:
+            return super(OpenStackShell, self).run_subcommand(argv)
+        finally:
+            profiler.stop()
+            self.write_profile(profiler)
+
+    def write_profile(self, profiler):
+        """Write the profile of a command where --profile asked for it"""
+        if not self.options.profile:
+            self.stderr.write(profiler.report())
+            return
+        try:
+            profiler.dump_stats(self.options.profile)
+            with open(self.options.profile + '.txt', 'w') as f:
+                f.write(profiler.report())
+        except (IOError, OSError) as e:
+            self.log.error('unable to write profile: %s', e)
+
     def clean_up(self, cmd, result, err):
         self.log.debug('clean_up %s', cmd.__class__.__name__)
+        if self.resource_cache:
+            self.log.debug(
+                'resource cache: %d hits, %d misses',
+                self.resource_cache.hits,
+                self.resource_cache.misses,
+            )
+            self.resource_cache.save()
+        if self.restapi:
+            self.log.debug(
+                'connection pool: %(connections)d connections opened, '
+                '%(reused)d requests reused a connection',
+                self.restapi.get_pool_stats(),
+            )
+            if self.restapi.http_cache:
+                self.log.debug(
+                    'http cache: %d responses not modified',
+                    self.restapi.http_cache.hits,
+                )
+            if self.restapi.retry_count:
+                self.log.debug(
+                    '%d retries, %.2fs spent waiting to retry',
+                    self.restapi.retry_count,
+                    self.restapi.retry_time,
+                )
+        if self.request_memo.saved:
+            self.log.debug(
+                'request memo: %d repeated requests not sent',
+                self.request_memo.saved,
+            )
+        self.request_memo.clear()
+        if self.timing:
+            self.stderr.write(self.timing.report())
         if err:
             self.log.debug('got an error: %s', err)
 
@@ -13,10 +13,19 @@
 #   under the License.
 #
 
+import datetime
+
+import fixtures
+import mock
+
 from openstackclient.common import clientmanager
+from openstackclient.common import tokencache
 from openstackclient.tests import utils
 
 
+AUTH_URL = "http://0.0.0.0"
+
+
 class Container(object):
     attr = clientmanager.ClientCache(lambda x: object())
 
@@ -33,3 +42,157 @@ class TestClientManager(utils.TestCase):
         # the factory one time and always returns the same value after that.
         c = Container()
         self.assertEqual(c.attr, c.attr)
+
+    def test_get_service_type(self):
+        self.assertEqual(
+            clientmanager.ClientManager.object.get_service_type(),
+            'object-store',
+        )
+        self.assertEqual(
+            clientmanager.ClientManager.compute.get_service_type(),
+            'compute',
+        )
+
+
+class FakeAuthRef(dict):
+    expires = datetime.datetime.utcnow() + datetime.timedelta(hours=1)
+
+    def will_expire_soon(self, stale_duration):
+        soon = datetime.datetime.utcnow() + datetime.timedelta(
+            seconds=stale_duration)
+        return self.expires < soon
+
+
+class FakeIdentityClient(object):
+    def __init__(self, auth_ref=None):
+        self.auth_count = 0
+        if auth_ref:
+            self.auth_ref = FakeAuthRef(auth_ref)
+        else:
+            self.authenticate()
+
+    def authenticate(self):
+        self.auth_count += 1
+        self.auth_ref = FakeAuthRef(token={'id': 'token%d' % self.auth_count})
+
+    @property
+    def auth_token(self):
+        return self.auth_ref['token']['id']
+
+    @property
+    def service_catalog(self):
+        return mock.Mock()
+
+
+class TokenClientManager(clientmanager.ClientManager):
+    identity = clientmanager.ClientCache(
+        lambda x: FakeIdentityClient(auth_ref=x._auth_ref))
+
+
+def make_client_manager(token_cache):
+    return TokenClientManager(
+        auth_url=AUTH_URL,
+        project_name='burrow',
+        username='gopher',
+        password='mac',
+        token_cache=token_cache,
+    )
+
+
+class TestClientManagerTokenCache(utils.TestCase):
+    def setUp(self):
+        super(TestClientManagerTokenCache, self).setUp()
+        self.cache = tokencache.TokenCache(
+            self.useFixture(fixtures.TempDir()).path)
+
+    def test_token_cached(self):
+        cm = make_client_manager(self.cache)
+        self.assertEqual(cm.auth_token, 'token1')
+        self.assertEqual(cm.identity.auth_count, 1)
+
+        # A second manager with the same credentials re-uses the token
+        cm = make_client_manager(self.cache)
+        self.assertEqual(cm.auth_token, 'token1')
+        self.assertEqual(cm.identity.auth_count, 0)
+
+    def test_reauthenticate(self):
+        cm = make_client_manager(self.cache)
+        self.assertEqual(cm.auth_token, 'token1')
+        self.assertEqual(cm.reauthenticate(), 'token2')
+
+        cm = make_client_manager(self.cache)
+        self.assertEqual(cm.auth_token, 'token2')
+        self.assertEqual(cm.identity.auth_count, 0)
+
+    def test_will_expire_soon(self):
+        cm = make_client_manager(self.cache)
+        # Nothing to check before authenticating
+        self.assertFalse(cm.will_expire_soon())
+        cm.auth_token
+        self.assertFalse(cm.will_expire_soon())
+        self.assertTrue(cm.will_expire_soon(2 * 60 * 60))
+
+        cm = clientmanager.ClientManager(token='xyzzy', url=AUTH_URL)
+        self.assertFalse(cm.will_expire_soon(2 * 60 * 60))
+
+
+FAKE_AUTH_BODY = {
+    'access': {
+        'token': {
+            'id': 'xyzzy',
+            'expires': '2099-01-01T00:00:00Z',
+            'tenant': {'id': 'p1', 'name': 'burrow'},
+        },
+        'user': {'id': 'u1', 'name': 'gopher'},
+        'serviceCatalog': [{
+            'type': 'identity',
+            'endpoints': [{
+                'adminURL': AUTH_URL + ':35357/v2.0',
+                'publicURL': AUTH_URL + ':5000/v2.0',
+            }],
+        }],
+    },
+}
+
+
+@mock.patch(
+    'keystoneclient.v2_0.client.Client.get_raw_token_from_identity_service'
+)
+class TestClientManagerLazyAuth(utils.TestCase):
+
+    def _make_client_manager(self):
+        return clientmanager.ClientManager(
+            auth_url=AUTH_URL,
+            project_name='burrow',
+            username='gopher',
+            password='mac',
+            api_version={'identity': '2.0'},
+        )
+
+    def test_no_auth_on_init(self, auth_mock):
+        auth_mock.return_value = (mock.Mock(), FAKE_AUTH_BODY)
+        cm = self._make_client_manager()
+        self.assertFalse(auth_mock.called)
+
+        self.assertEqual(cm.auth_token, 'xyzzy')
+        self.assertEqual(auth_mock.call_count, 1)
+
+    def test_auth_on_client_access(self, auth_mock):
+        auth_mock.return_value = (mock.Mock(), FAKE_AUTH_BODY)
+        cm = self._make_client_manager()
+        self.assertFalse(auth_mock.called)
+
+        identity = cm.identity
+        self.assertEqual(auth_mock.call_count, 1)
+        self.assertEqual(cm._token, 'xyzzy')
+
+        # Further access uses the same client and does not authenticate
+        self.assertEqual(cm.identity, identity)
+        self.assertEqual(cm.auth_token, 'xyzzy')
+        self.assertEqual(auth_mock.call_count, 1)
+
+    def test_clients_per_instance(self, auth_mock):
+        auth_mock.return_value = (mock.Mock(), FAKE_AUTH_BODY)
+        cm1 = self._make_client_manager()
+        cm2 = self._make_client_manager()
+        self.assertNotEqual(cm1.identity, cm2.identity)
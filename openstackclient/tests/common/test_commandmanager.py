@@ -13,6 +13,10 @@
 #   under the License.
 #
 
+import json
+import os
+
+import fixtures
 import mock
 
 from openstackclient.common import commandmanager
@@ -69,3 +73,150 @@ class TestCommandManager(utils.TestCase):
         # Ensure that the original commands were not overwritten
         cmd_two, name, args = mgr.find_command(['two'])
         self.assertEqual(cmd_two, FAKE_CMD_TWO)
+
+
+class FakeEntryPoint(object):
+    def __init__(self, name, module_name, attrs):
+        self.name = name
+        self.module_name = module_name
+        self.attrs = attrs
+
+    def load(self):
+        return FakeCommand
+
+
+FAKE_GROUP = 'openstack.test'
+FAKE_EPS = [
+    FakeEntryPoint(
+        'fake_one',
+        'openstackclient.tests.common.test_commandmanager',
+        ('FakeCommand',),
+    ),
+    FakeEntryPoint(
+        'fake_two',
+        'openstackclient.tests.common.test_commandmanager',
+        ('FakeCommand', 'load'),
+    ),
+]
+
+
+@mock.patch('pkg_resources.iter_entry_points')
+class TestCommandManagerIndex(utils.TestCase):
+    def setUp(self):
+        super(TestCommandManagerIndex, self).setUp()
+        self.index_file = os.path.join(
+            self.useFixture(fixtures.TempDir()).path,
+            'cache',
+            'commands.json',
+        )
+
+    def _make_manager(self):
+        return commandmanager.CommandManager(
+            FAKE_GROUP,
+            index_file=self.index_file,
+        )
+
+    def test_index_built(self, iter_mock):
+        iter_mock.return_value = FAKE_EPS
+        mgr = self._make_manager()
+        iter_mock.assert_called_with(FAKE_GROUP)
+
+        with open(self.index_file) as f:
+            index = json.load(f)
+        self.assertEqual(
+            index['groups'][FAKE_GROUP],
+            {
+                'fake_one':
+                    'openstackclient.tests.common.test_commandmanager:'
+                    'FakeCommand',
+                'fake_two':
+                    'openstackclient.tests.common.test_commandmanager:'
+                    'FakeCommand.load',
+            },
+        )
+        cmd, name, args = mgr.find_command(['fake', 'one'])
+        self.assertEqual(cmd, FakeCommand)
+
+    def test_index_used(self, iter_mock):
+        iter_mock.return_value = FAKE_EPS
+        self._make_manager()
+        iter_mock.reset_mock()
+
+        mgr = self._make_manager()
+        self.assertFalse(iter_mock.called)
+        cmd, name, args = mgr.find_command(['fake', 'one'])
+        self.assertEqual(cmd, FakeCommand)
+        cmd, name, args = mgr.find_command(['fake', 'two'])
+        self.assertEqual(cmd, FakeCommand.load)
+
+    def test_index_stale_stamp(self, iter_mock):
+        iter_mock.return_value = FAKE_EPS
+        self._make_manager()
+        iter_mock.reset_mock()
+
+        with mock.patch(
+            'openstackclient.common.commandmanager.get_path_stamp',
+            return_value='new-stamp',
+        ):
+            self._make_manager()
+        iter_mock.assert_called_with(FAKE_GROUP)
+
+    def test_index_stale_entry(self, iter_mock):
+        iter_mock.return_value = FAKE_EPS
+        self._make_manager()
+
+        # Make the indexed entry point to something that is not there
+        with open(self.index_file) as f:
+            index = json.load(f)
+        index['groups'][FAKE_GROUP]['fake_one'] = 'not.a.module:Gone'
+        with open(self.index_file, 'w') as f:
+            json.dump(index, f)
+        iter_mock.reset_mock()
+
+        mgr = self._make_manager()
+        self.assertFalse(iter_mock.called)
+        cmd, name, args = mgr.find_command(['fake', 'one'])
+        iter_mock.assert_called_with(FAKE_GROUP)
+        self.assertEqual(cmd, FakeCommand)
+
+    def test_index_missing_command(self, iter_mock):
+        iter_mock.return_value = FAKE_EPS[:1]
+        self._make_manager()
+
+        # A command installed without changing the path stamp
+        iter_mock.reset_mock()
+        iter_mock.return_value = FAKE_EPS
+        mgr = self._make_manager()
+        self.assertFalse(iter_mock.called)
+        cmd, name, args = mgr.find_command(['fake', 'two'])
+        iter_mock.assert_called_with(FAKE_GROUP)
+        self.assertEqual(cmd, FakeCommand)
+
+        # and it is in the index from now on
+        iter_mock.reset_mock()
+        mgr = self._make_manager()
+        cmd, name, args = mgr.find_command(['fake', 'two'])
+        self.assertFalse(iter_mock.called)
+        self.assertEqual(cmd, FakeCommand.load)
+
+        self.assertRaises(ValueError, mgr.find_command, ['nosuch'])
+
+    def test_stamp_entry_points(self, iter_mock):
+        tmp = self.useFixture(fixtures.TempDir()).path
+        ep_file = os.path.join(tmp, 'plugin.egg-info', 'entry_points.txt')
+        os.mkdir(os.path.dirname(ep_file))
+        with open(ep_file, 'w') as f:
+            f.write('[openstack.test]\n')
+        self.useFixture(fixtures.MonkeyPatch('sys.path', [tmp]))
+        stamp = commandmanager.get_path_stamp()
+
+        # Edit the file in place, the directory mtimes do not change
+        os.utime(ep_file, (0, 0))
+        self.assertNotEqual(commandmanager.get_path_stamp(), stamp)
+
+    def test_no_index(self, iter_mock):
+        iter_mock.return_value = FAKE_EPS
+        commandmanager.CommandManager(FAKE_GROUP)
+        commandmanager.CommandManager(FAKE_GROUP)
+        self.assertEqual(iter_mock.call_count, 2)
+        self.assertFalse(os.path.exists(self.index_file))
@@ -0,0 +1,130 @@
+#   Copyright 2013 OpenStack Foundation
+#
+#   Licensed under the Apache License, Version 2.0 (the "License"); you may
+#   not use this file except in compliance with the License. You may obtain
+#   a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#   WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#   License for the specific language governing permissions and limitations
+#   under the License.
+#
+
+"""Test streaming formatters"""
+
+import json
+
+import mock
+import six
+
+from openstackclient.common import formatters
+from openstackclient.tests import utils
+
+
+columns = ('ID', 'Name', 'Size')
+
+
+class FakeStdout(six.StringIO):
+    """Records how much had been written at each flush"""
+
+    def __init__(self):
+        six.StringIO.__init__(self)
+        self.flushed = []
+
+    def flush(self):
+        self.flushed.append(self.getvalue())
+
+
+class TestStreamingFormatters(utils.TestCase):
+
+    def setUp(self):
+        super(TestStreamingFormatters, self).setUp()
+        self.stdout = FakeStdout()
+        self.produced = 0
+
+    def _rows(self, count=3):
+        for i in range(count):
+            self.produced += 1
+            yield ('id%d' % i, 'name %d' % i, i * 10)
+
+    def test_jsonl(self):
+        formatters.JSONLinesFormatter().emit_list(
+            columns,
+            self._rows(),
+            self.stdout,
+            mock.Mock(),
+        )
+        lines = self.stdout.getvalue().splitlines()
+        self.assertEqual(
+            [json.loads(line) for line in lines],
+            [{'ID': 'id%d' % i, 'Name': 'name %d' % i, 'Size': i * 10}
+             for i in range(3)],
+        )
+
+    def test_jsonl_first_row_flushed(self):
+        rows = self._rows(1000)
+        formatters.JSONLinesFormatter().emit_list(
+            columns,
+            rows,
+            self.stdout,
+            mock.Mock(),
+        )
+        # The first row was written out before the second was produced
+        self.assertEqual(len(self.stdout.flushed[0].splitlines()), 1)
+        self.assertEqual(
+            len(self.stdout.flushed),
+            1 + 1000 // formatters.FLUSH_ROWS + 1,
+        )
+
+    def test_csv(self):
+        formatters.StreamingCSVFormatter().emit_list(
+            columns,
+            self._rows(2),
+            self.stdout,
+            mock.Mock(quote_mode='minimal'),
+        )
+        self.assertEqual(
+            self.stdout.getvalue(),
+            'ID,Name,Size\r\nid0,name 0,0\r\nid1,name 1,10\r\n',
+        )
+
+    def test_table(self):
+        rows = [('id1', 'a', 5), ('id2', 'a much longer name', 10)]
+        formatters.StreamingTableFormatter().emit_list(
+            columns,
+            iter(rows),
+            self.stdout,
+            mock.Mock(sample_rows=1),
+        )
+        self.assertEqual(
+            self.stdout.getvalue(),
+            '+-----+------+------+\n'
+            '| ID  | Name | Size |\n'
+            '+-----+------+------+\n'
+            '| id1 | a    |    5 |\n'
+            '| id2 | a much longer name |   10 |\n'
+            '+-----+------+------+\n',
+        )
+
+    def test_table_samples_rows(self):
+        formatters.StreamingTableFormatter().emit_list(
+            columns,
+            self._rows(500),
+            self.stdout,
+            mock.Mock(sample_rows=10),
+        )
+        # Output started once the sample had been read
+        self.assertEqual(len(self.stdout.flushed[0].splitlines()), 4)
+        self.assertEqual(len(self.stdout.getvalue().splitlines()), 504)
+
+    def test_table_empty(self):
+        formatters.StreamingTableFormatter().emit_list(
+            columns,
+            iter([]),
+            self.stdout,
+            mock.Mock(sample_rows=10),
+        )
+        self.assertEqual(self.stdout.getvalue(), '')
@@ -0,0 +1,165 @@
+#   Copyright 2013 OpenStack Foundation
+#
+#   Licensed under the Apache License, Version 2.0 (the "License"); you may
+#   not use this file except in compliance with the License. You may obtain
+#   a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#   WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#   License for the specific language governing permissions and limitations
+#   under the License.
+#
+
+"""Test HTTP response cache module"""
+
+import os
+import time
+
+import fixtures
+import mock
+
+from openstackclient.common import httpcache
+from openstackclient.common import restapi
+from openstackclient.tests.common import test_restapi
+from openstackclient.tests import utils
+
+
+fake_url = 'http://gopher.com/v1/AUTH_x/burrow'
+fake_etag = '"abc123"'
+
+
+def fake_response(status_code=200, data=None, etag=fake_etag):
+    headers = {}
+    if etag:
+        headers['ETag'] = etag
+    return test_restapi.FakeResponse(
+        headers=headers,
+        status_code=status_code,
+        data=data,
+    )
+
+
+class TestHTTPCache(utils.TestCase):
+
+    def setUp(self):
+        super(TestHTTPCache, self).setUp()
+        self.cache_dir = os.path.join(
+            self.useFixture(fixtures.TempDir()).path,
+            'http',
+        )
+        self.cache = httpcache.HTTPCache(self.cache_dir)
+
+    def test_set_get(self):
+        self.assertEqual(self.cache.get_validators(fake_url), {})
+        self.cache.set(fake_url, fake_response(data=['a', 'b']))
+        self.assertEqual(
+            self.cache.get_validators(fake_url),
+            {'If-None-Match': fake_etag},
+        )
+        response = self.cache.get(fake_url)
+        self.assertEqual(response.json(), ['a', 'b'])
+        self.assertEqual(response.headers['etag'], fake_etag)
+        self.assertEqual(self.cache.hits, 1)
+
+    def test_set_no_validator(self):
+        self.cache.set(fake_url, fake_response(data=['a'], etag=None))
+        self.assertEqual(self.cache.get(fake_url), None)
+
+    def test_invalidate(self):
+        self.cache.set(fake_url + '?format=json', fake_response(data=[]))
+        self.cache.set(fake_url + '/obj', fake_response(data=[]))
+        self.cache.set('http://gopher.com/v1/AUTH_x', fake_response(data=[]))
+
+        # Changing an object drops it and its container listings
+        self.cache.invalidate(fake_url + '/obj')
+        self.assertEqual(self.cache.get(fake_url + '/obj'), None)
+        self.assertEqual(self.cache.get(fake_url + '?format=json'), None)
+        self.assertNotEqual(
+            self.cache.get('http://gopher.com/v1/AUTH_x'),
+            None,
+        )
+
+    def test_evict_lru(self):
+        self.cache.max_size = 25
+        self.cache.set(fake_url + '/1', fake_response(data='x' * 8))
+        self.cache.set(fake_url + '/2', fake_response(data='x' * 8))
+        # Use the first entry so the second is the oldest
+        then = time.time() - 60
+        os.utime(self.cache._path(fake_url + '/2'), (then, then))
+        self.cache.get(fake_url + '/1')
+        self.cache.set(fake_url + '/3', fake_response(data='x' * 8))
+
+        self.assertNotEqual(self.cache.get(fake_url + '/1'), None)
+        self.assertEqual(self.cache.get(fake_url + '/2'), None)
+        self.assertNotEqual(self.cache.get(fake_url + '/3'), None)
+
+    def test_body_replaced(self):
+        self.cache.set(fake_url, fake_response(data=['a']))
+        # A body written for other headers is not used
+        with open(self.cache._path(fake_url), 'wb') as f:
+            f.write(b'["b"')
+        self.assertEqual(self.cache.get(fake_url), None)
+        self.assertEqual(
+            [n for n in os.listdir(self.cache_dir) if n.startswith('tmp')],
+            [],
+        )
+
+    def test_get_validators_changed(self):
+        self.cache.set(fake_url, fake_response(data=['a']))
+        validators = self.cache.get_validators(fake_url)
+        self.cache.set(fake_url, fake_response(data=['b'], etag='"new"'))
+        self.assertEqual(self.cache.get(fake_url, validators), None)
+        self.assertEqual(
+            self.cache.get(fake_url, {'If-None-Match': '"new"'}).json(),
+            ['b'],
+        )
+
+    def test_evict_interval(self):
+        with mock.patch.object(self.cache, '_evict') as evict_mock:
+            for i in range(httpcache.EVICT_INTERVAL + 1):
+                self.cache.set(fake_url + '/%d' % i, fake_response(data=[]))
+        # Once for the first write, then once per interval
+        self.assertEqual(evict_mock.call_count, 2)
+
+
+@mock.patch('openstackclient.common.restapi.requests.Session')
+class TestRESTApiHTTPCache(utils.TestCase):
+
+    def setUp(self):
+        super(TestRESTApiHTTPCache, self).setUp()
+        self.cache = httpcache.HTTPCache(
+            self.useFixture(fixtures.TempDir()).path,
+        )
+
+    def test_not_modified(self, session_mock):
+        request = session_mock.return_value.request
+        request.side_effect = [
+            fake_response(data=['a', 'b']),
+            fake_response(status_code=304, etag=None),
+        ]
+
+        api = restapi.RESTApi(http_cache=self.cache)
+        self.assertEqual(api.show(fake_url), ['a', 'b'])
+        self.assertEqual(api.show(fake_url), ['a', 'b'])
+        request.assert_called_with(
+            'GET',
+            fake_url,
+            headers={'If-None-Match': fake_etag},
+        )
+
+    def test_invalidate_on_change(self, session_mock):
+        request = session_mock.return_value.request
+        request.side_effect = [
+            fake_response(data=['a']),
+            fake_response(status_code=204, etag=None),
+            fake_response(data=[]),
+        ]
+
+        api = restapi.RESTApi(http_cache=self.cache)
+        api.show(fake_url)
+        api.delete(fake_url)
+        self.assertEqual(api.show(fake_url), [])
+        request.assert_called_with('GET', fake_url)
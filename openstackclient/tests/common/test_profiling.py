@@ -0,0 +1,79 @@
+#   Copyright 2013 OpenStack Foundation
+#
+#   Licensed under the Apache License, Version 2.0 (the "License"); you may
+#   not use this file except in compliance with the License. You may obtain
+#   a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#   WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#   License for the specific language governing permissions and limitations
+#   under the License.
+#
+
+"""Test profiling module"""
+
+import os
+import pstats
+
+import fixtures
+import mock
+
+from openstackclient.common import profiling
+from openstackclient.tests import utils
+
+
+recv_key = ('~', 0, "<method 'recv' of '_socket.socket' objects>")
+len_key = ('~', 0, '<len>')
+table_key = ('/usr/lib/python2.7/prettytable.py', 948, 'get_string')
+take_action_key = ('/usr/lib/openstackclient/server.py', 10, 'take_action')
+
+
+class TestProfiling(utils.TestCase):
+
+    def test_get_category(self):
+        self.assertEqual(profiling.get_category(recv_key), 'api')
+        self.assertEqual(profiling.get_category(table_key), 'format')
+        self.assertEqual(profiling.get_category(take_action_key), 'local')
+        self.assertIsNone(profiling.get_category(len_key))
+
+    def test_get_breakdown(self):
+        stats = mock.Mock(stats={
+            recv_key: (1, 1, 2.0, 2.0, {take_action_key: (1, 1, 2.0, 2.0)}),
+            table_key: (1, 1, 0.5, 0.75, {}),
+            take_action_key: (1, 1, 0.25, 2.25, {}),
+            # The builtin's time belongs to each of its callers
+            len_key: (2, 2, 0.75, 0.75, {
+                table_key: (1, 1, 0.25, 0.25),
+                take_action_key: (1, 1, 0.5, 0.5),
+            }),
+        })
+        self.assertEqual(
+            profiling.get_breakdown(stats),
+            {'api': 2.0, 'format': 0.75, 'local': 0.75},
+        )
+
+    def test_profiler(self):
+        profiler = profiling.Profiler(memory=True)
+        profiler.start()
+        data = [[i] for i in range(1000)]
+        profiler.stop()
+
+        report = profiler.report()
+        self.assertIn('API wait:', report)
+        self.assertIn('Output formatting:', report)
+        if profiling.tracemalloc:
+            self.assertIn('Top allocation sites:', report)
+        else:
+            self.assertIn('Top new objects by type:', report)
+            self.assertIn(' list\n', report)
+
+        path = os.path.join(
+            self.useFixture(fixtures.TempDir()).path,
+            'command.prof',
+        )
+        profiler.dump_stats(path)
+        self.assertTrue(pstats.Stats(path).total_calls > 0)
+        self.assertEqual(len(data), 1000)
@@ -0,0 +1,177 @@
+#   Copyright 2013 OpenStack Foundation
+#
+#   Licensed under the Apache License, Version 2.0 (the "License"); you may
+#   not use this file except in compliance with the License. You may obtain
+#   a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#   WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#   License for the specific language governing permissions and limitations
+#   under the License.
+#
+
+"""Test request memo module"""
+
+import threading
+
+import mock
+
+from openstackclient.common import requestmemo
+from openstackclient.common import restapi
+from openstackclient.tests.common import test_restapi
+from openstackclient.tests import utils
+
+
+fake_url = 'http://gopher.com/burrows/1'
+
+
+class FakeHTTPClient(object):
+    """Looks like the HTTPClient of the nova and keystone libraries"""
+
+    def __init__(self):
+        self.gets = 0
+
+    def get(self, url, **kwargs):
+        self.gets += 1
+        return (mock.sentinel.resp, {'url': url, 'count': self.gets})
+
+    def post(self, url, **kwargs):
+        return (mock.sentinel.resp, {})
+
+
+class FakeClient(object):
+    def __init__(self):
+        self.client = FakeHTTPClient()
+
+
+class TestRequestMemo(utils.TestCase):
+
+    def setUp(self):
+        super(TestRequestMemo, self).setUp()
+        self.memo = requestmemo.RequestMemo()
+        self.client = FakeClient()
+        self.memo.wrap_client(self.client)
+        self.http = self.client.client
+
+    def test_get_repeated(self):
+        resp, body = self.http.get(fake_url)
+        self.assertEqual(body, {'url': fake_url, 'count': 1})
+        # Changing the result does not change the one remembered
+        body['count'] = 99
+        resp, body = self.http.get(fake_url)
+        self.assertEqual(body, {'url': fake_url, 'count': 1})
+        self.assertEqual(self.http.gets, 1)
+        self.assertEqual(self.memo.saved, 1)
+
+        self.http.get(fake_url + '/2')
+        self.assertEqual(self.http.gets, 2)
+
+    def test_post_clears(self):
+        self.http.get(fake_url)
+        self.http.post(fake_url, body={})
+        resp, body = self.http.get(fake_url)
+        self.assertEqual(body['count'], 2)
+        self.assertEqual(self.memo.saved, 0)
+
+    def test_bypass(self):
+        self.http.get(fake_url)
+        with requestmemo.bypass():
+            resp, body = self.http.get(fake_url)
+        self.assertEqual(body['count'], 2)
+
+    def test_wrap_client_once(self):
+        self.memo.wrap_client(self.client)
+        self.http.get(fake_url)
+        self.http.get(fake_url)
+        self.assertEqual(self.memo.saved, 1)
+
+    def test_error_not_remembered(self):
+        func = mock.Mock(side_effect=[ValueError('boom'), 'ok'])
+        self.assertRaises(ValueError, self.memo.call, ('k', 'u'), func)
+        self.assertEqual(self.memo.call(('k', 'u'), func), 'ok')
+
+    def test_concurrent(self):
+        started = threading.Event()
+        release = threading.Event()
+        calls = []
+
+        def slow():
+            calls.append(1)
+            started.set()
+            release.wait(5)
+            return 'done'
+
+        results = []
+        first = threading.Thread(
+            target=lambda: results.append(self.memo.call(('k', 'u'), slow)),
+        )
+        first.start()
+        started.wait(5)
+        second = threading.Thread(
+            target=lambda: results.append(self.memo.call(('k', 'u'), slow)),
+        )
+        second.start()
+        release.set()
+        first.join(5)
+        second.join(5)
+        self.assertEqual(results, ['done', 'done'])
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(self.memo.saved, 1)
+
+
+@mock.patch('openstackclient.common.restapi.requests.Session')
+class TestRESTApiRequestMemo(utils.TestCase):
+
+    def test_get_repeated(self, session_mock):
+        request = session_mock.return_value.request
+        request.side_effect = [
+            test_restapi.FakeResponse(status_code=200, data=['a']),
+            test_restapi.FakeResponse(status_code=204),
+            test_restapi.FakeResponse(status_code=200, data=[]),
+        ]
+
+        memo = requestmemo.RequestMemo()
+        api = restapi.RESTApi(request_memo=memo)
+        self.assertEqual(api.show(fake_url), ['a'])
+        self.assertEqual(api.show(fake_url), ['a'])
+        self.assertEqual(request.call_count, 1)
+        api.delete(fake_url)
+        self.assertEqual(api.show(fake_url), [])
+        self.assertEqual(request.call_count, 3)
+        self.assertEqual(memo.saved, 1)
+
+    def test_get_repeated_response_copied(self, session_mock):
+        request = session_mock.return_value.request
+        request.return_value = test_restapi.FakeResponse(
+            status_code=200,
+            headers={'x-count': '1'},
+            data={'a': 1},
+        )
+
+        memo = requestmemo.RequestMemo()
+        api = restapi.RESTApi(request_memo=memo)
+        first = api.request('GET', fake_url)
+        first.headers['x-count'] = '2'
+        first.json()['a'] = 2
+        second = api.request('GET', fake_url)
+        self.assertIsNot(first, second)
+        self.assertEqual(second.headers['x-count'], '1')
+        self.assertEqual(second.json(), {'a': 1})
+        self.assertEqual(request.call_count, 1)
+
+
+class TestClientKey(utils.TestCase):
+
+    def test_client_key(self):
+        first = FakeHTTPClient()
+        key = requestmemo.client_key(first)
+        self.assertEqual(requestmemo.client_key(first), key)
+        del first
+        # A new object that may reuse the same id() gets a new key
+        self.assertNotEqual(
+            requestmemo.client_key(FakeHTTPClient()),
+            key,
+        )
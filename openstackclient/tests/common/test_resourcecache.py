@@ -0,0 +1,122 @@
+#   Copyright 2013 OpenStack Foundation
+#
+#   Licensed under the Apache License, Version 2.0 (the "License"); you may
+#   not use this file except in compliance with the License. You may obtain
+#   a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#   WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#   License for the specific language governing permissions and limitations
+#   under the License.
+#
+
+"""Test resource cache module"""
+
+import os
+
+import fixtures
+
+from openstackclient.common import resourcecache
+from openstackclient.common import utils
+from openstackclient.tests import utils as tests_utils
+
+
+class FakeThing(object):
+    def __init__(self, id, name):
+        self.id = id
+        self.name = name
+
+
+class FakeManager(object):
+    """Counts the API calls a find_resource() makes"""
+
+    resource_class = FakeThing
+
+    def __init__(self, *things):
+        self.things = dict((t.id, t) for t in things)
+        self.calls = 0
+
+    def get(self, id):
+        self.calls += 1
+        if id not in self.things:
+            raise Exception('NotFound')
+        return self.things[id]
+
+    def find(self, **kwargs):
+        self.calls += 1
+        for t in self.things.values():
+            if all(getattr(t, k, None) == v for k, v in kwargs.items()):
+                return t
+        raise Exception('NotFound')
+
+
+class TestResourceCache(tests_utils.TestCase):
+
+    def setUp(self):
+        super(TestResourceCache, self).setUp()
+        self.cache_file = os.path.join(
+            self.useFixture(fixtures.TempDir()).path,
+            'resources.json',
+        )
+        self.cache = resourcecache.ResourceCache(self.cache_file)
+        utils.set_resource_cache(self.cache)
+        self.addCleanup(utils.set_resource_cache, None)
+        self.manager = FakeManager(FakeThing('a1', 'alpha'))
+
+    def _new_process(self):
+        """Save the cache and start again as a new command would"""
+        self.cache.save()
+        self.cache = resourcecache.ResourceCache(self.cache_file)
+        utils.set_resource_cache(self.cache)
+        self.manager.calls = 0
+
+    def test_find_resource_memo(self):
+        thing = utils.find_resource(self.manager, 'alpha')
+        self.assertEqual(thing.id, 'a1')
+        calls = self.manager.calls
+        self.assertEqual(utils.find_resource(self.manager, 'alpha'), thing)
+        self.assertEqual(self.manager.calls, calls)
+        self.assertEqual(self.cache.hits, 1)
+        self.assertEqual(self.cache.misses, 1)
+
+    def test_find_resource_disk(self):
+        utils.find_resource(self.manager, 'alpha')
+        self._new_process()
+        thing = utils.find_resource(self.manager, 'alpha')
+        self.assertEqual(thing.id, 'a1')
+        # One get() by ID instead of the full name search
+        self.assertEqual(self.manager.calls, 1)
+        self.assertEqual(self.cache.hits, 1)
+
+    def test_find_resource_disk_renamed(self):
+        utils.find_resource(self.manager, 'alpha')
+        self._new_process()
+        self.manager.things['a1'].name = 'beta'
+        self.manager.things['a2'] = FakeThing('a2', 'alpha')
+        thing = utils.find_resource(self.manager, 'alpha')
+        self.assertEqual(thing.id, 'a2')
+        self.assertEqual(self.cache.hits, 0)
+        self.assertEqual(self.cache.misses, 1)
+
+    def test_find_resource_by_id_not_saved(self):
+        utils.find_resource(self.manager, 'a1')
+        self.cache.save()
+        self.assertFalse(os.path.exists(self.cache_file))
+
+    def test_invalidate(self):
+        utils.find_resource(self.manager, 'alpha')
+        utils.invalidate_resource(self.manager, 'a1')
+        self._new_process()
+        utils.find_resource(self.manager, 'alpha')
+        self.assertEqual(self.cache.hits, 0)
+        self.assertEqual(self.cache.misses, 1)
+
+    def test_ttl(self):
+        self.cache.ttl = -1
+        utils.find_resource(self.manager, 'alpha')
+        self._new_process()
+        utils.find_resource(self.manager, 'alpha')
+        self.assertEqual(self.cache.hits, 0)
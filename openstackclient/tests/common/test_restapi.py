@@ -16,10 +16,16 @@
 """Test rest module"""
 
 import json
+import logging
 import mock
+import threading
 
+import fixtures
 import requests
 
+from six.moves import BaseHTTPServer
+from six.moves import socketserver
+
 from openstackclient.common import restapi
 from openstackclient.tests import utils
 
@@ -59,6 +65,62 @@ class FakeResponse(requests.Response):
         self._content = json.dumps(data)
 
 
+class FakeHTTPServer(fixtures.Fixture):
+    """An HTTP server on localhost that answers with canned responses
+
+    responses maps 'METHOD /path?query' to a (status, body) tuple, the
+    body being encoded as JSON.  Anything else gets a 404.  Each request
+    is recorded in requests as a (method, path, body) tuple.
+    """
+
+    def __init__(self, responses=None):
+        super(FakeHTTPServer, self).__init__()
+        self.responses = responses or {}
+        self.requests = []
+
+    def setUp(self):
+        super(FakeHTTPServer, self).setUp()
+        fake = self
+
+        class Handler(BaseHTTPServer.BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def _respond(self):
+                length = int(self.headers.get('Content-Length') or 0)
+                body = self.rfile.read(length) if length else None
+                fake.requests.append((self.command, self.path, body))
+                status, data = fake.responses.get(
+                    '%s %s' % (self.command, self.path),
+                    (404, {'error': 'not found'}),
+                )
+                content = json.dumps(data).encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(content)))
+                self.end_headers()
+                self.wfile.write(content)
+
+            do_GET = do_POST = do_PUT = do_DELETE = _respond
+
+            def log_message(self, *args):
+                pass
+
+        class Server(socketserver.ThreadingMixIn,
+                     BaseHTTPServer.HTTPServer):
+            daemon_threads = True
+
+        self.server = Server(('127.0.0.1', 0), Handler)
+        self.url = 'http://127.0.0.1:%d' % self.server.server_address[1]
+        thread = threading.Thread(
+            target=self.server.serve_forever,
+            kwargs={'poll_interval': 0.01},
+        )
+        thread.daemon = True
+        thread.start()
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+
+
 @mock.patch('openstackclient.common.restapi.requests.Session')
 class TestRESTApi(utils.TestCase):
 
@@ -318,3 +380,334 @@ class TestRESTApi(utils.TestCase):
             fake_url,
         )
         self.assertEqual(gopher, fake_gopher_mac)
+
+    def test_request_get_401_refresh(self, session_mock):
+        resp_401 = FakeResponse(status_code=401, data=None)
+        resp = FakeResponse(status_code=200, data=fake_gopher_single)
+        session_mock.return_value = mock.MagicMock(
+            request=mock.MagicMock(side_effect=[resp_401, resp]),
+        )
+
+        auth_source = mock.Mock(
+            reauthenticate=mock.Mock(return_value='new-token'),
+        )
+        api = restapi.RESTApi(os_auth=fake_auth)
+        api.set_auth_source(auth_source)
+        gopher = api.request('GET', fake_url)
+        auth_source.reauthenticate.assert_called_with()
+        session_mock.return_value.headers.__setitem__.assert_any_call(
+            'X-Auth-Token',
+            'new-token',
+        )
+        self.assertEqual(session_mock.return_value.request.call_count, 2)
+        self.assertEqual(gopher.json(), fake_gopher_single)
+
+    def test_request_get_auth_source(self, session_mock):
+        resp = FakeResponse(status_code=200, data=fake_gopher_single)
+        session_mock.return_value = mock.MagicMock(
+            request=mock.MagicMock(return_value=resp),
+        )
+
+        auth_source = mock.Mock(auth_token=fake_auth)
+        api = restapi.RESTApi()
+        api.set_auth_source(auth_source)
+        self.assertEqual(api.os_auth, None)
+
+        api.request('GET', fake_url)
+        self.assertEqual(api.os_auth, fake_auth)
+        session_mock.return_value.headers.setdefault.assert_called_with(
+            'X-Auth-Token',
+            fake_auth,
+        )
+
+    def test_request_timeout(self, session_mock):
+        resp = FakeResponse(status_code=200, data=fake_gopher_single)
+        session_mock.return_value = mock.MagicMock(
+            request=mock.MagicMock(return_value=resp),
+        )
+
+        api = restapi.RESTApi(timeout=5)
+        api.request('GET', fake_url)
+        session_mock.return_value.request.assert_called_with(
+            'GET',
+            fake_url,
+            timeout=5,
+        )
+
+    def test_keep_alive(self, session_mock):
+        restapi.RESTApi(keep_alive=False)
+        self.assertEqual(
+            session_mock.return_value.headers.__setitem__.call_args_list[-1],
+            mock.call('Connection', 'close'),
+        )
+
+
+class TestRESTApiPool(utils.TestCase):
+
+    def test_pool_config(self):
+        api = restapi.RESTApi(pool_connections=2, pool_maxsize=20)
+        for scheme in ('http://', 'https://'):
+            adapter = api.session.adapters[scheme]
+            self.assertEqual(adapter._pool_connections, 2)
+            self.assertEqual(adapter._pool_maxsize, 20)
+
+    def test_get_pool_stats(self):
+        api = restapi.RESTApi()
+        self.assertEqual(
+            api.get_pool_stats(),
+            {'pools': 0, 'connections': 0, 'requests': 0, 'reused': 0},
+        )
+
+        adapter = api.session.adapters['http://']
+        pool = adapter.poolmanager.connection_from_url(fake_url)
+        pool.num_connections = 1
+        pool.num_requests = 3
+        self.assertEqual(
+            api.get_pool_stats(),
+            {'pools': 1, 'connections': 1, 'requests': 3, 'reused': 2},
+        )
+
+
+class TestRESTApiBatch(utils.TestCase):
+
+    def test_batch(self):
+        api = restapi.RESTApi()
+
+        def request(method, url, **kwargs):
+            if url.endswith('bad'):
+                raise requests.HTTPError('404 Not Found')
+            return (method, url, kwargs)
+
+        with mock.patch.object(api, 'request', side_effect=request):
+            results = list(api.batch(
+                [
+                    ('GET', fake_url + '/1'),
+                    ('DELETE', fake_url + '/bad'),
+                    ('PUT', fake_url + '/3', {'data': 'x'}),
+                ],
+                concurrency=2,
+            ))
+
+        self.assertEqual([r.index for r in results], [0, 1, 2])
+        self.assertEqual(results[0].result, ('GET', fake_url + '/1', {}))
+        self.assertFalse(results[1].ok)
+        self.assertIsInstance(results[1].error, requests.HTTPError)
+        self.assertEqual(
+            results[2].result,
+            ('PUT', fake_url + '/3', {'data': 'x'}),
+        )
+
+
+class TestAsyncRESTApi(utils.TestCase):
+
+    def setUp(self):
+        super(TestAsyncRESTApi, self).setUp()
+        self.server = self.useFixture(FakeHTTPServer({
+            'GET /gophers/g1': (200, fake_gopher_single),
+            'GET /gophers': (200, fake_gopher_list),
+            'POST /gophers': (201, fake_gopher_single),
+            'PUT /gophers/g1': (200, fake_gopher_single),
+            'DELETE /gophers/g1': (204, None),
+        }))
+        self.api = restapi.AsyncRESTApi(workers=4, retries=0)
+        self.addCleanup(self.api.close)
+        self.url = self.server.url + '/gophers'
+
+    def test_verbs(self):
+        show = self.api.show(self.url + '/g1', response_key=fake_key)
+        listing = self.api.list(self.url, response_key=fake_keys)
+        create = self.api.create(
+            self.url,
+            data=json.dumps(fake_gopher_mac),
+            response_key=fake_key,
+        )
+        update = self.api.set(
+            self.url + '/g1',
+            data=json.dumps(fake_gopher_mac),
+            response_key=fake_key,
+        )
+        delete = self.api.delete(self.url + '/g1')
+
+        self.assertEqual(show.result(), fake_gopher_mac)
+        self.assertEqual(listing.result(), [fake_gopher_mac, fake_gopher_tosh])
+        self.assertEqual(create.result(), fake_gopher_mac)
+        self.assertEqual(update.result(), fake_gopher_mac)
+        self.assertIsNone(delete.result())
+        self.assertTrue(delete.done())
+        self.assertEqual(
+            sorted((m, p) for m, p, b in self.server.requests),
+            [
+                ('DELETE', '/gophers/g1'),
+                ('GET', '/gophers'),
+                ('GET', '/gophers/g1'),
+                ('POST', '/gophers'),
+                ('PUT', '/gophers/g1'),
+            ],
+        )
+
+    def test_error(self):
+        future = self.api.show(self.url + '/g9')
+        self.assertRaises(requests.HTTPError, future.result)
+        self.assertIsInstance(future.exception(), requests.HTTPError)
+
+    def test_fan_out(self):
+        futures = [
+            self.api.request_async('GET', self.url + '/g1')
+            for i in range(50)
+        ]
+        for future in futures:
+            self.assertEqual(future.result().json(), fake_gopher_single)
+        self.assertEqual(len(self.api._threads), 4)
+        self.assertTrue(self.api.get_pool_stats()['connections'] <= 4)
+
+    def test_close(self):
+        future = self.api.show(self.url + '/g1')
+        self.api.close()
+        self.assertTrue(future.done())
+        self.assertEqual(self.api._threads, [])
+
+
+class TestRESTApiLogging(utils.TestCase):
+
+    def setUp(self):
+        super(TestRESTApiLogging, self).setUp()
+        self.logger = self.useFixture(fixtures.FakeLogger(
+            name='openstackclient.common.restapi',
+            level=logging.DEBUG,
+        ))
+
+    def test_log_request_redacts_token(self):
+        restapi.log_request(
+            'GET',
+            fake_url,
+            headers={'X-Auth-Token': fake_auth, 'Accept': 'text/plain'},
+        )
+        self.assertNotIn(fake_auth, self.logger.output)
+        self.assertIn("-H 'X-Auth-Token: <redacted>'", self.logger.output)
+        self.assertIn("-H 'Accept: text/plain'", self.logger.output)
+
+    def test_log_response_truncates_body(self):
+        resp = FakeResponse(
+            headers={'X-Subject-Token': fake_auth},
+            status_code=200,
+            data='x' * 100,
+        )
+        resp._content_consumed = True
+        restapi.log_response(resp, max_body=10)
+        self.assertNotIn(fake_auth, self.logger.output)
+        self.assertIn('RESP BODY: "xxxxxxxxx... (92 more bytes)',
+                      self.logger.output)
+
+    @mock.patch('openstackclient.common.restapi.log_response')
+    @mock.patch('openstackclient.common.restapi.log_request')
+    @mock.patch('openstackclient.common.restapi.requests.Session')
+    def test_request_not_logged(self, session_mock, req_mock, resp_mock):
+        self.logger = self.useFixture(fixtures.FakeLogger(
+            name='openstackclient.common.restapi',
+            level=logging.INFO,
+        ))
+        resp = FakeResponse(status_code=200, data=fake_gopher_single)
+        session_mock.return_value = mock.MagicMock(
+            request=mock.MagicMock(return_value=resp),
+        )
+
+        api = restapi.RESTApi()
+        api.request('GET', fake_url)
+        self.assertFalse(req_mock.called)
+        self.assertFalse(resp_mock.called)
+
+
+@mock.patch('openstackclient.common.restapi.time')
+@mock.patch('openstackclient.common.restapi.requests.Session')
+class TestRESTApiRetry(utils.TestCase):
+
+    def _session(self, session_mock, *responses):
+        session_mock.return_value = mock.MagicMock(
+            request=mock.MagicMock(side_effect=list(responses)),
+        )
+        return session_mock.return_value.request
+
+    def test_retry_get_503(self, session_mock, time_mock):
+        request = self._session(
+            session_mock,
+            FakeResponse(status_code=503),
+            FakeResponse(status_code=200, data=fake_gopher_single),
+        )
+
+        api = restapi.RESTApi(retry_backoff=1)
+        gopher = api.request('GET', fake_url)
+        self.assertEqual(gopher.json(), fake_gopher_single)
+        self.assertEqual(request.call_count, 2)
+        self.assertEqual(time_mock.sleep.call_count, 1)
+        delay = time_mock.sleep.call_args[0][0]
+        self.assertTrue(0.5 <= delay <= 1)
+        self.assertEqual(api.retry_count, 1)
+        self.assertEqual(api.retry_time, delay)
+
+    def test_retry_after(self, session_mock, time_mock):
+        self._session(
+            session_mock,
+            FakeResponse(status_code=429, headers={'Retry-After': '7'}),
+            FakeResponse(status_code=200, data=fake_gopher_single),
+        )
+
+        api = restapi.RESTApi()
+        api.request('GET', fake_url)
+        time_mock.sleep.assert_called_once_with(7.0)
+
+    def test_retry_after_too_long(self, session_mock, time_mock):
+        self._session(
+            session_mock,
+            FakeResponse(status_code=503, headers={'Retry-After': '3600'}),
+        )
+
+        api = restapi.RESTApi()
+        self.assertRaises(
+            requests.HTTPError,
+            api.request,
+            'GET',
+            fake_url,
+        )
+        self.assertFalse(time_mock.sleep.called)
+
+    def test_retry_connection_error(self, session_mock, time_mock):
+        request = self._session(
+            session_mock,
+            requests.ConnectionError('reset'),
+            FakeResponse(status_code=200, data=fake_gopher_single),
+        )
+
+        api = restapi.RESTApi()
+        api.request('DELETE', fake_url)
+        self.assertEqual(request.call_count, 2)
+
+    def test_no_retry_post(self, session_mock, time_mock):
+        request = self._session(
+            session_mock,
+            FakeResponse(status_code=503),
+        )
+
+        api = restapi.RESTApi()
+        self.assertRaises(
+            requests.HTTPError,
+            api.request,
+            'POST',
+            fake_url,
+        )
+        self.assertEqual(request.call_count, 1)
+
+    def test_retries_exhausted(self, session_mock, time_mock):
+        request = self._session(
+            session_mock,
+            *[FakeResponse(status_code=502) for i in range(3)]
+        )
+
+        api = restapi.RESTApi(retries=2)
+        self.assertRaises(
+            requests.HTTPError,
+            api.request,
+            'GET',
+            fake_url,
+        )
+        self.assertEqual(request.call_count, 3)
+        self.assertEqual(api.retry_count, 2)
@@ -0,0 +1,131 @@
+#   Copyright 2013 OpenStack Foundation
+#
+#   Licensed under the Apache License, Version 2.0 (the "License"); you may
+#   not use this file except in compliance with the License. You may obtain
+#   a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#   WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#   License for the specific language governing permissions and limitations
+#   under the License.
+#
+
+"""Test timing module"""
+
+import mock
+
+from openstackclient.common import restapi
+from openstackclient.common import timing
+from openstackclient.tests.common import test_restapi
+from openstackclient.tests import utils
+
+
+fake_url = 'http://gopher.com/burrows/1'
+
+
+class FakeHTTPClient(object):
+    """Looks like the HTTPClient of the nova and keystone libraries"""
+
+    management_url = 'http://gopher.com/burrows'
+
+    def request(self, url, method, **kwargs):
+        if url.endswith('bad'):
+            raise Exception('NotFound')
+        resp = test_restapi.FakeResponse(status_code=200, data={'url': url})
+        return (resp, resp.json())
+
+    def get(self, url, **kwargs):
+        return self.request(url, 'GET', **kwargs)
+
+
+class FakeClient(object):
+    def __init__(self):
+        self.client = FakeHTTPClient()
+
+
+class TestTiming(utils.TestCase):
+
+    def setUp(self):
+        super(TestTiming, self).setUp()
+        self.timing = timing.Timing()
+
+    def test_wrap_client(self):
+        client = FakeClient()
+        self.timing.wrap_client(client, 'compute')
+        client.client.get(fake_url)
+        self.assertRaises(Exception, client.client.get, fake_url + '/bad')
+
+        requests = self.timing.requests
+        self.assertEqual(len(requests), 2)
+        self.assertEqual(
+            (requests[0].service, requests[0].method, requests[0].url),
+            ('compute', 'GET', fake_url),
+        )
+        self.assertEqual(requests[0].status, 200)
+        self.assertTrue(requests[0].size > 0)
+        self.assertEqual(requests[1].status, None)
+
+    def test_totals_and_report(self):
+        self.timing.add('compute', 'GET', fake_url, 200, 10, 0.5)
+        self.timing.add('image', 'GET', fake_url, 200, 5, 1.0)
+        self.timing.add('compute', 'POST', fake_url, 202, 20, 0.25)
+        self.assertEqual(
+            self.timing.get_totals(),
+            [('image', 1, 5, 1.0), ('compute', 2, 30, 0.75)],
+        )
+        report = self.timing.report()
+        self.assertIn('POST', report)
+        self.assertIn('1.750', report)
+
+    @mock.patch('openstackclient.common.restapi.requests.Session')
+    def test_restapi(self, session_mock):
+        session_mock.return_value = mock.MagicMock(
+            request=mock.MagicMock(
+                return_value=test_restapi.FakeResponse(status_code=204),
+            ),
+        )
+        api = restapi.RESTApi(timing=self.timing)
+        api.request('DELETE', fake_url)
+
+        requests = self.timing.requests
+        self.assertEqual(len(requests), 1)
+        self.assertEqual(requests[0].service, 'gopher.com')
+        self.assertEqual(requests[0].status, 204)
+
+    @mock.patch('openstackclient.common.restapi.requests.Session')
+    def test_restapi_service_type(self, session_mock):
+        session_mock.return_value = mock.MagicMock(
+            request=mock.MagicMock(
+                return_value=test_restapi.FakeResponse(status_code=204),
+            ),
+        )
+        # The endpoint of a client is grouped under its service type
+        self.timing.wrap_client(FakeClient(), 'object-store')
+        api = restapi.RESTApi(timing=self.timing)
+        api.request('DELETE', fake_url)
+        api.request('DELETE', 'http://gopher.com/burrowsx')
+
+        requests = self.timing.requests
+        self.assertEqual(
+            [r.service for r in requests],
+            ['object-store', 'gopher.com'],
+        )
+
+    def test_get_service_longest_endpoint(self):
+        self.timing.add_endpoint('http://gopher.com/', 'identity')
+        self.timing.add_endpoint('http://gopher.com/v1', 'object-store')
+        self.assertEqual(
+            self.timing.get_service('http://gopher.com/v1/c'),
+            'object-store',
+        )
+        self.assertEqual(
+            self.timing.get_service('http://gopher.com/v2.0/tokens'),
+            'identity',
+        )
+        self.assertEqual(
+            self.timing.get_service('http://other.com/v1'),
+            'other.com',
+        )
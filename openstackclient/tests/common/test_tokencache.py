@@ -0,0 +1,104 @@
+#   Copyright 2013 OpenStack Foundation
+#
+#   Licensed under the Apache License, Version 2.0 (the "License"); you may
+#   not use this file except in compliance with the License. You may obtain
+#   a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#   WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#   License for the specific language governing permissions and limitations
+#   under the License.
+#
+
+"""Test token cache module"""
+
+import datetime
+import os
+import stat
+
+import fixtures
+
+from openstackclient.common import tokencache
+from openstackclient.tests import utils
+
+
+fake_auth_url = 'http://0.0.0.0:5000/v2.0'
+fake_username = 'gopher'
+fake_project = 'burrow'
+fake_region = 'RegionOne'
+
+
+class FakeAuthRef(dict):
+    def __init__(self, expires, **kwargs):
+        super(FakeAuthRef, self).__init__(**kwargs)
+        self.expires = expires
+
+
+class TestTokenCache(utils.TestCase):
+
+    def setUp(self):
+        super(TestTokenCache, self).setUp()
+        self.cache_dir = os.path.join(
+            self.useFixture(fixtures.TempDir()).path,
+            'tokens',
+        )
+        self.cache = tokencache.TokenCache(self.cache_dir)
+        self.key = self.cache.make_key(
+            fake_auth_url,
+            fake_username,
+            fake_project,
+            fake_region,
+        )
+
+    def _auth_ref(self, seconds):
+        expires = datetime.datetime.utcnow() + \
+            datetime.timedelta(seconds=seconds)
+        return FakeAuthRef(expires, token={'id': 'xyzzy'})
+
+    def test_make_key(self):
+        key = self.cache.make_key(
+            fake_auth_url,
+            fake_username,
+            fake_project,
+            'RegionTwo',
+        )
+        self.assertNotEqual(key, self.key)
+        self.assertEqual(key, self.cache.make_key(
+            fake_auth_url,
+            fake_username,
+            fake_project,
+            'RegionTwo',
+        ))
+
+    def test_get_missing(self):
+        self.assertEqual(self.cache.get(self.key), None)
+
+    def test_set_get(self):
+        self.cache.set(self.key, self._auth_ref(3600))
+        self.assertEqual(
+            self.cache.get(self.key),
+            {'token': {'id': 'xyzzy'}},
+        )
+
+    def test_set_permissions(self):
+        self.cache.set(self.key, self._auth_ref(3600))
+        mode = os.stat(self.cache_dir).st_mode
+        self.assertEqual(stat.S_IMODE(mode), 0o700)
+        mode = os.stat(os.path.join(self.cache_dir, self.key)).st_mode
+        self.assertEqual(stat.S_IMODE(mode), 0o600)
+
+    def test_get_expired(self):
+        self.cache.set(self.key, self._auth_ref(10))
+        self.assertEqual(self.cache.get(self.key), None)
+        self.assertFalse(
+            os.path.exists(os.path.join(self.cache_dir, self.key)))
+
+    def test_delete(self):
+        self.cache.set(self.key, self._auth_ref(3600))
+        self.cache.delete(self.key)
+        self.assertEqual(self.cache.get(self.key), None)
+        # Deleting a missing entry is not an error
+        self.cache.delete(self.key)
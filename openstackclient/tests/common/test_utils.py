@@ -0,0 +1,270 @@
+#   Copyright 2013 OpenStack Foundation
+#
+#   Licensed under the Apache License, Version 2.0 (the "License"); you may
+#   not use this file except in compliance with the License. You may obtain
+#   a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#   WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#   License for the specific language governing permissions and limitations
+#   under the License.
+#
+
+"""Test common utilities"""
+
+import argparse
+import threading
+import time
+
+import mock
+
+from openstackclient.common import utils
+from openstackclient.tests import utils as tests_utils
+
+
+class TestPrefetch(tests_utils.TestCase):
+
+    def test_prefetch(self):
+        self.assertEqual(
+            list(utils.prefetch(iter(range(10)), 3)),
+            list(range(10)),
+        )
+
+    def test_prefetch_runs_ahead(self):
+        fetched = []
+        ready = threading.Event()
+
+        def gen():
+            for i in range(5):
+                fetched.append(i)
+                if i == 2:
+                    ready.set()
+                yield i
+
+        items = utils.prefetch(gen(), 2)
+        self.assertEqual(next(items), 0)
+        # The worker fills the queue without waiting for the caller
+        ready.wait(5)
+        self.assertTrue(len(fetched) >= 3)
+        self.assertEqual(list(items), [1, 2, 3, 4])
+
+    def test_prefetch_exception(self):
+
+        def gen():
+            yield 1
+            raise ValueError('page 2')
+
+        items = utils.prefetch(gen(), 1)
+        self.assertEqual(next(items), 1)
+        self.assertRaises(ValueError, next, items)
+
+
+class TestRunBatch(tests_utils.TestCase):
+
+    def test_run_batch_ordered(self):
+        results = list(utils.run_batch(lambda x: x * 2, range(20), 4))
+        self.assertEqual([r.index for r in results], list(range(20)))
+        self.assertEqual([r.result for r in results], list(range(0, 40, 2)))
+        self.assertTrue(all(r.ok for r in results))
+
+    def test_run_batch_as_completed(self):
+        first = threading.Event()
+
+        def func(x):
+            if x == 0:
+                # Finishes after the second item
+                first.wait(5)
+            else:
+                first.set()
+            return x
+
+        results = list(utils.run_batch(func, range(2), 2, ordered=False))
+        self.assertEqual([r.item for r in results], [1, 0])
+
+    def test_run_batch_errors(self):
+
+        def func(x):
+            if x == 1:
+                raise ValueError(x)
+            return x
+
+        results = list(utils.run_batch(func, range(3), 2))
+        self.assertEqual([r.ok for r in results], [True, False, True])
+        self.assertIsInstance(results[1].error, ValueError)
+
+    def test_run_batch_concurrency(self):
+        lock = threading.Lock()
+        running = [0, 0]
+
+        def func(x):
+            with lock:
+                running[0] += 1
+                running[1] = max(running)
+            time.sleep(0.01)
+            with lock:
+                running[0] -= 1
+
+        list(utils.run_batch(func, range(12), 3))
+        self.assertTrue(running[1] <= 3)
+
+    def test_run_batch_items_exception(self):
+
+        def gen():
+            yield 1
+            raise ValueError('items')
+
+        self.assertRaises(
+            ValueError,
+            list,
+            utils.run_batch(lambda x: x, gen(), 2),
+        )
+
+    def test_run_batch_base_exception(self):
+
+        def func(x):
+            if x == 1:
+                raise SystemExit(1)
+            return x
+
+        self.assertRaises(
+            SystemExit,
+            list,
+            utils.run_batch(func, range(3), 2),
+        )
+
+    def test_run_batch_stop_early(self):
+
+        def running():
+            return [
+                t for t in threading.enumerate()
+                if t.name.startswith('run_batch-')
+            ]
+
+        results = utils.run_batch(lambda x: x, range(100), 4)
+        self.assertEqual(next(results).result, 0)
+        results.close()
+        for i in range(50):
+            if not running():
+                break
+            time.sleep(0.1)
+        self.assertEqual(running(), [])
+
+
+class FakeItem(object):
+    def __init__(self, **kwargs):
+        for k, v in kwargs.items():
+            setattr(self, k, v)
+
+
+class TestPropertiesGetter(tests_utils.TestCase):
+
+    columns = ('ID', 'Display Name', 'tenantId', 'Networks')
+    mixed_case_fields = ('tenantId',)
+    formatters = {'Networks': utils.format_dict}
+
+    def _check(self, getter, get_properties, items):
+        get_row = getter(
+            self.columns,
+            mixed_case_fields=self.mixed_case_fields,
+            formatters=self.formatters,
+        )
+        for item in items:
+            self.assertEqual(
+                get_row(item),
+                get_properties(
+                    item,
+                    self.columns,
+                    mixed_case_fields=self.mixed_case_fields,
+                    formatters=self.formatters,
+                ),
+            )
+
+    def test_item_properties_getter(self):
+        items = [
+            FakeItem(id='1', display_name='one', tenantId='t1',
+                     networks={'private': '10.0.0.1'}),
+            # Missing attributes are ''
+            FakeItem(id='2', networks={}),
+        ]
+        self._check(
+            utils.item_properties_getter,
+            utils.get_item_properties,
+            items,
+        )
+        get_row = utils.item_properties_getter(self.columns)
+        self.assertEqual(get_row(items[1]), ('2', '', '', {}))
+
+    def test_dict_properties_getter(self):
+        items = [
+            {'id': '1', 'display_name': 'one', 'tenantId': 't1',
+             'networks': {'private': '10.0.0.1'}},
+            {'id': '2', 'networks': {}},
+        ]
+        self._check(
+            utils.dict_properties_getter,
+            utils.get_dict_properties,
+            items,
+        )
+
+    def test_single_and_no_fields(self):
+        item = FakeItem(id='1')
+        self.assertEqual(utils.item_properties_getter(('ID',))(item), ('1',))
+        self.assertEqual(utils.item_properties_getter(())(item), ())
+        self.assertEqual(
+            utils.dict_properties_getter(('ID',))({'id': '1'}),
+            ('1',),
+        )
+
+    def test_selected(self):
+        format_mock = mock.Mock(return_value='formatted')
+        get_row = utils.item_properties_getter(
+            self.columns,
+            mixed_case_fields=self.mixed_case_fields,
+            formatters={'Networks': format_mock},
+            selected=('ID', 'tenantId'),
+        )
+        item = FakeItem(id='1', display_name='one', tenantId='t1',
+                        networks={})
+        self.assertEqual(get_row(item), ('1', '', 't1', ''))
+        self.assertFalse(format_mock.called)
+
+        get_row = utils.dict_properties_getter(
+            self.columns,
+            formatters={'Networks': format_mock},
+            selected=('Networks',),
+        )
+        self.assertEqual(get_row({'networks': {}}), ('', '', '', 'formatted'))
+
+
+class TestGetSelectedColumns(tests_utils.TestCase):
+
+    columns = ('ID', 'tenant_id', 'Metadata')
+    column_headers = ('ID', 'Project', 'Properties')
+
+    def _selected(self, wanted, headers=None):
+        parsed_args = argparse.Namespace(columns=wanted)
+        return utils.get_selected_columns(parsed_args, self.columns, headers)
+
+    def test_no_columns(self):
+        self.assertEqual(self._selected([]), self.columns)
+        self.assertEqual(
+            utils.get_selected_columns(argparse.Namespace(), self.columns),
+            self.columns,
+        )
+
+    def test_columns(self):
+        self.assertEqual(self._selected(['Metadata', 'ID']),
+                         ('ID', 'Metadata'))
+
+    def test_column_headers(self):
+        self.assertEqual(
+            self._selected(['Project'], self.column_headers),
+            ('tenant_id',),
+        )
+
+    def test_unknown_columns(self):
+        # cliff reports the bad names
+        self.assertEqual(self._selected(['Bogus']), self.columns)
@@ -0,0 +1,199 @@
+#   Copyright 2013 OpenStack Foundation
+#
+#   Licensed under the Apache License, Version 2.0 (the "License"); you may
+#   not use this file except in compliance with the License. You may obtain
+#   a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#   WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#   License for the specific language governing permissions and limitations
+#   under the License.
+#
+
+"""Test waiting for resource status"""
+
+import mock
+
+from openstackclient.common import exceptions
+from openstackclient.common import requestmemo
+from openstackclient.common import utils
+from openstackclient.common import waiter
+from openstackclient.tests import utils as tests_utils
+
+
+class FakeResource(object):
+    def __init__(self, id, status, updated=None, progress=None):
+        self.id = id
+        self.status = status
+        self.updated = updated
+        self.progress = progress
+
+
+class FakeCloud(object):
+    """Resources whose statuses change each time they are polled"""
+
+    def __init__(self, statuses, updated=True):
+        # id -> list of statuses, the last one is kept
+        self.statuses = statuses
+        self.updated = updated
+        self.polls = dict((res_id, 0) for res_id in statuses)
+        self.gets = []
+        self.lists = []
+        self.bypassed = []
+
+    def _resource(self, res_id):
+        statuses = self.statuses[res_id]
+        i = min(self.polls[res_id], len(statuses) - 1)
+        self.polls[res_id] += 1
+        updated = None
+        if self.updated:
+            updated = '2013-10-01T00:00:%02d' % i
+        return FakeResource(res_id, statuses[i], updated, i * 10)
+
+    def get(self, res_id):
+        self.bypassed.append(requestmemo.is_bypassed())
+        self.gets.append(res_id)
+        return self._resource(res_id)
+
+    def list(self, since):
+        self.bypassed.append(requestmemo.is_bypassed())
+        self.lists.append(since)
+        return [
+            self._resource(res_id)
+            for res_id in sorted(self.statuses)
+        ]
+
+
+@mock.patch('time.sleep')
+class TestWaiter(tests_utils.TestCase):
+
+    def test_wait_for_status(self, sleep_mock):
+        cloud = FakeCloud({'a': ['BUILD', 'BUILD', 'ACTIVE']})
+        callback = mock.Mock()
+        self.assertTrue(utils.wait_for_status(
+            cloud.get,
+            'a',
+            callback=callback,
+        ))
+        self.assertEqual(cloud.gets, ['a', 'a', 'a'])
+        self.assertEqual(cloud.bypassed, [True, True, True])
+        self.assertEqual(callback.call_args_list,
+                         [mock.call(0), mock.call(10)])
+
+    def test_wait_for_status_error(self, sleep_mock):
+        cloud = FakeCloud({'a': ['BUILD', 'ERROR']})
+        self.assertFalse(utils.wait_for_status(cloud.get, 'a'))
+
+    def test_wait_for_status_sleep_time(self, sleep_mock):
+        res = FakeResource('a', 'BUILD')
+        get_f = mock.Mock(side_effect=[res] * 5 + [
+            FakeResource('a', 'ACTIVE'),
+        ])
+        with mock.patch('random.uniform', return_value=0):
+            utils.wait_for_status(get_f, 'a', sleep_time=3)
+        # Backs off from the initial interval up to sleep_time
+        self.assertEqual(
+            sleep_mock.call_args_list,
+            [mock.call(1), mock.call(1.5), mock.call(2.25), mock.call(3),
+             mock.call(3)],
+        )
+
+    def test_backoff(self, sleep_mock):
+        backoff = waiter.Backoff(initial=1, maximum=4, factor=2, jitter=0)
+        self.assertEqual([backoff.next() for i in range(4)], [1, 2, 4, 4])
+        backoff.reset()
+        self.assertEqual(backoff.next(), 1)
+
+    def test_backoff_jitter(self, sleep_mock):
+        backoff = waiter.Backoff(initial=10, maximum=10, jitter=0.2)
+        for i in range(20):
+            self.assertTrue(8 <= backoff.next() <= 12)
+
+    def test_backoff_when_unchanged(self, sleep_mock):
+        res = FakeResource('a', 'BUILD')
+        get_f = mock.Mock(side_effect=[res] * 4 + [
+            FakeResource('a', 'ACTIVE'),
+        ])
+        backoff = waiter.Backoff(initial=1, maximum=4, factor=2, jitter=0)
+        waiter.Waiter(get_f, backoff=backoff).wait(['a'])
+        self.assertEqual(
+            sleep_mock.call_args_list,
+            [mock.call(1), mock.call(2), mock.call(4), mock.call(4)],
+        )
+
+    def test_timeout(self, sleep_mock):
+        get_f = mock.Mock(return_value=FakeResource('a', 'BUILD'))
+        with mock.patch('time.time', side_effect=[100, 101, 111]):
+            self.assertRaises(
+                exceptions.CommandError,
+                waiter.Waiter(get_f, timeout=10).wait,
+                ['a'],
+            )
+        self.assertEqual(get_f.call_count, 2)
+
+    def test_timeout_pending(self, sleep_mock):
+        cloud = FakeCloud({
+            'a': ['BUILD', 'ACTIVE'],
+            'b': ['BUILD'],
+            'c': ['BUILD'],
+        })
+        with mock.patch('time.time', side_effect=[100, 101, 102, 111]):
+            e = self.assertRaises(
+                exceptions.WaitTimeout,
+                waiter.Waiter(cloud.get, timeout=10).wait,
+                ['a', 'b', 'c'],
+            )
+        self.assertEqual(e.results, {'a': True})
+        self.assertEqual(e.pending, ['b', 'c'])
+        self.assertEqual(
+            str(e),
+            'Timed out after 10 seconds, 2 of 3 still pending: b, c',
+        )
+
+    def test_many_with_list(self, sleep_mock):
+        cloud = FakeCloud({
+            'a': ['BUILD', 'BUILD', 'ACTIVE'],
+            'b': ['BUILD', 'BUILD', 'BUILD', 'ERROR'],
+            'c': ['ACTIVE'],
+        })
+        results = waiter.Waiter(cloud.get, cloud.list).wait(['a', 'b', 'c'])
+        self.assertEqual(results, {'a': True, 'b': False, 'c': True})
+        # One GET each to start, then the changes are listed until
+        # only one is left
+        self.assertEqual(cloud.gets, ['a', 'b', 'c', 'b'])
+        self.assertEqual(
+            cloud.lists,
+            ['2013-10-01T00:00:00', '2013-10-01T00:00:01'],
+        )
+        self.assertTrue(all(cloud.bypassed))
+
+    def test_many_without_updated(self, sleep_mock):
+        cloud = FakeCloud(
+            {'a': ['BUILD', 'ACTIVE'], 'b': ['BUILD', 'ACTIVE']},
+            updated=False,
+        )
+        waiter.Waiter(cloud.get, cloud.list).wait(['a', 'b'])
+        self.assertEqual(cloud.lists, [])
+        self.assertEqual(cloud.gets, ['a', 'b', 'a', 'b'])
+
+    def test_wait_for_servers(self, sleep_mock):
+        compute_client = mock.Mock()
+        compute_client.servers.get.side_effect = [
+            FakeResource('a', 'BUILD', 'T1'),
+            FakeResource('b', 'BUILD', 'T2'),
+        ]
+        compute_client.servers.list.return_value = [
+            FakeResource('a', 'ACTIVE', 'T3'),
+            FakeResource('b', 'DELETED', 'T4'),
+            FakeResource('other', 'ACTIVE', 'T5'),
+        ]
+        self.assertEqual(
+            waiter.wait_for_servers(compute_client, ['a', 'b']),
+            {'a': True, 'b': False},
+        )
+        compute_client.servers.list.assert_called_once_with(
+            search_opts={'changes-since': 'T1'},
+        )
@@ -0,0 +1,134 @@
+#   Copyright 2013 OpenStack Foundation
+#
+#   Licensed under the Apache License, Version 2.0 (the "License"); you may
+#   not use this file except in compliance with the License. You may obtain
+#   a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#   WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#   License for the specific language governing permissions and limitations
+#   under the License.
+#
+
+import mock
+
+from novaclient import exceptions as nova_exceptions
+from novaclient.v1_1 import servers
+
+from openstackclient.compute.v2 import server
+from openstackclient.tests import utils
+
+
+class FakeServers(object):
+    """A servers manager holding servers by name and id"""
+
+    resource_class = servers.Server
+
+    def __init__(self, names):
+        self.servers = {}
+        for name in names:
+            self.servers[name] = mock.Mock(
+                id='id-' + name,
+                status='ACTIVE',
+                updated=None,
+                progress=None,
+            )
+        self.deleted = []
+
+    def get(self, name_or_id):
+        for name, s in self.servers.items():
+            if name_or_id in (name, s.id) and s.id not in self.deleted:
+                return s
+        raise nova_exceptions.NotFound(404)
+
+    def find(self, **kwargs):
+        raise nova_exceptions.NotFound(404)
+
+    def delete(self, server_id):
+        self.deleted.append(server_id)
+
+
+class TestServerAction(utils.TestCommand):
+
+    def setUp(self):
+        super(TestServerAction, self).setUp()
+        self.servers_mock = FakeServers(['vm1', 'vm2', 'vm3'])
+        self.app.client_manager.compute = mock.Mock(
+            servers=self.servers_mock,
+        )
+        self.app.options = mock.Mock(os_wait_timeout=None)
+
+    def test_server_pause_many(self):
+        self.cmd = server.PauseServer(self.app, None)
+        arglist = ['vm1', 'nosuch', 'vm3', '--parallel', '2']
+        verifylist = [
+            ('server', ['vm1', 'nosuch', 'vm3']),
+            ('parallel', 2),
+            ('wait', False),
+        ]
+        parsed_args = self.check_parser(self.cmd, arglist, verifylist)
+
+        columns, data = self.cmd.take_action(parsed_args)
+
+        self.assertEqual(columns, ('Server', 'ID', 'Result'))
+        self.assertEqual(data, [
+            ['vm1', 'id-vm1', 'OK'],
+            ['nosuch', '',
+             "No server with a name or ID of 'nosuch' exists."],
+            ['vm3', 'id-vm3', 'OK'],
+        ])
+        self.servers_mock.servers['vm1'].pause.assert_called_with()
+        self.servers_mock.servers['vm3'].pause.assert_called_with()
+        self.assertFalse(self.servers_mock.servers['vm2'].pause.called)
+        self.assertTrue(self.cmd.failed)
+
+    def test_server_lock_has_no_wait(self):
+        self.cmd = server.LockServer(self.app, None)
+        parsed_args = self.check_parser(self.cmd, ['vm1'], [])
+        self.assertFalse(hasattr(parsed_args, 'wait'))
+
+        columns, data = self.cmd.take_action(parsed_args)
+
+        self.assertEqual(data, [['vm1', 'id-vm1', 'OK']])
+        self.servers_mock.servers['vm1'].lock.assert_called_with()
+        self.assertFalse(self.cmd.failed)
+
+    @mock.patch('time.sleep')
+    def test_server_reboot_wait(self, sleep_mock):
+        self.cmd = server.RebootServer(self.app, None)
+        self.servers_mock.servers['vm2'].status = 'ERROR'
+        arglist = ['--hard', '--wait', 'vm1', 'vm2']
+        verifylist = [
+            ('reboot_type', servers.REBOOT_HARD),
+            ('wait', True),
+        ]
+        parsed_args = self.check_parser(self.cmd, arglist, verifylist)
+
+        columns, data = self.cmd.take_action(parsed_args)
+
+        self.assertEqual(data, [
+            ['vm1', 'id-vm1', 'OK'],
+            ['vm2', 'id-vm2', 'Error waiting for the reboot'],
+        ])
+        self.servers_mock.servers['vm1'].reboot.assert_called_with(
+            servers.REBOOT_HARD,
+        )
+
+    @mock.patch('time.sleep')
+    def test_server_delete_wait(self, sleep_mock):
+        self.cmd = server.DeleteServer(self.app, None)
+        parsed_args = self.check_parser(self.cmd, ['--wait', 'vm1', 'vm2'],
+                                        [('wait', True)])
+
+        columns, data = self.cmd.take_action(parsed_args)
+
+        self.assertEqual(sorted(self.servers_mock.deleted),
+                         ['id-vm1', 'id-vm2'])
+        self.assertEqual(data, [
+            ['vm1', 'id-vm1', 'OK'],
+            ['vm2', 'id-vm2', 'OK'],
+        ])
+        self.assertFalse(self.cmd.failed)
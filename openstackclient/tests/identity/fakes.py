@@ -20,6 +20,10 @@ from openstackclient.tests import fakes
 
 class FakeIdentityv2Client(object):
     def __init__(self, **kwargs):
+        self.endpoints = mock.Mock()
+        self.endpoints.resource_class = fakes.FakeResource(None, {})
+        self.services = mock.Mock()
+        self.services.resource_class = fakes.FakeResource(None, {})
         self.tenants = mock.Mock()
         self.tenants.resource_class = fakes.FakeResource(None, {})
         self.users = mock.Mock()
@@ -0,0 +1,86 @@
+#   Copyright 2013 OpenStack Foundation
+#
+#   Licensed under the Apache License, Version 2.0 (the "License"); you may
+#   not use this file except in compliance with the License. You may obtain
+#   a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#   WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#   License for the specific language governing permissions and limitations
+#   under the License.
+#
+
+import copy
+
+from openstackclient.identity.v2_0 import endpoint
+from openstackclient.tests import fakes
+from openstackclient.tests.identity import fakes as identity_fakes
+from openstackclient.tests import utils
+
+
+IDENTITY_API_VERSION = "2.0"
+
+SERVICES = [
+    {'id': 's1', 'name': 'nova', 'type': 'compute'},
+    {'id': 's2', 'name': 'glance', 'type': 'image'},
+]
+
+ENDPOINTS = [
+    {'id': 'e1', 'region': 'RegionOne', 'service_id': 's1'},
+    {'id': 'e2', 'region': 'RegionTwo', 'service_id': 's1'},
+    {'id': 'e3', 'region': 'RegionOne', 'service_id': 's2'},
+]
+
+
+class TestEndpoint(utils.TestCommand):
+
+    def setUp(self):
+        super(TestEndpoint, self).setUp()
+        self.app.client_manager.identity = \
+            identity_fakes.FakeIdentityv2Client()
+
+        # Get shortcuts to the EndpointManager and ServiceManager Mocks
+        self.endpoints_mock = self.app.client_manager.identity.endpoints
+        self.services_mock = self.app.client_manager.identity.services
+
+
+class TestEndpointList(TestEndpoint):
+
+    def setUp(self):
+        super(TestEndpointList, self).setUp()
+
+        self.endpoints_mock.list.return_value = [
+            fakes.FakeResource(None, copy.deepcopy(e), loaded=True)
+            for e in ENDPOINTS
+        ]
+        self.services_mock.list.return_value = [
+            fakes.FakeResource(None, copy.deepcopy(s), loaded=True)
+            for s in SERVICES
+        ]
+
+        # Get the command object to test
+        self.cmd = endpoint.ListEndpoint(self.app, None)
+
+    def test_endpoint_list_services_listed_once(self):
+        parsed_args = self.check_parser(self.cmd, [], [('long', False)])
+
+        # DisplayCommandBase.take_action() returns two tuples
+        columns, data = self.cmd.take_action(parsed_args)
+
+        self.services_mock.list.assert_called_once_with()
+        self.assertFalse(self.services_mock.get.called)
+        self.assertFalse(self.services_mock.find.called)
+
+        collist = ('ID', 'Region', 'Service Name', 'Service Type')
+        self.assertEqual(columns, collist)
+        self.assertEqual(
+            [d[:3] for d in data],
+            [
+                ('e1', 'RegionOne', 'nova'),
+                ('e2', 'RegionTwo', 'nova'),
+                ('e3', 'RegionOne', 'glance'),
+            ],
+        )
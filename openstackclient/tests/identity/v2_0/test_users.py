@@ -351,6 +351,22 @@ class TestUserList(TestUser):
         datalist = ((user_id, user_name, project_id, user_email, True), )
         self.assertEqual(tuple(data), datalist)
 
+    def test_user_list_long_columns(self):
+        arglist = ['--long', '-c', 'ID', '-c', 'Email']
+        verifylist = [('long', True), ('columns', ['ID', 'Email'])]
+        parsed_args = self.check_parser(self.cmd, arglist, verifylist)
+
+        # DisplayCommandBase.take_action() returns two tuples
+        columns, data = self.cmd.take_action(parsed_args)
+
+        # The projects are only listed to show the Project column
+        self.assertFalse(self.projects_mock.list.called)
+
+        collist = ('ID', 'Name', 'Project', 'Email', 'Enabled')
+        self.assertEqual(columns, collist)
+        datalist = ((user_id, '', '', user_email, ''), )
+        self.assertEqual(tuple(data), datalist)
+
 
 class TestUserSet(TestUser):
 
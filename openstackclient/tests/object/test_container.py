@@ -277,12 +277,15 @@ class TestContainerList(TestObject):
         )
         self.assertEqual(tuple(data), datalist)
 
-    def test_object_list_containers_all(self, c_mock):
-        c_mock.return_value = [
+    @mock.patch(
+        'openstackclient.object.v1.container.lib_container.iter_containers'
+    )
+    def test_object_list_containers_all(self, i_mock, c_mock):
+        i_mock.return_value = iter([
             copy.deepcopy(object_fakes.CONTAINER),
             copy.deepcopy(object_fakes.CONTAINER_2),
             copy.deepcopy(object_fakes.CONTAINER_3),
-        ]
+        ])
 
         arglist = [
             '--all',
@@ -295,14 +298,10 @@ class TestContainerList(TestObject):
         # DisplayCommandBase.take_action() returns two tuples
         columns, data = self.cmd.take_action(parsed_args)
 
-        # Set expected values
-        kwargs = {
-            'full_listing': True,
-        }
-        c_mock.assert_called_with(
+        self.assertFalse(c_mock.called)
+        i_mock.assert_called_with(
             self.app.restapi,
             AUTH_URL,
-            **kwargs
         )
 
         collist = ('Name',)
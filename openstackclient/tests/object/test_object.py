@@ -323,11 +323,14 @@ class TestObjectList(TestObject):
         )
         self.assertEqual(tuple(data), datalist)
 
-    def test_object_list_objects_all(self, o_mock):
-        o_mock.return_value = [
+    @mock.patch(
+        'openstackclient.object.v1.object.lib_object.iter_objects'
+    )
+    def test_object_list_objects_all(self, i_mock, o_mock):
+        i_mock.return_value = iter([
             copy.deepcopy(object_fakes.OBJECT),
             copy.deepcopy(object_fakes.OBJECT_2),
-        ]
+        ])
 
         arglist = [
             '--all',
@@ -342,15 +345,11 @@ class TestObjectList(TestObject):
         # DisplayCommandBase.take_action() returns two tuples
         columns, data = self.cmd.take_action(parsed_args)
 
-        # Set expected values
-        kwargs = {
-            'full_listing': True,
-        }
-        o_mock.assert_called_with(
+        self.assertFalse(o_mock.called)
+        i_mock.assert_called_with(
             self.app.restapi,
             AUTH_URL,
             object_fakes.container_name,
-            **kwargs
         )
 
         collist = ('Name',)
@@ -360,3 +359,38 @@ class TestObjectList(TestObject):
             (object_fakes.object_name_2, ),
         )
         self.assertEqual(tuple(data), datalist)
+
+    @mock.patch(
+        'openstackclient.object.v1.object.lib_object.iter_objects'
+    )
+    def test_object_list_objects_all_prefetch(self, i_mock, o_mock):
+        i_mock.return_value = iter([
+            copy.deepcopy(object_fakes.OBJECT),
+        ])
+
+        arglist = [
+            '--all',
+            '--prefetch', '4',
+            object_fakes.container_name,
+        ]
+        verifylist = [
+            ('all', True),
+            ('prefetch', 4),
+            ('container', object_fakes.container_name),
+        ]
+        parsed_args = self.check_parser(self.cmd, arglist, verifylist)
+
+        # DisplayCommandBase.take_action() returns two tuples
+        columns, data = self.cmd.take_action(parsed_args)
+
+        # Set expected values
+        kwargs = {
+            'prefetch': 4,
+        }
+        i_mock.assert_called_with(
+            self.app.restapi,
+            AUTH_URL,
+            object_fakes.container_name,
+            **kwargs
+        )
+        self.assertEqual(tuple(data), ((object_fakes.object_name_1, ),))
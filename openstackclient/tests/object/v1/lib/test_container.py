@@ -20,6 +20,8 @@ from __future__ import unicode_literals
 import mock
 
 
+from openstackclient.common import requestmemo
+from openstackclient.common import restapi as restapi_mod
 from openstackclient.object.v1.lib import container as lib_container
 from openstackclient.tests.common import test_restapi as restapi
 from openstackclient.tests import utils
@@ -157,3 +159,65 @@ class TestObjectListContainers(TestObject):
             fake_url + '?format=json&marker=is-name',
         )
         self.assertEqual(data, resp)
+
+    def test_iter_containers(self):
+        pages = [
+            [{'name': 'a'}, {'name': 'b'}],
+            [{'name': 'c'}],
+            [],
+        ]
+        self.app.restapi.request.side_effect = [
+            restapi.FakeResponse(data=p) for p in pages
+        ]
+
+        data = lib_container.iter_containers(
+            self.app.restapi,
+            self.app.client_manager.object.endpoint,
+        )
+
+        # Nothing is requested until the first container is wanted
+        self.assertEqual(self.app.restapi.request.call_count, 0)
+        self.assertEqual(next(data), {'name': 'a'})
+        self.assertEqual(self.app.restapi.request.call_count, 1)
+        self.assertEqual(list(data), [{'name': 'b'}, {'name': 'c'}])
+        self.app.restapi.request.assert_called_with(
+            'GET',
+            fake_url + '?format=json&marker=c',
+        )
+
+    @mock.patch('openstackclient.common.restapi.requests.Session')
+    def test_iter_containers_not_remembered(self, session_mock):
+        session_mock.return_value.request.side_effect = [
+            restapi.FakeResponse(
+                status_code=200,
+                data=[{'name': 'c-%d-%d' % (page, i)} for i in range(3)],
+            )
+            for page in range(20)
+        ] + [restapi.FakeResponse(status_code=200, data=[])]
+        memo = requestmemo.RequestMemo()
+        api = restapi_mod.RESTApi(request_memo=memo)
+
+        data = list(lib_container.iter_containers(
+            api,
+            self.app.client_manager.object.endpoint,
+        ))
+        self.assertEqual(len(data), 60)
+        self.assertEqual(len(memo._calls), 0)
+
+
+class TestContainerListAsync(utils.TestCase):
+
+    def test_list_containers_async(self):
+        resp = [{'name': 'is-name'}]
+        server = self.useFixture(restapi.FakeHTTPServer({
+            'GET /?format=json&limit=1': (200, resp),
+        }))
+        api = restapi_mod.AsyncRESTApi()
+        self.addCleanup(api.close)
+
+        future = lib_container.list_containers_async(
+            api,
+            server.url + '/',
+            limit=1,
+        )
+        self.assertEqual(future.result(), resp)
@@ -18,7 +18,11 @@
 from __future__ import unicode_literals
 
 import mock
+import six
+from six.moves.urllib import parse
 
+from openstackclient.common import requestmemo
+from openstackclient.common import restapi as restapi_mod
 from openstackclient.object.v1.lib import object as lib_object
 from openstackclient.tests.common import test_restapi as restapi
 from openstackclient.tests import utils
@@ -129,12 +133,9 @@ class TestObjectListObjects(TestObject):
         )
 
         # Check expected values
-        # NOTE(dtroyer): requests handles the URL encoding and we're
-        #                mocking that so use the otherwise-not-legal
-        #                pipe '|' char in the response.
         self.app.restapi.request.assert_called_with(
             'GET',
-            fake_url + '/' + fake_container + '?format=json&delimiter=|',
+            fake_url + '/' + fake_container + '?format=json&delimiter=%7C',
         )
         self.assertEqual(data, resp)
 
@@ -201,3 +202,291 @@ class TestObjectListObjects(TestObject):
             fake_url + '/' + fake_container + '?format=json&marker=is-name',
         )
         self.assertEqual(data, resp)
+
+    def test_iter_objects(self):
+        pages = [
+            [{'name': 'a'}, {'name': 'b'}],
+            [{'name': 'c'}],
+            [],
+        ]
+        self.app.restapi.request.side_effect = [
+            restapi.FakeResponse(data=p) for p in pages
+        ]
+
+        data = lib_object.iter_objects(
+            self.app.restapi,
+            self.app.client_manager.object.endpoint,
+            fake_container,
+        )
+
+        # Nothing is requested until the first object is wanted
+        self.assertEqual(self.app.restapi.request.call_count, 0)
+        self.assertEqual(next(data), {'name': 'a'})
+        self.assertEqual(next(data), {'name': 'b'})
+        self.assertEqual(self.app.restapi.request.call_count, 1)
+        self.assertEqual(list(data), [{'name': 'c'}])
+        self.assertEqual(
+            self.app.restapi.request.call_args_list,
+            [
+                mock.call('GET', fake_url + '/' + fake_container +
+                          '?format=json'),
+                mock.call('GET', fake_url + '/' + fake_container +
+                          '?format=json&marker=b'),
+                mock.call('GET', fake_url + '/' + fake_container +
+                          '?format=json&marker=c'),
+            ],
+        )
+
+    def test_iter_objects_prefetch(self):
+        pages = [
+            [{'name': 'a'}, {'name': 'b'}],
+            [{'name': 'c'}],
+            [],
+        ]
+        self.app.restapi.request.side_effect = [
+            restapi.FakeResponse(data=p) for p in pages
+        ]
+
+        data = lib_object.iter_objects(
+            self.app.restapi,
+            self.app.client_manager.object.endpoint,
+            fake_container,
+            prefetch=2,
+        )
+
+        self.assertEqual(
+            list(data),
+            [{'name': 'a'}, {'name': 'b'}, {'name': 'c'}],
+        )
+        self.assertEqual(self.app.restapi.request.call_count, 3)
+
+
+class FakeSwift(object):
+    """Serves object listings from a list of names"""
+
+    def __init__(self, names, page_size=3):
+        self.names = sorted(names)
+        self.page_size = page_size
+        self.requests = 0
+
+    def request(self, method, url):
+        self.requests += 1
+        query = dict(
+            q.split('=', 1) for q in url.split('?', 1)[1].split('&')
+        )
+        for key in query:
+            value = parse.unquote(str(query[key]))
+            if isinstance(value, six.binary_type):
+                value = value.decode('utf-8')
+            query[key] = value
+        marker = query.get('marker', '')
+        end_marker = query.get('end_marker')
+        prefix = query.get('prefix', '')
+        delimiter = query.get('delimiter')
+        limit = min(int(query.get('limit', self.page_size)), self.page_size)
+        data = []
+        for name in self.names:
+            if name <= marker or not name.startswith(prefix):
+                continue
+            if end_marker and name >= end_marker:
+                break
+            if delimiter and delimiter in name[len(prefix):]:
+                subdir = name[:name.index(delimiter, len(prefix)) + 1]
+                if data and data[-1].get('subdir') == subdir:
+                    continue
+                data.append({'subdir': subdir})
+            else:
+                data.append({'name': name})
+            if len(data) >= limit:
+                break
+        return restapi.FakeResponse(data=data)
+
+
+class TestObjectListSharded(TestObject):
+
+    def setUp(self):
+        super(TestObjectListSharded, self).setUp()
+        self.names = [
+            'a', 'a/1', 'a/2', 'b', 'b/1', 'c/1', 'c/2', 'c/3', 'd',
+            'e/1', 'e/2', 'f',
+        ]
+        self.app.restapi = FakeSwift(self.names)
+
+    def _list(self, **kwargs):
+        return [o['name'] for o in lib_object.iter_objects(
+            self.app.restapi,
+            self.app.client_manager.object.endpoint,
+            fake_container,
+            **kwargs
+        )]
+
+    def test_iter_objects_parallel(self):
+        self.assertEqual(self._list(parallel=3), self.names)
+
+    def test_iter_objects_parallel_boundaries(self):
+        self.assertEqual(
+            self._list(parallel=3, boundaries=['b', 'c/2', 'e']),
+            self.names,
+        )
+
+    def test_iter_objects_parallel_marker_prefix(self):
+        self.assertEqual(
+            self._list(parallel=4, marker='a/1', end_marker='e/2'),
+            self.names[2:10],
+        )
+        self.assertEqual(
+            self._list(parallel=2, prefix='c/', boundaries=['c/2']),
+            ['c/1', 'c/2', 'c/3'],
+        )
+
+    def test_iter_objects_parallel_quoted_boundaries(self):
+        names = ['a', 'b', 'b&c', 'b&d', 'c', 'c+1', 'c+2', 'c#3', 'd%']
+        self.app.restapi = FakeSwift(names)
+        self.assertEqual(self._list(), sorted(names))
+        self.assertEqual(
+            self._list(parallel=3, boundaries=['b&c', 'c+1']),
+            sorted(names),
+        )
+        self.assertEqual(
+            self._list(prefix='c+', delimiter='+'),
+            ['c+1', 'c+2'],
+        )
+
+    def test_list_objects_full_listing_parallel(self):
+        data = lib_object.list_objects(
+            self.app.restapi,
+            self.app.client_manager.object.endpoint,
+            fake_container,
+            full_listing=True,
+            parallel=5,
+        )
+        self.assertEqual([o['name'] for o in data], self.names)
+
+    def test_iter_objects_parallel_queues_bounded(self):
+        with mock.patch(
+            'openstackclient.common.utils.prefetch',
+            wraps=lib_object.utils.prefetch,
+        ) as prefetch_mock:
+            self.assertEqual(self._list(parallel=3), self.names)
+        self.assertEqual(
+            [c[0][1] for c in prefetch_mock.call_args_list],
+            [1, 1, 1],
+        )
+
+    def test_sample_boundaries_large_flat_container(self):
+        # Many more names than fit in one page
+        names = ['obj-%04d' % i for i in range(2000)]
+        swift = FakeSwift(names, page_size=100)
+        boundaries = lib_object._sample_boundaries(
+            swift,
+            self.app.client_manager.object.endpoint,
+            fake_container,
+            None,
+            None,
+            None,
+            4,
+        )
+        self.assertEqual(len(boundaries), 3)
+        # The ranges are about the same size, not all in the first page
+        starts = [0] + [names.index(b) for b in boundaries] + [len(names)]
+        for start, stop in zip(starts, starts[1:]):
+            self.assertTrue(300 <= stop - start <= 700, starts)
+        self.assertTrue(swift.requests < 60)
+
+        swift.requests = 0
+        self.assertEqual(
+            [o['name'] for o in lib_object.iter_objects(
+                swift,
+                self.app.client_manager.object.endpoint,
+                fake_container,
+                parallel=4,
+            )],
+            names,
+        )
+
+    def test_sample_boundaries_prefix_end_marker(self):
+        names = ['x/%05d' % i for i in range(0, 10000, 7)] + ['y', 'z']
+        swift = FakeSwift(names, page_size=100)
+        boundaries = lib_object._sample_boundaries(
+            swift,
+            self.app.client_manager.object.endpoint,
+            fake_container,
+            None,
+            'x/05000',
+            'x/',
+            2,
+        )
+        self.assertEqual(len(boundaries), 1)
+        self.assertTrue('x/02000' < boundaries[0] < 'x/03000', boundaries)
+
+    @mock.patch('openstackclient.common.restapi.time')
+    @mock.patch('openstackclient.common.restapi.requests.Session')
+    def test_iter_objects_retry_resumes(self, session_mock, time_mock):
+        session_mock.return_value.request.side_effect = [
+            restapi.FakeResponse(status_code=200, data=[{'name': 'a'}]),
+            restapi.FakeResponse(status_code=503),
+            restapi.FakeResponse(status_code=200, data=[{'name': 'b'}]),
+            restapi.FakeResponse(status_code=200, data=[]),
+        ]
+        api = restapi_mod.RESTApi()
+
+        data = lib_object.iter_objects(
+            api,
+            self.app.client_manager.object.endpoint,
+            fake_container,
+        )
+
+        self.assertEqual(list(data), [{'name': 'a'}, {'name': 'b'}])
+        # The failed page was asked for again, not the whole listing
+        request = session_mock.return_value.request
+        self.assertEqual(
+            [c[0][1] for c in request.call_args_list],
+            [
+                fake_url + '/' + fake_container + '?format=json',
+                fake_url + '/' + fake_container + '?format=json&marker=a',
+                fake_url + '/' + fake_container + '?format=json&marker=a',
+                fake_url + '/' + fake_container + '?format=json&marker=b',
+            ],
+        )
+
+    @mock.patch('openstackclient.common.restapi.requests.Session')
+    def test_iter_objects_not_remembered(self, session_mock):
+        session_mock.return_value.request.side_effect = [
+            restapi.FakeResponse(
+                status_code=200,
+                data=[{'name': 'obj-%d-%d' % (page, i)} for i in range(3)],
+            )
+            for page in range(20)
+        ] + [restapi.FakeResponse(status_code=200, data=[])]
+        memo = requestmemo.RequestMemo()
+        api = restapi_mod.RESTApi(request_memo=memo)
+
+        count = 0
+        for obj in lib_object.iter_objects(
+            api,
+            self.app.client_manager.object.endpoint,
+            fake_container,
+        ):
+            count += 1
+            self.assertEqual(len(memo._calls), 0)
+        self.assertEqual(count, 60)
+        self.assertEqual(len(memo._calls), 0)
+
+
+class TestObjectListAsync(utils.TestCase):
+
+    def test_list_objects_async(self):
+        resp = [{'name': 'is-name'}]
+        server = self.useFixture(restapi.FakeHTTPServer({
+            'GET /%s?format=json&prefix=is' % fake_container: (200, resp),
+        }))
+        api = restapi_mod.AsyncRESTApi()
+        self.addCleanup(api.close)
+
+        future = lib_object.list_objects_async(
+            api,
+            server.url,
+            fake_container,
+            prefix='is',
+        )
+        self.assertEqual(future.result(), resp)
@@ -0,0 +1,289 @@
+#   Copyright 2013 OpenStack Foundation
+#
+#   Licensed under the Apache License, Version 2.0 (the "License"); you may
+#   not use this file except in compliance with the License. You may obtain
+#   a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#   WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#   License for the specific language governing permissions and limitations
+#   under the License.
+#
+
+import argparse
+import os
+import socket
+import sys
+import threading
+
+import fixtures
+import mock
+import six
+
+from openstackclient import daemon
+from openstackclient.common import utils as common_utils
+from openstackclient.tests import utils
+
+
+class FakeShell(object):
+    """Looks like an OpenStackShell to the daemon"""
+
+    created = 0
+    blocked = threading.Event()
+    release = threading.Event()
+
+    def __init__(self):
+        FakeShell.created += 1
+        self.stdin = sys.stdin
+        self.stdout = sys.stdout
+        self.stderr = sys.stderr
+        self.parser = argparse.ArgumentParser()
+        self.parser.add_argument('--os-username',
+                                 default=os.environ.get('OS_USERNAME'))
+        self.client_manager = None
+        self.resource_cache = None
+
+    def run(self, argv):
+        self.options, remainder = self.parser.parse_known_args(argv)
+        self.client_manager = mock.Mock()
+        self.client_manager.will_expire_soon.return_value = False
+        self.resource_cache = object()
+        common_utils.set_resource_cache(self.resource_cache)
+        return self.run_subcommand(remainder)
+
+    def run_subcommand(self, argv):
+        if argv == ['cat']:
+            self.stdout.write(self.stdin.read())
+        elif argv == ['readline']:
+            self.stdout.write(self.stdin.readline())
+        elif argv == ['cache']:
+            self.stdout.write('%s\n' % (
+                common_utils.get_resource_cache() is self.resource_cache
+            ))
+        elif argv == ['block']:
+            FakeShell.blocked.set()
+            FakeShell.release.wait(5)
+        elif argv == ['fail']:
+            self.stderr.write('failed\n')
+            return 3
+        else:
+            self.stdout.write('%s %s %s\n' % (
+                self.options.os_username,
+                os.environ.get('COLUMNS'),
+                ' '.join(argv),
+            ))
+        return 0
+
+
+class TestDaemon(utils.TestCase):
+
+    def setUp(self):
+        super(TestDaemon, self).setUp()
+        FakeShell.created = 0
+        FakeShell.blocked.clear()
+        FakeShell.release.clear()
+        self.path = os.path.join(
+            self.useFixture(fixtures.TempDir()).path,
+            'daemon.sock',
+        )
+        self.daemon = daemon.Daemon(
+            self.path,
+            idle_timeout=5,
+            shell_factory=FakeShell,
+        )
+        self.daemon.listen()
+        self.thread = threading.Thread(target=self.daemon.serve)
+        self.thread.daemon = True
+        self.thread.start()
+
+    def _forward(self, argv, environ=None, stdin=''):
+        stdout = six.StringIO()
+        stderr = six.StringIO()
+        environ = environ or {'OS_USERNAME': 'alice'}
+        if isinstance(stdin, six.string_types):
+            stdin = six.StringIO(stdin)
+        status = daemon.forward(
+            self.path,
+            argv,
+            environ,
+            os.getcwd(),
+            stdin,
+            mock.Mock(buffer=mock.Mock(write=stdout.write)),
+            mock.Mock(buffer=mock.Mock(write=stderr.write)),
+        )
+        return status, stdout.getvalue(), stderr.getvalue()
+
+    def test_warm_shell(self):
+        self.assertEqual(
+            self._forward(['server', 'list']),
+            (0, b'alice None server list\n', b''),
+        )
+        # The environment is passed on but only OS_ variables need a
+        # new shell
+        self.assertEqual(
+            self._forward(
+                ['server', 'show', 'vm1'],
+                {'OS_USERNAME': 'alice', 'COLUMNS': '80'},
+            ),
+            (0, b'alice 80 server show vm1\n', b''),
+        )
+        self.assertEqual(FakeShell.created, 1)
+
+        self._forward(['server', 'list'], {'OS_USERNAME': 'bob'})
+        self._forward(['--os-username', 'carol', 'server', 'list'])
+        self.assertEqual(FakeShell.created, 3)
+
+    def test_token_expiring(self):
+        self._forward(['server', 'list'])
+        self._forward(['server', 'list'])
+        self.assertEqual(FakeShell.created, 1)
+
+        warm = self.daemon.shells[0]
+        warm.shell.client_manager.will_expire_soon.return_value = True
+        self._forward(['server', 'list'])
+        self.assertEqual(FakeShell.created, 2)
+        self.assertEqual(len(self.daemon.shells), 1)
+        self.assertIsNot(self.daemon.shells[0], warm)
+
+    def test_resource_cache_per_shell(self):
+        self._forward(['server', 'list'], {'OS_USERNAME': 'alice'})
+        self._forward(['server', 'list'], {'OS_USERNAME': 'bob'})
+        # Each shell sees its own cache, not the last one made
+        self.assertEqual(
+            self._forward(['cache'], {'OS_USERNAME': 'alice'}),
+            (0, b'True\n', b''),
+        )
+        self.assertEqual(
+            self._forward(['cache'], {'OS_USERNAME': 'bob'}),
+            (0, b'True\n', b''),
+        )
+        self.assertIs(common_utils.get_resource_cache(), None)
+
+    def test_stdin_and_status(self):
+        self.assertEqual(
+            self._forward(['cat'], stdin=u'line 1\nline 2\n'),
+            (0, b'line 1\nline 2\n', b''),
+        )
+        self.assertEqual(self._forward(['fail']), (3, b'', b'failed\n'))
+
+    def _open_pipe(self, data=''):
+        """Return a stdin that has data and is never closed"""
+        read_fd, write_fd = os.pipe()
+        self.addCleanup(os.close, write_fd)
+        os.write(write_fd, data.encode('utf-8'))
+        stdin = os.fdopen(read_fd, 'r')
+        self.addCleanup(stdin.close)
+        return stdin
+
+    def _in_thread(self, func, *args):
+        result = []
+        thread = threading.Thread(target=lambda: result.append(func(*args)))
+        thread.daemon = True
+        thread.start()
+        thread.join(10)
+        self.assertFalse(thread.is_alive())
+        return result[0]
+
+    def test_stdin_only_read_on_demand(self):
+        stdin = self._open_pipe('line 1\nline 2\n')
+        self.assertEqual(
+            self._in_thread(self._forward, ['server', 'list'], None, stdin),
+            (0, b'alice None server list\n', b''),
+        )
+        # Only the line the command read is taken from stdin
+        self.assertEqual(
+            self._in_thread(self._forward, ['readline'], None, stdin),
+            (0, b'line 1\n', b''),
+        )
+        self.assertEqual(stdin.readline(), 'line 2\n')
+
+    def test_main_stdin_not_closed(self):
+        self.useFixture(fixtures.EnvironmentVariable('OS_DAEMON', '1'))
+        self.useFixture(fixtures.EnvironmentVariable(
+            'OS_CACHE_DIR',
+            os.path.dirname(self.path),
+        ))
+        stdout = six.StringIO()
+        with mock.patch('sys.stdin', self._open_pipe()):
+            with mock.patch(
+                'sys.stdout',
+                mock.Mock(buffer=mock.Mock(write=stdout.write)),
+            ):
+                status = self._in_thread(daemon.main, ['server', 'list'])
+        self.assertEqual(status, 0)
+        self.assertTrue(stdout.getvalue().endswith(b'server list\n'))
+
+    def test_idle_timeout(self):
+        self.daemon.idle_timeout = 0.01
+        self._forward(['server', 'list'])
+        self.thread.join(5)
+        self.assertFalse(self.thread.is_alive())
+        self.assertFalse(os.path.exists(self.path))
+
+    def test_busy(self):
+        first = threading.Thread(target=self._forward, args=(['block'],))
+        first.daemon = True
+        first.start()
+        self.assertTrue(FakeShell.blocked.wait(5))
+        self.assertRaises(daemon.Busy, self._forward, ['server', 'list'])
+        FakeShell.release.set()
+        first.join(5)
+        self.assertEqual(
+            self._forward(['server', 'list']),
+            (0, b'alice None server list\n', b''),
+        )
+
+    @mock.patch('openstackclient.daemon.forward')
+    def test_main_busy(self, forward_mock):
+        self.useFixture(fixtures.EnvironmentVariable('OS_DAEMON', '1'))
+        forward_mock.side_effect = daemon.Busy()
+        with mock.patch('openstackclient.shell.main') as main_mock:
+            main_mock.return_value = 0
+            self.assertEqual(daemon.main(['server', 'list']), 0)
+        main_mock.assert_called_with(['server', 'list'])
+
+    def test_second_daemon(self):
+        second = daemon.Daemon(self.path, shell_factory=FakeShell)
+        self.assertRaises(daemon.AlreadyRunning, second.listen)
+        # The first daemon's socket is left alone
+        self.assertEqual(
+            self._forward(['server', 'list']),
+            (0, b'alice None server list\n', b''),
+        )
+
+
+class TestDaemonMain(utils.TestCase):
+
+    @mock.patch('openstackclient.shell.main')
+    def test_main_without_daemon(self, main_mock):
+        self.useFixture(fixtures.EnvironmentVariable('OS_DAEMON'))
+        main_mock.return_value = 0
+        self.assertEqual(daemon.main(['server', 'list']), 0)
+        main_mock.assert_called_with(['server', 'list'])
+
+    @mock.patch('openstackclient.daemon.forward')
+    @mock.patch('openstackclient.shell.main')
+    def test_main_without_unix_sockets(self, main_mock, forward_mock):
+        self.useFixture(fixtures.EnvironmentVariable('OS_DAEMON', '1'))
+        main_mock.return_value = 0
+        with mock.patch.object(daemon, 'socket', mock.Mock(spec=[])):
+            self.assertEqual(daemon.main(['server', 'list']), 0)
+        main_mock.assert_called_with(['server', 'list'])
+        self.assertFalse(forward_mock.called)
+
+    def test_main_does_not_import_fcntl(self):
+        # fcntl only exists on POSIX
+        self.assertFalse(hasattr(daemon, 'fcntl'))
+
+    @mock.patch('openstackclient.daemon.start_daemon')
+    @mock.patch('openstackclient.daemon.forward')
+    def test_main_starts_daemon(self, forward_mock, start_mock):
+        self.useFixture(fixtures.EnvironmentVariable('OS_DAEMON', '1'))
+        forward_mock.side_effect = [socket.error(2, 'No such file'), 0]
+        start_mock.return_value = True
+        with mock.patch('sys.stdin', isatty=mock.Mock(return_value=True)):
+            self.assertEqual(daemon.main(['server', 'list']), 0)
+        self.assertEqual(forward_mock.call_count, 2)
@@ -13,8 +13,14 @@
 #   under the License.
 #
 
+import fixtures
 import mock
 import os
+import subprocess
+import sys
+
+from cliff import command
+from testtools import content
 
 from openstackclient import shell
 from openstackclient.tests import utils
@@ -56,6 +62,11 @@ def fake_execute(shell, cmd):
 class TestShell(utils.TestCase):
     def setUp(self):
         super(TestShell, self).setUp()
+        # Keep the command index out of the user's home directory
+        self.useFixture(fixtures.MonkeyPatch(
+            "openstackclient.shell.DEFAULT_CACHE_DIR",
+            self.useFixture(fixtures.TempDir()).path,
+        ))
         patch = "openstackclient.shell.OpenStackShell.run_subcommand"
         self.cmd_patch = mock.patch(patch)
         self.cmd_save = self.cmd_patch.start()
@@ -315,3 +326,233 @@ class TestShellCli(TestShell):
             "volume_api_version": LIB_VOLUME_API_VERSION
         }
         self._assert_cli(flag, kwargs)
+
+    def test_wait_timeout(self):
+        with mock.patch("openstackclient.shell.OpenStackShell.initialize_app",
+                        self.app):
+            _shell = make_shell()
+            fake_execute(_shell, "list server")
+            self.assertEqual(_shell.options.os_wait_timeout, 3600)
+
+            os.environ["OS_WAIT_TIMEOUT"] = "0"
+            _shell = make_shell()
+            fake_execute(_shell, "list server")
+            self.assertEqual(_shell.options.os_wait_timeout, 0)
+
+
+@mock.patch(
+    'keystoneclient.v2_0.client.Client.get_raw_token_from_identity_service'
+)
+class TestShellLazyAuth(TestShell):
+    def setUp(self):
+        super(TestShellLazyAuth, self).setUp()
+        env = {
+            "OS_AUTH_URL": DEFAULT_AUTH_URL,
+            "OS_PROJECT_NAME": DEFAULT_PROJECT_NAME,
+            "OS_USERNAME": DEFAULT_USERNAME,
+            "OS_PASSWORD": DEFAULT_PASSWORD,
+        }
+        self.orig_env, os.environ = os.environ, env.copy()
+
+    def tearDown(self):
+        super(TestShellLazyAuth, self).tearDown()
+        os.environ = self.orig_env
+
+    def test_no_auth_in_initialize_app(self, auth_mock):
+        _shell = make_shell()
+        _shell.command_manager.find_command.return_value = (
+            mock.Mock(),
+            "list server",
+            [],
+        )
+        fake_execute(_shell, "list server")
+
+        self.assertFalse(auth_mock.called)
+        self.assertEqual(
+            _shell.client_manager._username,
+            DEFAULT_USERNAME,
+        )
+        self.assertEqual(_shell.restapi.auth_source, _shell.client_manager)
+
+
+class NeedCommand(command.Command):
+    """A command with a required argument"""
+
+    def get_parser(self, prog_name):
+        parser = super(NeedCommand, self).get_parser(prog_name)
+        parser.add_argument('name')
+        return parser
+
+    def take_action(self, parsed_args):
+        return 0
+
+
+class TestShellBatch(TestShell):
+    def setUp(self):
+        super(TestShellBatch, self).setUp()
+        env = {
+            "OS_AUTH_URL": DEFAULT_AUTH_URL,
+            "OS_PROJECT_NAME": DEFAULT_PROJECT_NAME,
+            "OS_USERNAME": DEFAULT_USERNAME,
+            "OS_PASSWORD": DEFAULT_PASSWORD,
+        }
+        self.orig_env, os.environ = os.environ, env.copy()
+        self.batch_file = os.path.join(
+            self.useFixture(fixtures.TempDir()).path,
+            'commands',
+        )
+        with open(self.batch_file, 'w') as f:
+            f.write(
+                "# make a server\n"
+                "server create --image cirros 'my server'\n"
+                "\n"
+                "server show missing\n"
+                "server list\n"
+            )
+
+    def tearDown(self):
+        super(TestShellBatch, self).tearDown()
+        os.environ = self.orig_env
+
+    def _run_batch(self, cmd):
+        _shell = make_shell()
+        _shell.stderr = mock.Mock()
+        with mock.patch.object(
+            _shell,
+            'run_subcommand',
+            side_effect=[0, 1, 0],
+        ) as run_mock:
+            result = fake_execute(_shell, cmd)
+        return _shell, run_mock, result
+
+    def test_batch(self):
+        _shell, run_mock, result = self._run_batch(
+            "--batch " + self.batch_file
+        )
+
+        self.assertEqual(result, 1)
+        self.assertEqual(
+            run_mock.call_args_list,
+            [
+                mock.call(['server', 'create', '--image', 'cirros',
+                           'my server']),
+                mock.call(['server', 'show', 'missing']),
+                mock.call(['server', 'list']),
+            ],
+        )
+        # Every command gets a status line, then a summary
+        self.assertEqual(
+            _shell.stderr.write.call_args_list,
+            [
+                mock.call("line 2: exit status 0: "
+                          "server create --image cirros 'my server'\n"),
+                mock.call('line 4: exit status 1: server show missing\n'),
+                mock.call('line 5: exit status 0: server list\n'),
+                mock.call('3 commands run, 1 failed\n'),
+            ],
+        )
+        # One authentication is shared by every command
+        self.assertEqual(_shell.restapi.auth_source, _shell.client_manager)
+
+    def test_batch_stop_on_error(self):
+        _shell, run_mock, result = self._run_batch(
+            "--batch " + self.batch_file + " --stop-on-error"
+        )
+
+        self.assertEqual(result, 1)
+        self.assertEqual(run_mock.call_count, 2)
+        _shell.stderr.write.assert_called_with(
+            '2 commands run, 1 failed, stopped at line 4\n'
+        )
+
+    def test_batch_bad_arguments(self):
+        with open(self.batch_file, 'w') as f:
+            f.write("need\nneed x\nneed\n")
+        _shell = make_shell()
+        _shell.stderr = mock.Mock()
+        _shell.command_manager.find_command.side_effect = (
+            lambda argv: (NeedCommand, argv[0], argv[1:])
+        )
+
+        # Run the commands for real, tearDown() stops the patch again
+        self.cmd_patch.stop()
+        try:
+            with mock.patch('sys.stderr'):
+                result = fake_execute(_shell, "--batch " + self.batch_file)
+        finally:
+            self.cmd_patch.start()
+
+        # argparse exits for the lines missing the argument, the others
+        # still run
+        self.assertEqual(result, 2)
+        self.assertEqual(
+            _shell.stderr.write.call_args_list,
+            [
+                mock.call('line 1: exit status 2: need\n'),
+                mock.call('line 2: exit status 0: need x\n'),
+                mock.call('line 3: exit status 2: need\n'),
+                mock.call('3 commands run, 2 failed\n'),
+            ],
+        )
+
+    def test_batch_bad_arguments_stop_on_error(self):
+        _shell = make_shell()
+        _shell.stderr = mock.Mock()
+        with mock.patch.object(
+            _shell,
+            'run_subcommand',
+            side_effect=[0, SystemExit(2)],
+        ) as run_mock:
+            result = fake_execute(
+                _shell,
+                "--batch " + self.batch_file + " --stop-on-error",
+            )
+        self.assertEqual(result, 2)
+        self.assertEqual(run_mock.call_count, 2)
+        _shell.stderr.write.assert_called_with(
+            '2 commands run, 1 failed, stopped at line 4\n'
+        )
+
+    def test_batch_with_command(self):
+        _shell = make_shell()
+        result = fake_execute(_shell, "--batch - server list")
+        self.assertEqual(result, 1)
+
+
+class TestShellStartup(utils.TestCase):
+    """Importing the shell must not load the API client libraries"""
+
+    # Modules that are only needed once a command uses an API
+    LAZY_MODULES = (
+        'Crypto',
+        'cinderclient',
+        'glanceclient',
+        'keyring',
+        'keystoneclient',
+        'novaclient',
+    )
+
+    def test_shell_import(self):
+        code = (
+            "import sys, time\n"
+            "start = time.time()\n"
+            "import openstackclient.shell\n"
+            "print(time.time() - start)\n"
+            "print(' '.join(sys.modules))\n"
+        )
+        proc = subprocess.Popen(
+            [sys.executable, '-c', code],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+        )
+        out, err = proc.communicate()
+        self.assertEqual(proc.returncode, 0, err)
+
+        import_time, modules = out.decode('utf-8').splitlines()
+        self.addDetail(
+            'import-time',
+            content.text_content('%.3f seconds' % float(import_time)),
+        )
+        loaded = set(m.split('.')[0] for m in modules.split())
+        for module in self.LAZY_MODULES:
+            self.assertNotIn(module, loaded)
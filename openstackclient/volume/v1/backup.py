@@ -92,6 +92,7 @@ class DeleteBackup(command.Command):
         backup_id = utils.find_resource(volume_client.backups,
                                         parsed_args.backup).id
         volume_client.backups.delete(backup_id)
+        utils.invalidate_resource(volume_client.backups, backup_id)
         return
 
 
@@ -110,11 +111,11 @@ class ListBackup(lister.Lister):
             'Size'
         )
         data = self.app.client_manager.volume.backups.list()
-        return (columns,
-                (utils.get_item_properties(
-                    s, columns,
-                    formatters={},
-                ) for s in data))
+        get_row = utils.item_properties_getter(
+            columns,
+            formatters={},
+        )
+        return (columns, (get_row(s) for s in data))
 
 
 class RestoreBackup(command.Command):
@@ -93,6 +93,7 @@ class DeleteSnapshot(command.Command):
         snapshot_id = utils.find_resource(volume_client.volume_snapshots,
                                           parsed_args.snapshot).id
         volume_client.volume_snapshots.delete(snapshot_id)
+        utils.invalidate_resource(volume_client.volume_snapshots, snapshot_id)
         return
 
 
@@ -111,11 +112,11 @@ class ListSnapshot(lister.Lister):
             'Size'
         )
         data = self.app.client_manager.volume.volume_snapshots.list()
-        return (columns,
-                (utils.get_item_properties(
-                    s, columns,
-                    formatters={},
-                ) for s in data))
+        get_row = utils.item_properties_getter(
+            columns,
+            formatters={},
+        )
+        return (columns, (get_row(s) for s in data))
 
 
 class SetSnapshot(command.Command):
@@ -154,6 +155,7 @@ class SetSnapshot(command.Command):
             sys.stdout.write("Snapshot not updated, no arguments present")
             return
         snapshot.update(**kwargs)
+        utils.invalidate_resource(volume_client.volume_snapshots, snapshot.id)
         return
 
 
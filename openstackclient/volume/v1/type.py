@@ -86,6 +86,7 @@ class DeleteVolumeType(command.Command):
         volume_type_id = utils.find_resource(
             volume_client.volume_types, parsed_args.volume_type).id
         volume_client.volume_types.delete(volume_type_id)
+        utils.invalidate_resource(volume_client.volume_types, volume_type_id)
         return
 
 
@@ -112,11 +113,16 @@ class ListVolumeType(lister.Lister):
             columns = ('ID', 'Name')
             column_headers = columns
         data = self.app.client_manager.volume.volume_types.list()
-        return (column_headers,
-                (utils.get_item_properties(
-                    s, columns,
-                    formatters={'Extra Specs': utils.format_dict},
-                ) for s in data))
+        get_row = utils.item_properties_getter(
+            columns,
+            formatters={'Extra Specs': utils.format_dict},
+            selected=utils.get_selected_columns(
+                parsed_args,
+                columns,
+                column_headers,
+            ),
+        )
+        return (column_headers, (get_row(s) for s in data))
 
 
 class SetVolumeType(command.Command):
@@ -158,6 +158,7 @@ class DeleteVolume(command.Command):
             volume_client.volumes.force_delete(volume.id)
         else:
             volume_client.volumes.delete(volume.id)
+        utils.invalidate_resource(volume_client.volumes, volume.id)
         return
 
 
@@ -240,11 +241,16 @@ class ListVolume(lister.Lister):
         volume_client = self.app.client_manager.volume
         data = volume_client.volumes.list(search_opts=search_opts)
 
-        return (column_headers,
-                (utils.get_item_properties(
-                    s, columns,
-                    formatters={'Metadata': utils.format_dict},
-                ) for s in data))
+        get_row = utils.item_properties_getter(
+            columns,
+            formatters={'Metadata': utils.format_dict},
+            selected=utils.get_selected_columns(
+                parsed_args,
+                columns,
+                column_headers,
+            ),
+        )
+        return (column_headers, (get_row(s) for s in data))
 
 
 class SetVolume(command.Command):
@@ -293,6 +299,7 @@ class SetVolume(command.Command):
             kwargs['display_description'] = parsed_args.description
         if kwargs:
             volume_client.volumes.update(volume.id, **kwargs)
+            utils.invalidate_resource(volume_client.volumes, volume.id)
 
         if not kwargs and not parsed_args.property:
             self.app.log.error("No changes requested\n")
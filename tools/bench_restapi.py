@@ -0,0 +1,79 @@
+#   Copyright 2013 OpenStack Foundation
+#
+#   Licensed under the Apache License, Version 2.0 (the "License"); you may
+#   not use this file except in compliance with the License. You may obtain
+#   a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#   WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#   License for the specific language governing permissions and limitations
+#   under the License.
+#
+
+"""
+Micro-benchmark of the client side cost of RESTApi.request()
+
+The session is replaced with one that returns a canned response so only
+the work done by RESTApi itself is timed.
+
+    tools/with_venv.sh python tools/bench_restapi.py [--debug] [body-kb]
+"""
+
+import json
+import logging
+import sys
+import timeit
+
+import requests
+
+from openstackclient.common import restapi
+
+
+class CannedSession(requests.Session):
+    def __init__(self, response):
+        super(CannedSession, self).__init__()
+        self.response = response
+
+    def request(self, method, url, **kwargs):
+        return self.response
+
+
+def main(argv):
+    debug = '--debug' in argv
+    args = [a for a in argv if a != '--debug']
+    body_kb = int(args[0]) if args else 1024
+
+    logging.basicConfig(
+        level=logging.DEBUG if debug else logging.WARNING,
+        stream=open('/dev/null', 'w'),
+    )
+
+    response = requests.Response()
+    response.status_code = 200
+    response._content_consumed = True
+    response.headers['X-Subject-Token'] = 'secret'
+    response._content = json.dumps(
+        [{'name': 'x' * 1000}] * body_kb
+    ).encode('utf-8')
+
+    api = restapi.RESTApi(os_auth='secret')
+    api.session = CannedSession(response)
+
+    number = 1000
+    best = min(timeit.repeat(
+        lambda: api.request('GET', 'http://localhost/v1/AUTH_x/c'),
+        number=number,
+        repeat=5,
+    ))
+    print('%s logging, %d KB body: %.1f usec per request' % (
+        'debug' if debug else 'no',
+        body_kb,
+        best / number * 1e6,
+    ))
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
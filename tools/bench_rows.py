@@ -0,0 +1,101 @@
+#   Copyright 2013 OpenStack Foundation
+#
+#   Licensed under the Apache License, Version 2.0 (the "License"); you may
+#   not use this file except in compliance with the License. You may obtain
+#   a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#   WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#   License for the specific language governing permissions and limitations
+#   under the License.
+#
+
+"""
+Micro-benchmark of turning listed resources into Lister rows
+
+Compares utils.get_item_properties() and utils.get_dict_properties(),
+called for every row, with a getter made once by
+utils.item_properties_getter() or utils.dict_properties_getter().
+
+    tools/with_venv.sh python tools/bench_rows.py [rows]
+"""
+
+import sys
+import timeit
+
+from openstackclient.common import utils
+
+
+COLUMNS = ('ID', 'Name', 'Status', 'Networks', 'Tenant ID')
+MIXED_CASE_FIELDS = ('Tenant ID',)
+FORMATTERS = {'Networks': utils.format_dict}
+
+
+class FakeServer(object):
+    def __init__(self, i):
+        self.id = 'id-%d' % i
+        self.name = 'server-%d' % i
+        self.status = 'ACTIVE'
+        self.networks = {'private': '10.0.0.%d' % (i % 256)}
+        self.Tenant_ID = 'tenant-%d' % (i % 10)
+
+
+def bench(name, func, number):
+    best = min(timeit.repeat(func, number=number, repeat=3))
+    print('%-28s %.3f sec' % (name, best / number))
+    return best
+
+
+def main(argv):
+    count = int(argv[0]) if argv else 100000
+    items = [FakeServer(i) for i in range(count)]
+    dicts = [vars(item) for item in items]
+
+    def per_row_items():
+        for s in items:
+            utils.get_item_properties(
+                s, COLUMNS,
+                mixed_case_fields=MIXED_CASE_FIELDS,
+                formatters=FORMATTERS,
+            )
+
+    def getter_items():
+        get_row = utils.item_properties_getter(
+            COLUMNS,
+            mixed_case_fields=MIXED_CASE_FIELDS,
+            formatters=FORMATTERS,
+        )
+        for s in items:
+            get_row(s)
+
+    def per_row_dicts():
+        for s in dicts:
+            utils.get_dict_properties(
+                s, COLUMNS,
+                mixed_case_fields=MIXED_CASE_FIELDS,
+                formatters=FORMATTERS,
+            )
+
+    def getter_dicts():
+        get_row = utils.dict_properties_getter(
+            COLUMNS,
+            mixed_case_fields=MIXED_CASE_FIELDS,
+            formatters=FORMATTERS,
+        )
+        for s in dicts:
+            get_row(s)
+
+    print('%d rows of %d columns' % (count, len(COLUMNS)))
+    before = bench('get_item_properties', per_row_items, 1)
+    after = bench('item_properties_getter', getter_items, 1)
+    print('%-28s %.1fx' % ('speedup', before / after))
+    before = bench('get_dict_properties', per_row_dicts, 1)
+    after = bench('dict_properties_getter', getter_dicts, 1)
+    print('%-28s %.1fx' % ('speedup', before / after))
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])